@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""
+Registry scale benchmark - RegistryManager at 1k / 10k / 100k components
+Location: benchmarks/bench_registry_scale.py
+
+Generates a synthetic registry (benchmarks/synthetic_registry.py) of each
+size in a temp directory and measures, per storage backend:
+
+- load: RegistryManager construction
+- get_agent / agent_exists (hits and misses): mean per-call latency
+- list_agents: all active, by a group tag (1 in 10 agents), by a rare tag
+- search_agents: first query (builds the index), then warm queries
+- get_dependency_graph / validate_all: cold, warm, and after registrations
+- register_agent: one at a time, and the same number in one register_many
+- singleton reload: a no-op check, and a reload after another process
+  changed one entry in storage
+
+The benchmark's RegistryManager stands in as the registry singleton, so the
+reload every registration triggers hits it rather than the project
+registry, and registered sources go to the temp directory. Results are
+written as JSON (--output) so storage or index changes can be compared
+across runs.
+
+Usage:
+    python benchmarks/bench_registry_scale.py --sizes 1000 10000
+    python benchmarks/bench_registry_scale.py --backends json sqlite --output scale.json
+"""
+
+import argparse
+import contextlib
+import itertools
+import json
+import math
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import core.registry as registry_module
+from config import REGISTRY_DURABILITY
+from core.registry import RegistryManager
+from core.registry_singleton import RegistrySingleton, _identities
+from core.registry_storage import (
+    JSONRegistryStorage,
+    SQLiteRegistryStorage,
+    migrate_json_to_sqlite,
+)
+from synthetic_registry import describe, write_registry
+
+LOOKUPS = 10000
+SEARCH_QUERIES = [
+    "extract emails from pdf",
+    "normalize dates",
+    "redact phone numbers from html input",
+    "classify sentiment",
+]
+AGENT_CODE = '''def {name}_agent(state):
+    """Synthetic benchmark agent."""
+    return state
+'''
+
+
+@contextlib.contextmanager
+def quiet():
+    """Silence the registry's DEBUG output while measuring."""
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        yield
+
+
+def summarize(samples: list) -> dict:
+    samples = sorted(samples)
+    return {
+        "calls": len(samples),
+        "mean_ms": round(sum(samples) / len(samples) * 1000, 4),
+        "p50_ms": round(samples[len(samples) // 2] * 1000, 4),
+        "p95_ms": round(samples[math.ceil(len(samples) * 0.95) - 1] * 1000, 4),
+        "max_ms": round(samples[-1] * 1000, 4),
+    }
+
+
+def timed(fn, repeat: int = 1) -> dict:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return summarize(samples)
+
+
+def per_call(fn, arguments: list) -> dict:
+    """Mean latency of a fast call, timed over one loop."""
+    started = time.perf_counter()
+    for argument in arguments:
+        fn(argument)
+    total = time.perf_counter() - started
+    return {"calls": len(arguments), "mean_us": round(total / len(arguments) * 1e6, 3)}
+
+
+def open_storage(backend: str, paths: dict, directory: str):
+    """Storage backend over the generated registry, plus a factory for a second writer."""
+    if backend == "json":
+        factory = lambda: JSONRegistryStorage(paths["agents"], paths["tools"])
+    elif backend == "sqlite":
+        db_path = os.path.join(directory, "registry.db")
+        migrate_json_to_sqlite(paths["agents"], paths["tools"], db_path)
+        factory = lambda: SQLiteRegistryStorage(db_path)
+    else:
+        raise ValueError(f"Unknown backend '{backend}'")
+    return factory(), factory
+
+
+def install_singleton(manager: RegistryManager) -> RegistrySingleton:
+    """Make the benchmark's manager the process registry singleton."""
+    singleton = object.__new__(RegistrySingleton)
+    singleton._registry = manager
+    singleton._last_reload = time.time()
+    singleton._tokens = dict(manager.storage.load_tokens)
+    singleton._identities = {
+        kind: _identities(singleton._section(kind)) for kind in ("agents", "tools")
+    }
+    singleton._listeners = []
+    singleton._publish_snapshot()
+    RegistrySingleton._instance = singleton
+    return singleton
+
+
+def agent_spec(n: int, tools: int) -> dict:
+    name = f"bench_{n}"
+    return {
+        "name": name,
+        "description": describe(n),
+        "code": AGENT_CODE.format(name=name),
+        "uses_tools": [f"tool_{n % tools}"],
+        "tags": ["benchmark"],
+    }
+
+
+def bench_size(
+    backend: str, agents: int, tools: int, registrations: int, directory: str
+) -> dict:
+    paths = write_registry(directory, agents, tools)
+    repeat = min(50, max(3, 20000 // agents))
+    operations = {}
+
+    storage, second_writer = open_storage(backend, paths, directory)
+    started = time.perf_counter()
+    manager = RegistryManager(paths["agents"], paths["tools"], storage=storage)
+    operations["load"] = summarize([time.perf_counter() - started])
+
+    # Point lookups
+    rng = random.Random(0)
+    names = [f"agent_{rng.randrange(agents)}" for _ in range(LOOKUPS)]
+    missing = [f"missing_{i}" for i in range(LOOKUPS)]
+    operations["get_agent"] = per_call(manager.get_agent, names)
+    operations["agent_exists"] = per_call(manager.agent_exists, names)
+    operations["agent_exists_miss"] = per_call(manager.agent_exists, missing)
+
+    # Listing and search
+    operations["list_agents_all"] = timed(lambda: manager.list_agents(), repeat)
+    operations["list_agents_tag_group"] = timed(
+        lambda: manager.list_agents(tags=["group_3"]), repeat
+    )
+    operations["list_agents_tag_rare"] = timed(
+        lambda: manager.list_agents(tags=["rare"]), repeat
+    )
+    queries = itertools.cycle(SEARCH_QUERIES)
+    operations["search_agents_first"] = timed(
+        lambda: manager.search_agents(next(queries), top_k=10)
+    )
+    operations["search_agents"] = timed(
+        lambda: manager.search_agents(next(queries), top_k=10),
+        repeat * len(SEARCH_QUERIES),
+    )
+
+    # Dependency graph and validation
+    operations["get_dependency_graph_cold"] = timed(manager.get_dependency_graph)
+    operations["get_dependency_graph_warm"] = timed(manager.get_dependency_graph, repeat)
+    operations["validate_all_cold"] = timed(manager.validate_all)
+    operations["validate_all_warm"] = timed(manager.validate_all, repeat)
+
+    # Singleton reload
+    singleton = install_singleton(manager)
+    operations["reload_noop"] = timed(singleton.force_reload, repeat)
+    writer = second_writer()
+    samples = []
+    for n in range(3):
+        document = writer.load("agents")
+        name = f"agent_{n}"
+        document["agents"][name] = {
+            **document["agents"][name],
+            "description": f"Changed by another process ({n})",
+            "version": f"1.1.{n}",
+        }
+        writer.save("agents", document, changed=[name])
+        started = time.perf_counter()
+        singleton.force_reload()
+        samples.append(time.perf_counter() - started)
+    writer.close()
+    operations["reload_one_change"] = summarize(samples)
+
+    # Registration
+    samples = []
+    for n in range(registrations):
+        started = time.perf_counter()
+        result = manager.register_agent(**agent_spec(n, tools))
+        samples.append(time.perf_counter() - started)
+        if result["status"] != "success":
+            raise RuntimeError(f"Registration failed: {result}")
+    operations["register_agent"] = {
+        **summarize(samples),
+        "per_second": round(registrations / sum(samples), 1),
+    }
+
+    specs = [agent_spec(registrations + n, tools) for n in range(registrations)]
+    started = time.perf_counter()
+    result = manager.register_many(agents=specs)
+    elapsed = time.perf_counter() - started
+    if result["status"] != "success":
+        raise RuntimeError(f"Batch registration failed: {result['failed']}")
+    operations["register_many"] = {
+        **summarize([elapsed]),
+        "per_second": round(registrations / elapsed, 1),
+    }
+
+    operations["get_dependency_graph_after_register"] = timed(manager.get_dependency_graph)
+    operations["validate_all_after_register"] = timed(manager.validate_all)
+
+    storage.close()
+    return {
+        "backend": backend,
+        "agents": agents,
+        "tools": tools,
+        "registry_bytes": os.path.getsize(paths["agents"]) + os.path.getsize(paths["tools"]),
+        "operations": operations,
+    }
+
+
+def format_operation(result: dict) -> str:
+    if "mean_us" in result:
+        return f"{result['mean_us']:>10} us/call"
+    line = f"{result['mean_ms']:>10} ms"
+    if result["calls"] > 1:
+        line += f"  p95 {result['p95_ms']} ms"
+    if "per_second" in result:
+        line += f"  ({result['per_second']}/s)"
+    return line
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument(
+        "--tool-ratio", type=float, default=0.2, help="Tools per agent in the registry"
+    )
+    parser.add_argument("--backends", nargs="+", default=["json", "sqlite"])
+    parser.add_argument("--registrations", type=int, default=20)
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    results = []
+    original_agents_dir = registry_module.GENERATED_AGENTS_DIR
+    try:
+        for size in args.sizes:
+            tools = max(10, int(size * args.tool_ratio))
+            for backend in args.backends:
+                with tempfile.TemporaryDirectory() as directory:
+                    registry_module.GENERATED_AGENTS_DIR = os.path.join(
+                        directory, "registered"
+                    )
+                    with quiet():
+                        result = bench_size(
+                            backend, size, tools, args.registrations, directory
+                        )
+                    RegistrySingleton._instance = None
+                results.append(result)
+
+                print(
+                    f"\n{backend} - {size} agents, {tools} tools "
+                    f"({result['registry_bytes'] / 1e6:.1f} MB)"
+                )
+                for name, operation in result["operations"].items():
+                    print(f"  {name:<38}{format_operation(operation)}")
+    finally:
+        registry_module.GENERATED_AGENTS_DIR = original_agents_dir
+        RegistrySingleton._instance = None
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(
+                {
+                    "benchmark": "registry_scale",
+                    "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                    "environment": {
+                        "python": platform.python_version(),
+                        "platform": platform.platform(),
+                        "durability": REGISTRY_DURABILITY,
+                    },
+                    "results": results,
+                },
+                f,
+                indent=2,
+            )
+        print(f"✅ Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
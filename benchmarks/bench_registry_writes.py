@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Registry write benchmark - registration throughput per durability level
+Location: benchmarks/bench_registry_writes.py
+
+Simulates agent registration (add one entry, atomically rewrite the
+registry file) against a registry of N agents in a temp directory and
+reports registrations/second for:
+
+- legacy: indent=2 json.dump + rename + os.sync() (the old atomic_update)
+- none / file / full: RegistrySingleton.atomic_update durability levels
+
+Usage:
+    python benchmarks/bench_registry_writes.py --agents 1000 --registrations 50
+    python benchmarks/bench_registry_writes.py --output results.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.registry_singleton import RegistrySingleton
+from synthetic_registry import make_agent
+
+
+def legacy_atomic_update(filepath: str, data: dict):
+    """The write path before durability levels, kept for comparison."""
+    temp_path = f"{filepath}.tmp"
+    with open(temp_path, "w") as f:
+        json.dump(data, f, indent=2, default=str)
+    os.replace(temp_path, filepath)
+    os.sync()
+
+
+def bench_mode(mode: str, agents: int, registrations: int, directory: str) -> dict:
+    path = os.path.join(directory, f"agents_{mode}.json")
+    registry = {"agents": {f"agent_{i}": make_agent(i) for i in range(agents)}}
+    singleton = object.__new__(RegistrySingleton)  # Writer only, no registry load
+
+    latencies = []
+    for n in range(registrations):
+        entry = make_agent(agents + n)
+        registry["agents"][entry["name"]] = entry
+        started = time.perf_counter()
+        if mode == "legacy":
+            legacy_atomic_update(path, registry)
+        else:
+            singleton.atomic_update(path, registry, durability=mode)
+        latencies.append(time.perf_counter() - started)
+
+    latencies.sort()
+    total = sum(latencies)
+    return {
+        "mode": mode,
+        "registrations": registrations,
+        "registry_agents": agents,
+        "file_bytes": os.path.getsize(path),
+        "registrations_per_second": round(registrations / total, 1),
+        "p50_ms": round(latencies[len(latencies) // 2] * 1000, 3),
+        "p95_ms": round(latencies[int(len(latencies) * 0.95) - 1] * 1000, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--agents", type=int, default=1000)
+    parser.add_argument("--registrations", type=int, default=50)
+    parser.add_argument(
+        "--modes", nargs="+", default=["legacy", "none", "file", "full"]
+    )
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for mode in args.modes:
+            result = bench_mode(mode, args.agents, args.registrations, directory)
+            results.append(result)
+            print(
+                f"{mode:>7}: {result['registrations_per_second']:>9} reg/s  "
+                f"p50 {result['p50_ms']:>8} ms  p95 {result['p95_ms']:>8} ms  "
+                f"({result['file_bytes']} bytes)"
+            )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"benchmark": "registry_writes", "results": results}, f, indent=2)
+        print(f"✅ Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Synthetic registry generator for benchmarks
+Location: benchmarks/synthetic_registry.py
+
+Builds agents/tools registry documents of any size with realistic entries:
+every agent uses two tools, tags split agents into 10 groups (plus a rare
+tag on 1 in 1000), descriptions draw from a small vocabulary so search has
+both common and rare terms, and a few entries are deprecated. write_registry()
+also creates the module file behind every entry so validation sees a healthy
+registry.
+
+Usage:
+    python benchmarks/synthetic_registry.py --agents 10000 --tools 2000 --output /tmp/registry
+"""
+
+import argparse
+import json
+import os
+import random
+
+VERBS = ["extract", "summarize", "classify", "normalize", "validate", "merge",
+         "translate", "parse", "score", "redact", "aggregate", "detect"]
+NOUNS = ["emails", "invoices", "dates", "addresses", "tables", "records",
+         "sentiment", "keywords", "entities", "prices", "urls", "phone numbers"]
+SOURCES = ["pdf", "csv", "text", "json", "html", "spreadsheet"]
+
+
+def describe(i: int) -> str:
+    rng = random.Random(i)
+    return (
+        f"{rng.choice(VERBS).capitalize()} {rng.choice(NOUNS)} from "
+        f"{rng.choice(SOURCES)} input and {rng.choice(VERBS)} the "
+        f"{rng.choice(NOUNS)} (synthetic component {i})"
+    )
+
+
+def make_agent(i: int, tools: int = 50, directory: str = "generated/agents") -> dict:
+    tags = ["synthetic", f"group_{i % 10}"]
+    if i % 1000 == 0:
+        tags.append("rare")
+    return {
+        "name": f"agent_{i}",
+        "description": describe(i),
+        "uses_tools": [f"tool_{i % tools}", f"tool_{(i + 7) % tools}"],
+        "input_schema": {"data": "any"},
+        "output_schema": {"status": "string", "data": "object"},
+        "location": os.path.join(directory, f"agent_{i}_agent.py"),
+        "is_prebuilt": False,
+        "created_at": f"2025-01-01T00:00:{i % 60:02d}.{i:06d}",
+        "version": f"1.0.{i:08x}",
+        "execution_count": i % 97,
+        "avg_execution_time": 0.25,
+        "tags": tags,
+        "line_count": 120,
+        "status": "deprecated" if i % 500 == 499 else "active",
+    }
+
+
+def make_tool(i: int, agents: int, tools: int, directory: str = "generated/tools") -> dict:
+    # Agents j use tools j % tools and (j + 7) % tools
+    used_by = [
+        f"agent_{j}"
+        for offset in (i, (i - 7) % tools)
+        for j in range(offset, agents, tools)
+    ]
+    return {
+        "name": f"tool_{i}",
+        "description": describe(agents + i),
+        "signature": f"def tool_{i}(input_data=None)",
+        "location": os.path.join(directory, f"tool_{i}.py"),
+        "is_prebuilt": False,
+        "is_pure_function": True,
+        "used_by_agents": used_by,
+        "created_at": f"2025-01-01T00:00:{i % 60:02d}.{i:06d}",
+        "version": f"1.0.{i:08x}",
+        "tags": ["synthetic", f"group_{i % 10}"],
+        "line_count": 40,
+        "status": "active",
+    }
+
+
+def build_registry(agents: int, tools: int, directory: str = ".") -> tuple:
+    """(agents document, tools document) with module paths under directory."""
+    agents_dir = os.path.join(directory, "agents")
+    tools_dir = os.path.join(directory, "tools")
+    return (
+        {"agents": {f"agent_{i}": make_agent(i, tools, agents_dir) for i in range(agents)}},
+        {"tools": {f"tool_{i}": make_tool(i, agents, tools, tools_dir) for i in range(tools)}},
+    )
+
+
+def write_registry(directory: str, agents: int, tools: int) -> dict:
+    """Write agents.json, tools.json and every module file. Returns their paths."""
+    agents_doc, tools_doc = build_registry(agents, tools, directory)
+    for kind, document in (("agents", agents_doc), ("tools", tools_doc)):
+        os.makedirs(os.path.join(directory, kind), exist_ok=True)
+        for entry in document[kind].values():
+            with open(entry["location"], "w") as f:
+                f.write(f"# Synthetic {entry['name']}\n")
+
+    paths = {
+        "agents": os.path.join(directory, "agents.json"),
+        "tools": os.path.join(directory, "tools.json"),
+    }
+    for kind, document in (("agents", agents_doc), ("tools", tools_doc)):
+        with open(paths[kind], "w") as f:
+            json.dump(document, f, indent=2)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic registry")
+    parser.add_argument("--agents", type=int, default=1000)
+    parser.add_argument("--tools", type=int, default=200)
+    parser.add_argument("--output", required=True, help="Directory to write into")
+    args = parser.parse_args()
+
+    paths = write_registry(args.output, args.agents, args.tools)
+    print(f"✅ Wrote {args.agents} agents and {args.tools} tools: {paths['agents']}, {paths['tools']}")
+
+
+if __name__ == "__main__":
+    main()
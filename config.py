@@ -3,6 +3,7 @@ Agentic Fabric POC - Master Configuration
 Single source of truth for all system configuration, prompts, and constraints
 """
 
+import hashlib
 import os
 from dotenv import load_dotenv
 from typing import List, Dict, Any
@@ -1863,3 +1864,145 @@ SCENARIO_AGENT_TEMPLATES = {
 
 
 # =============================================================================
+# LLM GATEWAY SETTINGS
+# =============================================================================
+
+# Provider call mode
+LLM_GATEWAY_MODE = os.getenv(
+    "LLM_GATEWAY_MODE", "async"
+)  # "async" (native async clients) or "thread" (offload sync clients)
+
+# Shared provider HTTP pool
+LLM_HTTP_MAX_CONNECTIONS = 100  # Total connections across providers
+LLM_HTTP_MAX_KEEPALIVE = 20  # Idle connections kept open for reuse
+LLM_HTTP_KEEPALIVE_EXPIRY = 60.0  # Seconds an idle connection stays pooled
+LLM_HTTP_CONNECT_TIMEOUT = 10.0  # Seconds to establish a connection
+LLM_HTTP_READ_TIMEOUT = 120.0  # Seconds for a provider response
+LLM_PREWARM_CONNECTIONS = (
+    os.getenv("LLM_PREWARM_CONNECTIONS", "false").lower() == "true"
+)  # Open provider connections at app startup
+
+# LLM response cache
+LLM_CACHE_ENABLED = True  # Serve repeated prompts from cache
+LLM_CACHE_MAX_ENTRIES = 512  # In-memory LRU size
+LLM_CACHE_DISK_ENABLED = False  # zstd-compressed on-disk tier (needs zstandard)
+LLM_CACHE_DIR = os.path.join(PROJECT_ROOT, ".cache", "llm")
+LLM_CACHE_TTL_SECONDS = 24 * 3600  # Entry lifetime for both tiers
+LLM_CACHE_COMPRESSION_LEVEL = 3  # zstd level for disk entries
+
+# Planner concurrency
+PLANNER_MAX_CONCURRENCY = 4  # Independent planning LLM calls issued at once
+FAST_PLAN_MODE = False  # Opt-in single-shot planning (one JSON call)
+PLANNER_AGENT_SHORTLIST = 25  # Agents sent to planner prompts, ranked locally
+
+# Plan cache (normalized request + file schema + registry generation)
+PLAN_CACHE_ENABLED = True  # Reuse plans for repeated requests
+PLAN_CACHE_MAX_ENTRIES = 256  # LRU size
+PLAN_CACHE_TTL_SECONDS = 24 * 3600  # Entry lifetime
+
+# Provider backend: "live", "record" (live + save fixtures), "replay"
+# (fixtures, fake on miss) or "fake" (rule-based, fully offline)
+LLM_BACKEND = os.getenv("LLM_BACKEND", "live")
+LLM_FIXTURES_DIR = os.getenv(
+    "LLM_FIXTURES_DIR", os.path.join(PROJECT_ROOT, "fixtures", "llm")
+)
+LLM_REPLAY_LATENCY_MS = float(os.getenv("LLM_REPLAY_LATENCY_MS", "0"))  # Synthetic delay
+LLM_REPLAY_JITTER_MS = float(os.getenv("LLM_REPLAY_JITTER_MS", "0"))  # +/- jitter
+LLM_REPLAY_USE_RECORDED_LATENCY = False  # Replay with each fixture's recorded latency
+LLM_REPLAY_SEED = 0  # Seed for deterministic jitter
+LLM_REPLAY_ON_MISS = os.getenv("LLM_REPLAY_ON_MISS", "fake")  # "fake" or "error"
+LLM_FAKE_RULES_PATH = os.getenv("LLM_FAKE_RULES_PATH")  # Optional JSON rule list
+
+# LLM governor (process-wide rate limiting)
+LLM_GOVERNOR_ENABLED = True  # Gate every provider call through the governor
+LLM_RATE_LIMITS = {
+    "openai": {"rpm": 500, "tpm": 200000},  # Requests / tokens per minute
+    "anthropic": {"rpm": 50, "tpm": 40000},
+}
+LLM_MODEL_RATE_LIMITS = {}  # Overrides keyed "provider:model"
+LLM_GOVERNOR_MAX_QUEUE = 256  # Waiters per provider/model before rejecting
+LLM_GOVERNOR_MAX_IN_FLIGHT = 16  # Concurrent calls per provider/model
+LLM_RATE_LIMIT_RETRIES = 3  # Retries after a provider 429
+LLM_RATE_LIMIT_BACKOFF_SECONDS = 2.0  # Base backoff when no retry-after header
+
+# Prompt budgets (approximate tokens) for registry/data sections
+PROMPT_MAX_TOKENS = 12000  # Total budget for JSON sections within one prompt
+PROMPT_SECTION_BUDGETS = {
+    "registry": 3000,  # Agent/tool digests
+    "file_context": 1500,  # File structure, columns, samples
+    "plan": 1500,  # Proposed plans, strategies, data flow
+    "context": 1500,  # Context analysis and requirements
+    "data": 1000,  # Raw data handed to an agent
+    "results": 4000,  # Agent outputs fed to synthesis
+}
+
+# =============================================================================
+# REGISTRY STORAGE SETTINGS
+# =============================================================================
+
+# Storage backend: "json" (agents.json / tools.json) or "sqlite" (indexed,
+# migrate with `python -m core.registry_storage migrate`)
+REGISTRY_BACKEND = os.getenv("REGISTRY_BACKEND", "json")
+REGISTRY_DB_PATH = os.getenv(
+    "REGISTRY_DB_PATH", os.path.join(PROJECT_ROOT, "registry.db")
+)
+
+# Write-behind execution metrics (durability window: buffered executions are
+# lost if the process dies before the next flush)
+REGISTRY_METRICS_FLUSH_INTERVAL = float(
+    os.getenv("REGISTRY_METRICS_FLUSH_INTERVAL", "5.0")
+)  # Seconds between flushes; 0 writes through on every execution
+REGISTRY_METRICS_FLUSH_THRESHOLD = 100  # Pending executions that trigger a flush
+
+# Registry change notifications: "inotify" (Linux), "polling" (background
+# stat loop), "auto" (inotify, else polling) or "off" (readers poll storage)
+REGISTRY_WATCH_MODE = os.getenv("REGISTRY_WATCH_MODE", "off")
+REGISTRY_WATCH_POLL_INTERVAL = 0.25  # Seconds between stat sweeps (polling mode)
+REGISTRY_WATCH_DEBOUNCE = 0.02  # Seconds to coalesce a burst of file events
+
+# Registry write durability: "full" (fsync file + directory), "file" (fsync
+# file only) or "none" (atomic rename, no fsync)
+REGISTRY_DURABILITY = os.getenv("REGISTRY_DURABILITY", "full")
+
+# Registry backups: content-addressed zstd objects + manifests in BACKUP_DIR.
+# Retention keeps the newest KEEP_LAST backups and any younger than KEEP_DAYS
+REGISTRY_BACKUP_KEEP_LAST = int(os.getenv("REGISTRY_BACKUP_KEEP_LAST", "20"))
+REGISTRY_BACKUP_KEEP_DAYS = float(os.getenv("REGISTRY_BACKUP_KEEP_DAYS", "7"))
+REGISTRY_BACKUP_ZSTD_LEVEL = 3
+
+# Shared registry snapshot for multi-process servers (gunicorn workers): one
+# process publishes each generation to a memory-mapped file the others attach
+# to. "on" or "off"; the path should be on tmpfs
+REGISTRY_SHARED_SNAPSHOT = os.getenv("REGISTRY_SHARED_SNAPSHOT", "off")
+REGISTRY_SHARED_SNAPSHOT_PATH = os.getenv(
+    "REGISTRY_SHARED_SNAPSHOT_PATH",
+    os.path.join(
+        "/dev/shm" if os.path.isdir("/dev/shm") else os.path.join(PROJECT_ROOT, ".cache"),
+        f"agent_fabric_registry_{hashlib.sha1(PROJECT_ROOT.encode()).hexdigest()[:8]}",
+    ),
+)
+REGISTRY_SHARED_ENTRY_CACHE = 256  # Decoded entries kept per mapped snapshot
+
+# Per-component latency sketches and outcome windows (core/registry_latency.py)
+REGISTRY_LATENCY_ACCURACY = 0.05  # Relative error of reported percentiles
+REGISTRY_LATENCY_MAX_BUCKETS = 64  # Lowest buckets are folded beyond this
+REGISTRY_LATENCY_MIN_SECONDS = 0.0001  # Faster executions land in one bucket
+REGISTRY_OUTCOME_SLOT_SECONDS = 300  # Error/timeout counts per 5 minutes...
+REGISTRY_OUTCOME_WINDOW_SECONDS = 3600  # ...over the last hour
+
+# Adaptive agent timeout: p99 latency x multiplier once an agent has enough
+# samples, clamped to [AGENT_TIMEOUT_SECONDS, STEP_TIMEOUT_SECONDS]
+AGENT_TIMEOUT_P99_MULTIPLIER = 2.0
+AGENT_TIMEOUT_MIN_SAMPLES = 20
+
+# Shared agent/tool loader (core/component_loader.py): modules kept loaded
+COMPONENT_LOADER_CACHE_SIZE = 512
+
+# Where generated agents run: "inline" (in the calling process) or "sandbox"
+# (core/sandbox_executor.py: pre-forked workers with CPU/memory limits and a
+# hard kill on timeout)
+AGENT_EXECUTION_BACKEND = os.getenv("AGENT_EXECUTION_BACKEND", "inline")
+SANDBOX_WORKERS = int(os.getenv("SANDBOX_WORKERS", str(min(4, os.cpu_count() or 1))))
+SANDBOX_CPU_SECONDS = float(os.getenv("SANDBOX_CPU_SECONDS", "30"))  # CPU time per task
+SANDBOX_MEMORY_MB = int(os.getenv("SANDBOX_MEMORY_MB", "1024"))  # Address space per task
+SANDBOX_MAX_TASKS_PER_WORKER = 200  # Workers are replaced after this many tasks
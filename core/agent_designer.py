@@ -3,16 +3,16 @@ Intelligent Agent Designer - GPT-4 designs optimal agent architectures
 """
 
 import json
-import openai
 from typing import Dict, List
-from config import OPENAI_API_KEY, ORCHESTRATOR_MODEL
+from config import ORCHESTRATOR_MODEL
+from core.llm_gateway import get_llm_gateway
 
 
 class IntelligentAgentDesigner:
     """GPT-4 designs complete agent specifications"""
 
     def __init__(self):
-        self.openai_client = openai.OpenAI(api_key=OPENAI_API_KEY)
+        self.llm = get_llm_gateway()
 
     async def design_agent_architecture(
         self, agent_requirement: Dict, context: Dict
@@ -100,10 +100,11 @@ class IntelligentAgentDesigner:
         }}
         """
 
-        response = self.openai_client.chat.completions.create(
+        response = await self.llm.openai_chat(
             model=ORCHESTRATOR_MODEL,
             messages=[{"role": "user", "content": design_prompt}],
             response_format={"type": "json_object"},
+            priority="background",
         )
 
-        return json.loads(response.choices[0].message.content)
+        return json.loads(response)
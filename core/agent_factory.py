@@ -26,10 +26,10 @@ import ast
 import json
 import traceback
 from typing import Dict, List, Optional, Any, Tuple
-from anthropic import Anthropic
 from core.registry_singleton import get_shared_registry
 from config import PIPELINE_AGENT_TEMPLATE, DYNAMIC_AGENT_SPEC_PROMPT
 from core.agent_designer import IntelligentAgentDesigner
+from core.llm_gateway import get_llm_gateway
 from config import ANTHROPIC_API_KEY, CLAUDE_MODEL
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -49,10 +49,8 @@ class AgentFactory:
             f"DEBUG: ANTHROPIC_API_KEY length: {len(ANTHROPIC_API_KEY) if ANTHROPIC_API_KEY else 0}"
         )
 
-        # Add this line to initialize Claude client
-        from anthropic import Anthropic
-
-        self.claude = Anthropic(api_key=ANTHROPIC_API_KEY)
+        # Claude access goes through the shared LLM gateway
+        self.llm = get_llm_gateway()
 
         self.agent_designer = IntelligentAgentDesigner()
         self.registry = get_shared_registry()
@@ -76,7 +74,7 @@ class AgentFactory:
         """
 
         print(f"DEBUG: create_agent called for '{agent_name}'")
-        print(f"DEBUG: API client initialized: {self.client is not None}")
+        print(f"DEBUG: API client initialized: {self.llm is not None}")
 
         print(f"DEBUG: Creating agent '{agent_name}' with tools: {required_tools}")
 
@@ -254,16 +252,16 @@ class AgentFactory:
 
         try:
             # Call Claude API
-            response = self.client.messages.create(
+            raw_response = self.llm.claude_message_sync(
                 model=CLAUDE_MODEL,
                 max_tokens=CLAUDE_MAX_TOKENS,
                 messages=[{"role": "user", "content": prompt}],
+                priority="background",  # Agent generation yields to chat
             )
 
             print(f"DEBUG: Claude API response received")
 
             # Extract code from response
-            raw_response = response.content[0].text
             print(f"DEBUG: Raw response length: {len(raw_response)}")
 
             code = self._extract_code_from_response(raw_response)
@@ -669,7 +667,7 @@ class AgentFactory:
         output_desc = modifications.get("output_description", "Modified output")
 
         # Mark old agent as deprecated
-        self.registry.agents["agents"][agent_name]["status"] = "deprecated"
+        self.registry.set_status("agents", agent_name, "deprecated")
         self.registry.save_all()
 
         # Create new version
@@ -1577,13 +1575,13 @@ class AgentFactory:
     Make sure the function name is EXACTLY '{spec['name']}' and it processes data according to its purpose.
     """
 
-        response = self.claude.messages.create(
+        generated_code = await self.llm.claude_message(
             model=CLAUDE_MODEL,
             max_tokens=3000,
             messages=[{"role": "user", "content": generation_prompt}],
+            priority="background",
         )
 
-        generated_code = response.content[0].text
 
         # Clean up the generated code
         if "```python" in generated_code:
@@ -1635,26 +1633,10 @@ class AgentFactory:
 
                 registry = get_shared_registry()
 
-                # Get the agent data with wrong name
+                # Move the entry to the requested name (index, graph and
+                # tool references follow)
                 if registry.agent_exists(actual_agent_name):
-                    agent_data = registry.get_agent(actual_agent_name)
-
-                    # Remove wrong entry
-                    if (
-                        "agents" in registry.agents
-                        and actual_agent_name in registry.agents["agents"]
-                    ):
-                        del registry.agents["agents"][actual_agent_name]
-
-                    # Add with correct name
-                    if "agents" not in registry.agents:
-                        registry.agents["agents"] = {}
-
-                    registry.agents["agents"][agent_name] = agent_data.copy()
-                    registry.agents["agents"][agent_name]["name"] = agent_name
-
-                    # Save registry
-                    registry.save_all()
+                    registry.rename_agent(actual_agent_name, agent_name)
 
                     print(f"✅ FIXED: Registry now has {agent_name} correctly")
 
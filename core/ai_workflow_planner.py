@@ -6,11 +6,20 @@ This replaces rule-based workflow planning with AI-driven strategic planning
 """
 
 import json
-import openai
-from typing import Dict, List, Any, Optional
+import time
+import asyncio
+from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime
 
-from config import OPENAI_API_KEY, ORCHESTRATOR_MODEL, ORCHESTRATOR_MAX_TOKENS
+from config import (
+    ORCHESTRATOR_MODEL,
+    ORCHESTRATOR_MAX_TOKENS,
+    PLANNER_MAX_CONCURRENCY,
+    FAST_PLAN_MODE,
+)
+from core.llm_gateway import get_llm_gateway
+from core.llm_task_graph import LLMTaskGraph
+from core.prompt_budget import PromptBudget, agent_digest, fit_section
 
 
 class AIWorkflowPlanner:
@@ -20,7 +29,9 @@ class AIWorkflowPlanner:
     """
 
     def __init__(self):
-        self.openai_client = openai.OpenAI(api_key=OPENAI_API_KEY)
+        self.llm = get_llm_gateway()
+        # Per-path latency tracking so fast vs multi-stage plans can be compared
+        self.planning_stats = {}
 
     async def plan_intelligent_workflow(
         self,
@@ -29,6 +40,7 @@ class AIWorkflowPlanner:
         available_agents: List[str] = None,
         available_tools: List[str] = None,
         scenario_context: Dict = None,
+        fast_plan: bool = None,
     ) -> Dict:
         """
         Use GPT-4 to intelligently plan multi-agent workflows.
@@ -38,6 +50,7 @@ class AIWorkflowPlanner:
             files: List of file data with structure information
             available_agents: List of available agent names
             available_tools: List of available tool names
+            fast_plan: Single-shot planning; defaults to FAST_PLAN_MODE
 
         Returns:
             Dict with intelligent workflow plan
@@ -79,22 +92,109 @@ class AIWorkflowPlanner:
                 "expected_duration": scenario["expected_duration"],
             }
 
+        if fast_plan is None:
+            fast_plan = FAST_PLAN_MODE
+
+        # Rank the registry locally and only show the planner the best matches
+        if available_agents:
+            from core.registry_singleton import get_shared_registry
+
+            shortlist = get_shared_registry().shortlist_agents(request, available_agents)
+            if len(shortlist) < len(available_agents):
+                print(
+                    f"DEBUG: Shortlisted {len(shortlist)} of "
+                    f"{len(available_agents)} agents for planning"
+                )
+            available_agents = shortlist
+
+        started = time.perf_counter()
+        fast_plan_errors = []
+
+        if fast_plan:
+            plan, fast_plan_errors = await self._plan_single_shot(
+                request, files, available_agents, available_tools
+            )
+            if plan is not None:
+                return self._record_planning_path(plan, "fast", started)
+
+            print(
+                f"⚠️  Fast plan failed validation ({'; '.join(fast_plan_errors)}), "
+                f"falling back to multi-stage planning"
+            )
+
+        plan = await self._plan_multi_stage(
+            request, files, available_agents, available_tools
+        )
+        if fast_plan:
+            plan["fast_plan_errors"] = fast_plan_errors
+        return self._record_planning_path(
+            plan, "fast_fallback" if fast_plan else "multi_stage", started
+        )
+
+    async def _plan_multi_stage(
+        self,
+        request: str,
+        files: List[Dict],
+        available_agents: List[str],
+        available_tools: List[str],
+    ) -> Dict:
+        """Full multi-call planning: context, strategy, data flow, instructions."""
+
+        # Planning stages as a dependency graph: independent LLM calls
+        # (e.g. per-agent instructions) run together under one semaphore
+        semaphore = asyncio.Semaphore(PLANNER_MAX_CONCURRENCY)
+        graph = LLMTaskGraph(semaphore=semaphore)
+
         # Step 1: Analyze request context with actual data
-        context_analysis = await self._analyze_request_context(request, files)
+        graph.add("context", lambda r: self._analyze_request_context(request, files))
+        graph.add("agent_details", lambda r: self._get_agent_details(available_agents))
 
         # Step 2: Plan optimal workflow strategy
-        workflow_strategy = await self._plan_workflow_strategy(
-            request, context_analysis, available_agents, available_tools
+        graph.add(
+            "natural_analysis",
+            lambda r: self._analyze_workflow_naturally(request, r["context"]),
+            depends_on=["context"],
+        )
+        graph.add(
+            "structure",
+            lambda r: self._extract_workflow_structure(r["natural_analysis"]),
+            depends_on=["natural_analysis"],
+        )
+        graph.add(
+            "strategy",
+            lambda r: self._match_structure_to_agents(
+                r["structure"], available_agents, r["agent_details"]
+            ),
+            depends_on=["structure", "agent_details"],
         )
 
         # Step 3: Design data flow between agents
-        data_flow_plan = await self._design_data_flow(
-            workflow_strategy, context_analysis
+        graph.add(
+            "data_flow",
+            lambda r: self._design_data_flow(r["strategy"], r["context"]),
+            depends_on=["strategy", "context"],
         )
 
-        # Step 4: Create agent-specific instructions
-        agent_instructions = await self._create_agent_instructions(
-            workflow_strategy, data_flow_plan, request
+        # Step 4: Create agent-specific instructions (fans out per agent)
+        graph.add(
+            "instructions",
+            lambda r: self._create_agent_instructions(
+                r["strategy"], r["data_flow"], request, semaphore
+            ),
+            depends_on=["strategy", "data_flow"],
+            bounded=False,
+        )
+
+        results = await graph.run()
+        context_analysis = results["context"]
+        workflow_strategy = results["strategy"]
+        data_flow_plan = results["data_flow"]
+        agent_instructions = results["instructions"]
+
+        summary = graph.get_summary()
+        print(
+            f"DEBUG: Planning graph finished in {summary['wall_time']}s "
+            f"(sequential would be ~{summary['total_stage_time']}s)"
         )
 
         return {
@@ -113,11 +213,188 @@ class AIWorkflowPlanner:
             "confidence": workflow_strategy.get("confidence", 0.8),
         }
 
-    async def _analyze_request_context(self, request: str, files: List[Dict]) -> Dict:
-        """GPT-4 analyzes the request context with actual file data."""
+    async def _plan_single_shot(
+        self,
+        request: str,
+        files: List[Dict],
+        available_agents: List[str],
+        available_tools: List[str],
+    ) -> Tuple[Optional[Dict], List[str]]:
+        """
+        Produce the complete plan dict in one structured JSON call.
 
-        # Build context with real file data
-        context_parts = [f"USER REQUEST: {request}"]
+        Returns:
+            (plan, []) on success, or (None, validation_errors) when the
+            response does not match the plan schema.
+        """
+        registry_digest = self._build_registry_digest(available_agents or [])
+        file_context = self._describe_files(files)
+
+        prompt = f"""
+        Plan a multi-agent workflow for this request in a single pass.
+
+        USER REQUEST: {request}
+        {chr(10).join(file_context)}
+
+        AVAILABLE AGENTS (name, description, tags, input/output fields):
+        {fit_section(registry_digest, "registry")}
+
+        AVAILABLE TOOLS: {available_tools or []}
+
+        Only use agent names from the list above. If an operation has no
+        suitable agent, list it under missing_capabilities instead.
+
+        Return JSON:
+        {{
+            "context_analysis": {{
+                "user_goal": "what user wants to accomplish",
+                "processing_requirements": ["step 1", "step 2"],
+                "output_expectations": {{"format": "pdf|chart|analysis|summary"}},
+                "complexity": "simple|medium|complex"
+            }},
+            "agent_sequence": ["agent_name"],
+            "execution_strategy": "sequential|parallel|hybrid",
+            "data_flow": {{
+                "flow_type": "sequential|parallel|hybrid|single_step",
+                "data_transformations": [
+                    {{"from_agent": "agent1", "to_agent": "agent2", "data_passed": "what"}}
+                ]
+            }},
+            "agent_instructions": {{
+                "agent_name": {{
+                    "primary_task": "specific task for this agent",
+                    "input_expectations": "what this agent receives",
+                    "output_requirements": "how to format results",
+                    "success_criteria": "how to know this step succeeded"
+                }}
+            }},
+            "missing_capabilities": [
+                {{"capability": "description of needed agent", "priority": "high"}}
+            ],
+            "rationale": "why this plan",
+            "complexity": "simple|medium|complex",
+            "confidence": 0.85
+        }}
+        """
+
+        response = await self.llm.openai_chat(
+            model=ORCHESTRATOR_MODEL,
+            messages=[{"role": "user", "content": prompt}],
+            response_format={"type": "json_object"},
+            max_completion_tokens=ORCHESTRATOR_MAX_TOKENS,
+        )
+
+        try:
+            raw_plan = json.loads(response)
+        except (json.JSONDecodeError, TypeError):
+            return None, ["response is not valid JSON"]
+
+        errors = self._validate_fast_plan(raw_plan, available_agents or [])
+        if errors:
+            return None, errors
+
+        agent_sequence = raw_plan["agent_sequence"]
+        context_analysis = raw_plan["context_analysis"]
+
+        return {
+            "workflow_type": "ai_planned",
+            "agents": agent_sequence,
+            "execution_strategy": raw_plan["execution_strategy"],
+            "data_flow": raw_plan["data_flow"],
+            "agent_instructions": raw_plan["agent_instructions"],
+            "context_analysis": context_analysis,
+            "rationale": raw_plan.get("rationale", ""),
+            "estimated_steps": len(agent_sequence),
+            "complexity": raw_plan.get(
+                "complexity", context_analysis.get("complexity", "medium")
+            ),
+            "missing_capabilities": [
+                {
+                    "capability": missing["capability"],
+                    "priority": missing.get("priority", "high"),
+                }
+                for missing in raw_plan["missing_capabilities"]
+            ],
+            "confidence": raw_plan.get("confidence", 0.8),
+        }, []
+
+    def _validate_fast_plan(
+        self, raw_plan: Any, available_agents: List[str]
+    ) -> List[str]:
+        """Schema check for single-shot plans. Returns a list of problems."""
+        if not isinstance(raw_plan, dict):
+            return ["response is not a JSON object"]
+
+        errors = []
+        required_fields = {
+            "context_analysis": dict,
+            "agent_sequence": list,
+            "execution_strategy": str,
+            "data_flow": dict,
+            "agent_instructions": dict,
+            "missing_capabilities": list,
+        }
+        for field, expected_type in required_fields.items():
+            if not isinstance(raw_plan.get(field), expected_type):
+                errors.append(f"'{field}' missing or not a {expected_type.__name__}")
+        if errors:
+            return errors
+
+        known_agents = set(available_agents)
+        for agent_name in raw_plan["agent_sequence"]:
+            if not isinstance(agent_name, str) or agent_name not in known_agents:
+                errors.append(f"unknown agent '{agent_name}'")
+            elif not isinstance(raw_plan["agent_instructions"].get(agent_name), dict):
+                errors.append(f"no instructions for '{agent_name}'")
+
+        if raw_plan["execution_strategy"] not in ("sequential", "parallel", "hybrid"):
+            errors.append(
+                f"invalid execution_strategy '{raw_plan['execution_strategy']}'"
+            )
+
+        for missing in raw_plan["missing_capabilities"]:
+            if not isinstance(missing, dict) or not missing.get("capability"):
+                errors.append("missing_capabilities entries need a 'capability'")
+                break
+
+        confidence = raw_plan.get("confidence", 0.8)
+        if not isinstance(confidence, (int, float)) or not 0 <= confidence <= 1:
+            errors.append(f"confidence out of range: {confidence}")
+
+        return errors
+
+    def _build_registry_digest(self, available_agents: List[str]) -> List[Dict]:
+        """Compact one-line-per-agent view of the registry for prompts."""
+        from core.registry_singleton import get_shared_registry
+
+        registry = get_shared_registry()
+
+        digest = []
+        for agent_name in available_agents:
+            agent_info = registry.get_agent(agent_name)
+            if agent_info:
+                digest.append(agent_digest(agent_name, agent_info))
+        return digest
+
+    def _record_planning_path(self, plan: Dict, path: str, started: float) -> Dict:
+        """Tag the plan with the path taken and its latency, and keep totals."""
+        latency = time.perf_counter() - started
+        plan["planning_path"] = path
+        plan["planning_latency"] = round(latency, 3)
+
+        stats = self.planning_stats.setdefault(
+            path, {"count": 0, "total_latency": 0.0, "avg_latency": 0.0}
+        )
+        stats["count"] += 1
+        stats["total_latency"] += latency
+        stats["avg_latency"] = round(stats["total_latency"] / stats["count"], 3)
+
+        print(f"DEBUG: Planning path '{path}' took {latency:.2f}s")
+        return plan
+
+    def _describe_files(self, files: List[Dict]) -> List[str]:
+        """Prompt lines describing uploaded files (columns, samples, text)."""
+        context_parts = []
 
         if files:
             for file in files:
@@ -141,6 +418,14 @@ class AIWorkflowPlanner:
                             f"Data structure: {str(content.get('data', {}))[:800]}"
                         )
 
+        return context_parts
+
+    async def _analyze_request_context(self, request: str, files: List[Dict]) -> Dict:
+        """GPT-4 analyzes the request context with actual file data."""
+
+        # Build context with real file data
+        context_parts = [f"USER REQUEST: {request}"] + self._describe_files(files)
+
         prompt = f"""
         Analyze this request with the actual data provided:
         
@@ -185,7 +470,7 @@ class AIWorkflowPlanner:
         }}
         """
 
-        response = self.openai_client.chat.completions.create(
+        response = await self.llm.openai_chat(
             model=ORCHESTRATOR_MODEL,
             messages=[{"role": "user", "content": prompt}],
             response_format={"type": "json_object"},
@@ -193,7 +478,7 @@ class AIWorkflowPlanner:
         )
 
         try:
-            return json.loads(response.choices[0].message.content)
+            return json.loads(response)
         except json.JSONDecodeError:
             return {
                 "user_goal": "Process user request",
@@ -201,30 +486,6 @@ class AIWorkflowPlanner:
                 "processing_requirements": ["analyze_data", "generate_output"],
             }
 
-    async def _plan_workflow_strategy(
-        self,
-        request: str,
-        context_analysis: Dict,
-        available_agents: List[str],
-        available_tools: List[str],
-    ) -> Dict:
-        """Pure natural language workflow analysis without structural constraints."""
-
-        # Phase 1: Completely unconstrained reasoning
-        workflow_analysis = await self._analyze_workflow_naturally(
-            request, context_analysis
-        )
-
-        # Phase 2: Extract structure from natural analysis
-        workflow_structure = await self._extract_workflow_structure(workflow_analysis)
-
-        # Phase 3: Match to agents
-        agent_assignments = await self._match_structure_to_agents(
-            workflow_structure, available_agents
-        )
-
-        return agent_assignments
-
     async def _analyze_workflow_naturally(
         self, request: str, context_analysis: Dict
     ) -> str:
@@ -234,21 +495,19 @@ class AIWorkflowPlanner:
         Analyze this request and explain what needs to happen:
 
         REQUEST: {request}
-        CONTEXT: {json.dumps(context_analysis, indent=2)}
+        CONTEXT: {fit_section(context_analysis, "context")}
 
         Explain the processing flow needed to fulfill this request. 
         Think about what transformations are required to get from input to desired output.
         Be as detailed as necessary - don't worry about structure or format.
         """
 
-        response = self.openai_client.chat.completions.create(
+        natural_analysis = await self.llm.openai_chat(
             model=ORCHESTRATOR_MODEL,
             messages=[{"role": "user", "content": prompt}],
             max_completion_tokens=ORCHESTRATOR_MAX_TOKENS,
         )
 
-        natural_analysis = response.choices[0].message.content
-
         # DEBUG: Show the natural reasoning
         print(f"\n🧠 NATURAL WORKFLOW ANALYSIS:")
         print(f"{natural_analysis}")
@@ -283,7 +542,7 @@ class AIWorkflowPlanner:
         }}
         """
 
-        response = self.openai_client.chat.completions.create(
+        response = await self.llm.openai_chat(
             model=ORCHESTRATOR_MODEL,
             messages=[{"role": "user", "content": prompt}],
             response_format={"type": "json_object"},
@@ -291,7 +550,7 @@ class AIWorkflowPlanner:
         )
 
         try:
-            structure = json.loads(response.choices[0].message.content)
+            structure = json.loads(response)
 
             # DEBUG: Show extracted structure
             print(f"\n📋 EXTRACTED WORKFLOW STRUCTURE:")
@@ -320,20 +579,25 @@ class AIWorkflowPlanner:
             }
 
     async def _match_structure_to_agents(
-        self, workflow_structure: Dict, available_agents: List[str]
+        self,
+        workflow_structure: Dict,
+        available_agents: List[str],
+        agent_details: Dict = None,
     ) -> Dict:
         """Match extracted operations to available agents."""
 
-        agent_details = await self._get_agent_details(available_agents)
+        if agent_details is None:
+            agent_details = await self._get_agent_details(available_agents)
 
+        budget = PromptBudget()
         prompt = f"""
         Match these processing operations to available agents:
 
         OPERATIONS:
-        {json.dumps(workflow_structure, indent=2)}
+        {budget.section("plan", workflow_structure)}
 
         AVAILABLE AGENTS:
-        {json.dumps(agent_details, indent=2)}
+        {budget.section("registry", list(agent_details.values()))}
 
         For each operation, determine if any available agent can handle it.
         Focus on capability alignment, not naming patterns.
@@ -357,7 +621,7 @@ class AIWorkflowPlanner:
         }}
         """
 
-        response = self.openai_client.chat.completions.create(
+        response = await self.llm.openai_chat(
             model=ORCHESTRATOR_MODEL,
             messages=[{"role": "user", "content": prompt}],
             response_format={"type": "json_object"},
@@ -365,7 +629,7 @@ class AIWorkflowPlanner:
         )
 
         try:
-            matching_result = json.loads(response.choices[0].message.content)
+            matching_result = json.loads(response)
         except json.JSONDecodeError:
             matching_result = {"agent_assignments": [], "missing_capabilities": []}
 
@@ -425,7 +689,7 @@ class AIWorkflowPlanner:
         Analyze this request to determine what capabilities are actually needed:
 
         REQUEST: {request}
-        CONTEXT: {json.dumps(context_analysis, indent=2)}
+        CONTEXT: {fit_section(context_analysis, "context")}
 
         Think step-by-step about what processing is actually required:
         - Simple requests might need only 1 capability
@@ -456,7 +720,7 @@ class AIWorkflowPlanner:
         Base the number of steps on the actual request complexity, not any predetermined pattern.
         """
 
-        response = self.openai_client.chat.completions.create(
+        response = await self.llm.openai_chat(
             model=ORCHESTRATOR_MODEL,
             messages=[{"role": "user", "content": prompt}],
             response_format={"type": "json_object"},
@@ -464,7 +728,7 @@ class AIWorkflowPlanner:
         )
 
         try:
-            result = json.loads(response.choices[0].message.content)
+            result = json.loads(response)
             return result.get("capability_requirements", [])
         except json.JSONDecodeError:
             # Fallback for any parsing issues
@@ -480,7 +744,7 @@ class AIWorkflowPlanner:
             ]
 
     async def _get_agent_details(self, available_agents: List[str]) -> Dict:
-        """Get detailed agent information from registry for semantic analysis."""
+        """Get compact agent digests from the registry for semantic analysis."""
 
         # Import registry to get agent details
         from core.registry_singleton import get_shared_registry
@@ -491,16 +755,7 @@ class AIWorkflowPlanner:
         for agent_name in available_agents:
             agent_info = registry.get_agent(agent_name)
             if agent_info:
-                agent_details[agent_name] = {
-                    "name": agent_name,
-                    "description": agent_info.get("description", ""),
-                    "capabilities": agent_info.get("uses_tools", []),
-                    "input_schema": agent_info.get("input_schema", {}),
-                    "output_schema": agent_info.get("output_schema", {}),
-                    "tags": agent_info.get("tags", []),
-                    "execution_count": agent_info.get("execution_count", 0),
-                    "status": agent_info.get("status", "unknown"),
-                }
+                agent_details[agent_name] = agent_digest(agent_name, agent_info)
 
         return agent_details
 
@@ -509,14 +764,15 @@ class AIWorkflowPlanner:
     ) -> Dict:
         """Use AI to semantically match capabilities to agents."""
 
+        budget = PromptBudget()
         prompt = f"""
         You are an intelligent agent selector. Match capability requirements to available agents based on semantic understanding, NOT keyword matching.
         
         CAPABILITY REQUIREMENTS:
-        {json.dumps(capability_requirements, indent=2)}
+        {budget.section("context", capability_requirements)}
         
         AVAILABLE AGENTS:
-        {json.dumps(agent_details, indent=2)}
+        {budget.section("registry", list(agent_details.values()))}
         
         For each capability requirement, analyze:
         1. Does any agent's description semantically align with what's needed?
@@ -553,7 +809,7 @@ class AIWorkflowPlanner:
         }}
         """
 
-        response = self.openai_client.chat.completions.create(
+        response = await self.llm.openai_chat(
             model=ORCHESTRATOR_MODEL,
             messages=[{"role": "user", "content": prompt}],
             response_format={"type": "json_object"},
@@ -561,7 +817,7 @@ class AIWorkflowPlanner:
         )
 
         try:
-            return json.loads(response.choices[0].message.content)
+            return json.loads(response)
         except json.JSONDecodeError:
             # Fallback with empty assignments
             return {
@@ -644,11 +900,12 @@ class AIWorkflowPlanner:
         if len(agent_sequence) <= 1:
             return {"flow_type": "single_step", "steps": []}
 
+        budget = PromptBudget()
         prompt = f"""
         Design data flow for this multi-agent workflow:
         
-        WORKFLOW: {json.dumps(workflow_strategy, indent=2)}
-        CONTEXT: {json.dumps(context_analysis, indent=2)}
+        WORKFLOW: {budget.section("plan", workflow_strategy)}
+        CONTEXT: {budget.section("context", context_analysis)}
         
         AGENT SEQUENCE: {agent_sequence}
         
@@ -685,7 +942,7 @@ class AIWorkflowPlanner:
         }}
         """
 
-        response = self.openai_client.chat.completions.create(
+        response = await self.llm.openai_chat(
             model=ORCHESTRATOR_MODEL,
             messages=[{"role": "user", "content": prompt}],
             response_format={"type": "json_object"},
@@ -693,7 +950,7 @@ class AIWorkflowPlanner:
         )
 
         try:
-            return json.loads(response.choices[0].message.content)
+            return json.loads(response)
         except json.JSONDecodeError:
             return {
                 "flow_type": "sequential",
@@ -702,69 +959,106 @@ class AIWorkflowPlanner:
             }
 
     async def _create_agent_instructions(
-        self, workflow_strategy: Dict, data_flow_plan: Dict, original_request: str
+        self,
+        workflow_strategy: Dict,
+        data_flow_plan: Dict,
+        original_request: str,
+        semaphore: asyncio.Semaphore = None,
     ) -> Dict:
         """Create specific instructions for each agent in the workflow."""
 
         agent_sequence = workflow_strategy.get("agent_sequence", [])
         step_descriptions = workflow_strategy.get("step_descriptions", [])
 
-        agent_instructions = {}
-
+        # Each agent's instructions are independent - issue them together
+        graph = LLMTaskGraph(semaphore=semaphore)
         for i, agent_name in enumerate(agent_sequence):
-            instruction_prompt = f"""
-            Create specific instructions for {agent_name} in this workflow:
-            
-            ORIGINAL REQUEST: {original_request}
-            FULL WORKFLOW: {agent_sequence}
-            AGENT POSITION: Step {i+1} of {len(agent_sequence)}
-            STEP DESCRIPTION: {step_descriptions[i] if i < len(step_descriptions) else 'Process data'}
-            
-            WORKFLOW CONTEXT: {json.dumps(workflow_strategy, indent=2)}
-            DATA FLOW: {json.dumps(data_flow_plan, indent=2)}
-            
-            Create specific instructions for this agent that include:
-            1. **PRIMARY TASK**: What is this agent's main responsibility?
-            2. **INPUT EXPECTATIONS**: What data/format will this agent receive?
-            3. **PROCESSING FOCUS**: What specific processing should be emphasized?
-            4. **OUTPUT REQUIREMENTS**: How should results be formatted for next step?
-            5. **CONTEXT AWARENESS**: How does this fit into the larger workflow goal?
-            
-            Return JSON:
-            {{
-                "primary_task": "specific task for this agent",
-                "input_expectations": "what this agent should expect to receive",
-                "processing_focus": "key areas to focus on",
-                "output_requirements": "how to format results",
-                "context_awareness": "role in larger workflow",
-                "success_criteria": "how to know if this step succeeded"
-            }}
-            """
-
-            response = self.openai_client.chat.completions.create(
-                model=ORCHESTRATOR_MODEL,
-                messages=[{"role": "user", "content": instruction_prompt}],
-                response_format={"type": "json_object"},
-                max_completion_tokens=800,
+            graph.add(
+                f"step_{i}",
+                lambda r, i=i, name=agent_name: (
+                    self._create_single_agent_instructions(
+                        i,
+                        name,
+                        agent_sequence,
+                        step_descriptions,
+                        workflow_strategy,
+                        data_flow_plan,
+                        original_request,
+                    )
+                ),
             )
+        results = await graph.run()
 
-            try:
-                agent_instructions[agent_name] = json.loads(
-                    response.choices[0].message.content
-                )
-            except json.JSONDecodeError:
-                agent_instructions[agent_name] = {
-                    "primary_task": f"Process data for {agent_name}",
-                    "context_awareness": f"Step {i+1} in workflow",
-                }
+        # Preserve sequence order (later duplicates win, as before)
+        agent_instructions = {}
+        for i, agent_name in enumerate(agent_sequence):
+            agent_instructions[agent_name] = results[f"step_{i}"]
 
         return agent_instructions
 
+    async def _create_single_agent_instructions(
+        self,
+        i: int,
+        agent_name: str,
+        agent_sequence: List[str],
+        step_descriptions: List[str],
+        workflow_strategy: Dict,
+        data_flow_plan: Dict,
+        original_request: str,
+    ) -> Dict:
+        """Create instructions for one agent at position i of the workflow."""
+        budget = PromptBudget()
+        instruction_prompt = f"""
+        Create specific instructions for {agent_name} in this workflow:
+        
+        ORIGINAL REQUEST: {original_request}
+        FULL WORKFLOW: {agent_sequence}
+        AGENT POSITION: Step {i+1} of {len(agent_sequence)}
+        STEP DESCRIPTION: {step_descriptions[i] if i < len(step_descriptions) else 'Process data'}
+        
+        WORKFLOW CONTEXT: {budget.section("plan", workflow_strategy)}
+        DATA FLOW: {budget.section("context", data_flow_plan)}
+        
+        Create specific instructions for this agent that include:
+        1. **PRIMARY TASK**: What is this agent's main responsibility?
+        2. **INPUT EXPECTATIONS**: What data/format will this agent receive?
+        3. **PROCESSING FOCUS**: What specific processing should be emphasized?
+        4. **OUTPUT REQUIREMENTS**: How should results be formatted for next step?
+        5. **CONTEXT AWARENESS**: How does this fit into the larger workflow goal?
+        
+        Return JSON:
+        {{
+            "primary_task": "specific task for this agent",
+            "input_expectations": "what this agent should expect to receive",
+            "processing_focus": "key areas to focus on",
+            "output_requirements": "how to format results",
+            "context_awareness": "role in larger workflow",
+            "success_criteria": "how to know if this step succeeded"
+        }}
+        """
+
+        response = await self.llm.openai_chat(
+            model=ORCHESTRATOR_MODEL,
+            messages=[{"role": "user", "content": instruction_prompt}],
+            response_format={"type": "json_object"},
+            max_completion_tokens=800,
+        )
+
+        try:
+            return json.loads(response)
+        except json.JSONDecodeError:
+            return {
+                "primary_task": f"Process data for {agent_name}",
+                "context_awareness": f"Step {i+1} in workflow",
+            }
+
     def get_planning_metadata(self) -> Dict:
         """Get metadata about the planning process."""
         return {
             "planner_type": "ai_driven",
             "model_used": ORCHESTRATOR_MODEL,
+            "fast_plan_default": FAST_PLAN_MODE,
+            "planning_paths": self.planning_stats,
             "planning_features": [
                 "intelligent_context_analysis",
                 "strategic_workflow_planning",
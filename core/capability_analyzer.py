@@ -5,16 +5,17 @@ File: core/capability_analyzer.py (ENHANCED VERSION)
 
 import json
 from typing import Dict, List, Any
-from config import OPENAI_API_KEY, ORCHESTRATOR_MODEL
-import openai
+from config import ORCHESTRATOR_MODEL
+from core.llm_gateway import get_llm_gateway
 from core.registry_singleton import get_shared_registry
+from core.prompt_budget import PromptBudget, registry_digest
 
 
 class CapabilityAnalyzer:
     """GPT-4 analyzes requests and intelligently matches against existing agents"""
 
     def __init__(self):
-        self.openai_client = openai.OpenAI(api_key=OPENAI_API_KEY)
+        self.llm = get_llm_gateway()
 
     async def analyze_agent_compatibility(
         self, request: str, proposed_plan: Dict, files: List[Dict]
@@ -30,6 +31,13 @@ class CapabilityAnalyzer:
 
         # Extract proposed agents and their details
         proposed_agents = proposed_plan.get("agents", [])
+
+        # Registry section: the proposed agents plus the best local matches
+        shortlist = registry.shortlist_agents(request)
+        shortlist += [name for name in proposed_agents if name not in shortlist]
+        candidate_agents = {
+            name: all_agents[name] for name in shortlist if name in all_agents
+        }
         agent_details = {}
 
         for agent_name in proposed_agents:
@@ -54,17 +62,18 @@ class CapabilityAnalyzer:
                     }
                 )
 
+        budget = PromptBudget()
         analysis_prompt = f"""
         INTELLIGENT AGENT COMPATIBILITY ANALYSIS
         
         USER REQUEST: "{request}"
-        FILE CONTEXT: {json.dumps(file_context, indent=2)}
+        FILE CONTEXT: {budget.section("file_context", file_context)}
         
         PROPOSED WORKFLOW PLAN:
-        {json.dumps(proposed_plan, indent=2)}
+        {budget.section("plan", proposed_plan)}
         
-        COMPLETE AGENT REGISTRY:
-        {json.dumps(all_agents, indent=2)}
+        AGENT REGISTRY (name, description, tags, input/output types):
+        {budget.section("registry", registry_digest(candidate_agents))}
         
         ANALYSIS OBJECTIVES:
         1. COMPATIBILITY ASSESSMENT: Are the proposed agents actually suitable for this specific request?
@@ -124,13 +133,13 @@ class CapabilityAnalyzer:
         }}
         """
 
-        response = self.openai_client.chat.completions.create(
+        response = await self.llm.openai_chat(
             model=ORCHESTRATOR_MODEL,
             messages=[{"role": "user", "content": analysis_prompt}],
             response_format={"type": "json_object"},
         )
 
-        return json.loads(response.choices[0].message.content)
+        return json.loads(response)
 
     async def analyze_capability_gaps(
         self, request: str, current_plan: Dict, files: List[Dict]
@@ -178,13 +187,17 @@ class CapabilityAnalyzer:
 
         registry = get_shared_registry()
         all_agents = registry.agents.get("agents", {})
+        candidate_agents = {
+            name: all_agents[name] for name in registry.shortlist_agents(request)
+        }
 
+        budget = PromptBudget()
         analysis_prompt = f"""
         CAPABILITY GAP ANALYSIS - NO SUITABLE AGENTS FOUND
         
         USER REQUEST: "{request}"
-        AVAILABLE AGENTS: {json.dumps(all_agents, indent=2)}
-        FILE CONTEXT: {json.dumps([f.get("structure") for f in files] if files else [], indent=2)}
+        AVAILABLE AGENTS: {budget.section("registry", registry_digest(candidate_agents))}
+        FILE CONTEXT: {budget.section("file_context", [f.get("structure") for f in files] if files else [])}
         
         Since no agents were initially selected, analyze what capabilities are needed
         and determine if any existing agents could actually handle this request.
@@ -208,10 +221,10 @@ class CapabilityAnalyzer:
         }}
         """
 
-        response = self.openai_client.chat.completions.create(
+        response = await self.llm.openai_chat(
             model=ORCHESTRATOR_MODEL,
             messages=[{"role": "user", "content": analysis_prompt}],
             response_format={"type": "json_object"},
         )
 
-        return json.loads(response.choices[0].message.content)
+        return json.loads(response)
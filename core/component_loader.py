@@ -0,0 +1,248 @@
+"""
+Component Loader - Shared cache of loaded agent and tool callables
+Location: core/component_loader.py
+
+Pipeline steps, the workflow engine, tool tests and registration each used
+to spec_from_file_location + exec_module a component's file on every use
+and then probe getattr for its function name. get_component_loader() is one
+process-wide cache instead: a module is executed once per version of its
+source and the resolved function is kept, so a repeated step costs a dict
+lookup.
+
+An entry is current when:
+- the caller's registry version matches the one it was loaded for (no I/O),
+- or the file's (mtime, size) is unchanged,
+- or the file's content hash is unchanged (touched but not edited).
+
+Registration changes an entry's version whenever its code changes; edits
+made outside the registry are picked up through file watcher events when
+the watcher runs, or by calling invalidate().
+"""
+
+import ast
+import hashlib
+import importlib.util
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+
+from config import (
+    COMPONENT_LOADER_CACHE_SIZE,
+    GENERATED_AGENTS_DIR,
+    GENERATED_TOOLS_DIR,
+    PREBUILT_AGENTS_DIR,
+    PREBUILT_TOOLS_DIR,
+)
+from core.registry_watcher import subscribe_file_changes
+
+
+class MissingFunctionError(AttributeError):
+    """The component's module defines none of the requested function names."""
+
+
+class LoadedComponent:
+    """A component module executed from one version of its source."""
+
+    __slots__ = ("path", "module", "digest", "stat_key", "version", "functions")
+
+    def __init__(self, path: str, module, digest: str, stat_key: tuple):
+        self.path = path
+        self.module = module
+        self.digest = digest
+        self.stat_key = stat_key
+        self.version = None
+        self.functions = {}  # candidate names tuple -> (name, callable)
+
+
+class ComponentLoader:
+    """Loads component files once per source version and resolves their functions."""
+
+    def __init__(self, max_entries: int = COMPONENT_LOADER_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # abs path -> LoadedComponent, oldest load first
+        self._lock = threading.Lock()  # Guards _entries and _path_locks
+        self._path_locks = {}  # abs path -> Lock, so a file is executed once
+        self._absolute = {}  # path as given -> abs path (abspath is the hot path's cost)
+        self._stats = {"hits": 0, "loads": 0, "invalidations": 0}
+
+    def load(
+        self,
+        path: str,
+        names: List[str],
+        version: str = None,
+        module_name: str = None,
+    ) -> Callable:
+        """
+        The first of `names` the component at `path` defines. Raises
+        MissingFunctionError if it defines none of them, or whatever
+        executing the module raised.
+        """
+        return self.resolve(path, names, version, module_name)[1]
+
+    def resolve(
+        self,
+        path: str,
+        names: List[str],
+        version: str = None,
+        module_name: str = None,
+    ) -> tuple:
+        """(function name, callable), see load()."""
+        absolute = self._absolute.get(path)
+        if absolute is None:
+            absolute = self._absolute[path] = os.path.abspath(path)
+        path = absolute
+        entry = self._current(path, version)
+        if entry is None:
+            with self._path_lock(path):
+                entry = self._current(path, version)
+                if entry is None:
+                    entry = self._execute(path, version, module_name)
+        else:
+            self._stats["hits"] += 1
+
+        key = tuple(names)
+        resolved = entry.functions.get(key)
+        if resolved is None:
+            resolved = self._find_function(entry, names)
+            entry.functions[key] = resolved
+        return resolved
+
+    def invalidate(self, path: str):
+        """Forget a component so its next use executes the file again."""
+        with self._lock:
+            if self._entries.pop(os.path.abspath(path), None) is not None:
+                self._stats["invalidations"] += 1
+
+    def on_files_changed(self, paths):
+        """File watcher callback: drop components whose file changed."""
+        for path in paths:
+            self.invalidate(path)
+
+    def get_stats(self) -> Dict:
+        stats = dict(self._stats)
+        stats["cached"] = len(self._entries)
+        stats["max_entries"] = self.max_entries
+        return stats
+
+    def _current(self, path: str, version: Optional[str]) -> Optional[LoadedComponent]:
+        entry = self._entries.get(path)
+        if entry is None:
+            return None
+        if version is not None and entry.version == version:
+            return entry
+
+        try:
+            st = os.stat(path)
+        except OSError:
+            self.invalidate(path)
+            return None
+        stat_key = (st.st_mtime_ns, st.st_size)
+        if entry.stat_key != stat_key:
+            with open(path, "rb") as f:
+                digest = hashlib.sha256(f.read()).hexdigest()
+            if digest != entry.digest:
+                return None
+            entry.stat_key = stat_key
+        if version is not None:
+            entry.version = version
+        return entry
+
+    def _execute(
+        self, path: str, version: Optional[str], module_name: Optional[str]
+    ) -> LoadedComponent:
+        st = os.stat(path)
+        with open(path, "rb") as f:
+            source = f.read()
+
+        name = module_name or f"{os.path.splitext(os.path.basename(path))[0]}_module"
+        spec = importlib.util.spec_from_file_location(name, path)
+        if spec is None:
+            raise ImportError(f"Could not create module spec for {path}")
+        module = importlib.util.module_from_spec(spec)
+        # Execute the bytes that were hashed, not a second read of the file
+        exec(compile(source, path, "exec"), module.__dict__)
+
+        entry = LoadedComponent(
+            path,
+            module,
+            hashlib.sha256(source).hexdigest(),
+            (st.st_mtime_ns, st.st_size),
+        )
+        entry.version = version
+        with self._lock:
+            self._entries[path] = entry
+            self._entries.move_to_end(path)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._stats["loads"] += 1
+        return entry
+
+    def _find_function(self, entry: LoadedComponent, names: List[str]) -> tuple:
+        for name in names:
+            function = getattr(entry.module, name, None)
+            if callable(function):
+                return name, function
+        available = [
+            name
+            for name in dir(entry.module)
+            if not name.startswith("_") and callable(getattr(entry.module, name))
+        ]
+        raise MissingFunctionError(
+            f"No function found in {os.path.basename(entry.path)}. "
+            f"Tried: {', '.join(names)}; available: {', '.join(available) or 'none'}"
+        )
+
+    def _path_lock(self, path: str) -> threading.Lock:
+        with self._lock:
+            lock = self._path_locks.get(path)
+            if lock is None:
+                lock = self._path_locks[path] = threading.Lock()
+            return lock
+
+
+def check_source(path: str, names: List[str]) -> str:
+    """
+    The first of `names` the component at `path` defines at module level,
+    found by parsing its source without executing it (for components that
+    only ever run in a sandbox worker). Raises SyntaxError or
+    MissingFunctionError.
+    """
+    with open(path, "rb") as f:
+        tree = ast.parse(f.read(), filename=path)
+    defined = set()
+    for node in tree.body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            defined.add(node.name)
+        elif isinstance(node, ast.Assign):
+            defined.update(t.id for t in node.targets if isinstance(t, ast.Name))
+    for name in names:
+        if name in defined:
+            return name
+    raise MissingFunctionError(
+        f"No function found in {os.path.basename(path)}. Tried: {', '.join(names)}"
+    )
+
+
+# Global function to get the component loader
+_loader = None
+_loader_lock = threading.Lock()
+
+
+def get_component_loader() -> ComponentLoader:
+    """Get the shared component loader - thread-safe."""
+    global _loader
+    if _loader is None:
+        with _loader_lock:
+            if _loader is None:
+                _loader = ComponentLoader()
+                subscribe_file_changes(
+                    _loader.on_files_changed,
+                    [
+                        GENERATED_AGENTS_DIR,
+                        GENERATED_TOOLS_DIR,
+                        PREBUILT_AGENTS_DIR,
+                        PREBUILT_TOOLS_DIR,
+                    ],
+                )
+    return _loader
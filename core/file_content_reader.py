@@ -6,6 +6,7 @@ This is CRITICAL for the orchestrator to see real data
 
 import os
 import json
+import hashlib
 import pandas as pd
 import PyPDF2
 from typing import Dict, List, Any, Optional
@@ -416,6 +417,51 @@ class FileContentReader:
 
         return False
 
+    def schema_signature(self, file: Dict) -> Dict:
+        """
+        Shape of a read file without its values: structure plus column
+        names/dtypes for tables and the key layout for JSON/YAML.
+        """
+        structure = file.get("structure")
+        content = file.get("content")
+        signature = {
+            "structure": structure,
+            "read_success": bool(file.get("read_success")),
+        }
+        if not isinstance(content, dict):
+            return signature
+
+        if structure == "tabular":
+            signature["columns"] = [str(c) for c in content.get("columns", [])]
+            signature["dtypes"] = {
+                str(col): dtype for col, dtype in content.get("dtypes", {}).items()
+            }
+        elif structure == "json":
+            signature["shape"] = self._shape_only(content.get("structure_info"))
+        elif structure == "yaml":
+            signature["shape"] = self._shape_only(
+                self._analyze_json_structure(content.get("data"))
+            )
+        return signature
+
+    def schema_fingerprint(self, files: List[Dict]) -> str:
+        """Stable hash of schema_signature for every file, in order."""
+        signatures = [self.schema_signature(f) for f in files or []]
+        encoded = json.dumps(signatures, sort_keys=True, default=str)
+        return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+    def _shape_only(self, structure_info: Any) -> Any:
+        """Drop values and sizes from _analyze_json_structure output."""
+        if isinstance(structure_info, dict):
+            return {
+                k: self._shape_only(v)
+                for k, v in structure_info.items()
+                if k not in ("value", "length", "key_count")
+            }
+        if isinstance(structure_info, list):
+            return [self._shape_only(v) for v in structure_info]
+        return structure_info
+
     def process_all_files(self, files: List[Dict]) -> List[Dict]:
         """
         Process all uploaded files and read their contents.
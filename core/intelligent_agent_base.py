@@ -5,10 +5,9 @@ Each agent has Claude reasoning capabilities
 
 import json
 from typing import Dict, Any, List, Optional
-from anthropic import Anthropic
-import os
 
 from config import CLAUDE_MODEL
+from core.llm_gateway import get_llm_gateway
 
 
 class IntelligentAgent:
@@ -18,7 +17,7 @@ class IntelligentAgent:
         self.name = name
         self.purpose = purpose
         self.tools = tools or []
-        self.claude = Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
+        self.llm = get_llm_gateway()
 
     async def execute(self, state: Dict) -> Dict:
         """Execute with intelligent reasoning"""
@@ -60,13 +59,13 @@ class IntelligentAgent:
         Be specific and concise.
         """
 
-        response = self.claude.messages.create(
+        response = await self.llm.claude_message(
             model=CLAUDE_MODEL,
             max_tokens=500,
             messages=[{"role": "user", "content": prompt}],
         )
 
-        return {"analysis": response.content[0].text}
+        return {"analysis": response}
 
     async def process_with_reasoning(self, state: Dict, analysis: Dict) -> Dict:
         """Process data with Claude's guidance"""
@@ -82,14 +81,14 @@ class IntelligentAgent:
         Provide the processed result.
         """
 
-        response = self.claude.messages.create(
+        response = await self.llm.claude_message(
             model=CLAUDE_MODEL,
             max_tokens=1000,
             messages=[{"role": "user", "content": prompt}],
         )
 
         return {
-            "processed_data": response.content[0].text,
+            "processed_data": response,
             "reasoning": analysis["analysis"],
         }
 
@@ -139,14 +138,14 @@ class DataAnalysisAgent(IntelligentAgent):
             4. Potential issues
             """
 
-            response = self.claude.messages.create(
+            response = await self.llm.claude_message(
                 model=CLAUDE_MODEL,
                 max_tokens=1500,
                 messages=[{"role": "user", "content": prompt}],
             )
 
             return {
-                "processed_data": response.content[0].text,
+                "processed_data": response,
                 "reasoning": "Analyzed CSV data structure and patterns",
             }
 
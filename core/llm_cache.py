@@ -0,0 +1,187 @@
+"""
+LLM Response Cache - Content-addressed cache for provider responses
+Location: core/llm_cache.py
+
+Bounded in-memory LRU with an optional zstd-compressed on-disk tier, keyed on
+a hash of everything that determines the provider's answer.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+from config import (
+    LLM_CACHE_MAX_ENTRIES,
+    LLM_CACHE_DISK_ENABLED,
+    LLM_CACHE_DIR,
+    LLM_CACHE_TTL_SECONDS,
+    LLM_CACHE_COMPRESSION_LEVEL,
+)
+
+
+# Request fields that determine the response. model/messages/temperature/
+# response_format are the core; provider, system and max_tokens are
+# included so different call shapes never collide.
+REQUEST_KEY_FIELDS = (
+    "provider",
+    "model",
+    "messages",
+    "system",
+    "temperature",
+    "response_format",
+    "max_tokens",
+)
+
+
+def request_fingerprint(request: Dict) -> str:
+    """Stable content hash of a normalized gateway request."""
+    material = {field: request.get(field) for field in REQUEST_KEY_FIELDS}
+    encoded = json.dumps(material, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """Two-tier (memory LRU + disk) cache for LLM responses."""
+
+    def __init__(
+        self,
+        max_entries: int = LLM_CACHE_MAX_ENTRIES,
+        disk_enabled: bool = LLM_CACHE_DISK_ENABLED,
+        cache_dir: str = LLM_CACHE_DIR,
+        ttl_seconds: float = LLM_CACHE_TTL_SECONDS,
+    ):
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        self.ttl_seconds = ttl_seconds
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "stores": 0,
+            "evictions": 0,
+            "expired": 0,
+        }
+
+        self.disk_enabled = disk_enabled and zstandard is not None
+        if disk_enabled and zstandard is None:
+            print("DEBUG: zstandard not installed - LLM disk cache disabled")
+        if self.disk_enabled:
+            os.makedirs(self.cache_dir, exist_ok=True)
+
+    def make_key(self, request: Dict) -> str:
+        """Cache key for a normalized gateway request."""
+        return request_fingerprint(request)
+
+    def get(self, key: str) -> Optional[str]:
+        """Look up a response, promoting disk hits into memory."""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if now - entry["created_at"] <= self.ttl_seconds:
+                    self._memory.move_to_end(key)
+                    self._stats["hits"] += 1
+                    self._stats["memory_hits"] += 1
+                    return entry["response"]
+                del self._memory[key]
+                self._stats["expired"] += 1
+
+        entry = self._read_disk(key, now) if self.disk_enabled else None
+
+        with self._lock:
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+            self._stats["hits"] += 1
+            self._stats["disk_hits"] += 1
+            self._remember(key, entry)
+        return entry["response"]
+
+    def set(self, key: str, response: str):
+        """Store a response in memory and, if enabled, on disk."""
+        if not response:
+            return
+
+        entry = {"response": response, "created_at": time.time()}
+        with self._lock:
+            self._remember(key, entry)
+            self._stats["stores"] += 1
+
+        if self.disk_enabled:
+            self._write_disk(key, entry)
+
+    def clear(self):
+        """Drop the in-memory tier (disk entries expire via TTL)."""
+        with self._lock:
+            self._memory.clear()
+
+    def get_stats(self) -> Dict:
+        """Hit/miss counters plus current tier sizes."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._memory)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 3) if lookups else 0.0
+        stats["disk_enabled"] = self.disk_enabled
+        return stats
+
+    def _remember(self, key: str, entry: Dict):
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json.zst")
+
+    def _read_disk(self, key: str, now: float) -> Optional[Dict]:
+        path = self._disk_path(key)
+        try:
+            with open(path, "rb") as f:
+                raw = zstandard.ZstdDecompressor().decompress(f.read())
+            entry = json.loads(raw)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"DEBUG: Discarding unreadable LLM cache entry {key[:12]}: {e}")
+            self._remove_disk(path)
+            return None
+
+        if now - entry.get("created_at", 0) > self.ttl_seconds:
+            with self._lock:
+                self._stats["expired"] += 1
+            self._remove_disk(path)
+            return None
+        return entry
+
+    def _write_disk(self, key: str, entry: Dict):
+        path = self._disk_path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            compressor = zstandard.ZstdCompressor(level=LLM_CACHE_COMPRESSION_LEVEL)
+            payload = compressor.compress(json.dumps(entry).encode("utf-8"))
+            temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(temp_path, "wb") as f:
+                f.write(payload)
+            os.replace(temp_path, path)
+        except Exception as e:
+            print(f"DEBUG: Failed to persist LLM cache entry {key[:12]}: {e}")
+
+    def _remove_disk(self, path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
@@ -0,0 +1,252 @@
+"""
+LLM Client Registry - Process-wide pooled provider clients
+Location: core/llm_clients.py
+
+One tuned httpx pool (keep-alive, bounded connections) shared by the OpenAI
+and Anthropic clients. Async clients live on a dedicated background event
+loop, so connections survive across Flask's per-request asyncio.run() loops
+instead of being re-handshaked for every request. Supports optional
+connection pre-warm and closes everything at interpreter exit.
+"""
+
+import asyncio
+import atexit
+import threading
+import time
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+import httpx
+import openai
+from anthropic import Anthropic, AsyncAnthropic
+
+from config import (
+    OPENAI_API_KEY,
+    ANTHROPIC_API_KEY,
+    LLM_HTTP_MAX_CONNECTIONS,
+    LLM_HTTP_MAX_KEEPALIVE,
+    LLM_HTTP_KEEPALIVE_EXPIRY,
+    LLM_HTTP_CONNECT_TIMEOUT,
+    LLM_HTTP_READ_TIMEOUT,
+)
+
+PROVIDERS = ("openai", "anthropic")
+
+
+def _http_limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=LLM_HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=LLM_HTTP_MAX_KEEPALIVE,
+        keepalive_expiry=LLM_HTTP_KEEPALIVE_EXPIRY,
+    )
+
+
+def _http_timeout() -> httpx.Timeout:
+    return httpx.Timeout(LLM_HTTP_READ_TIMEOUT, connect=LLM_HTTP_CONNECT_TIMEOUT)
+
+
+class LLMClientRegistry:
+    """Owns every provider client and the connection pools behind them."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sync_http = None
+        self._sync_clients = {}
+        self._async_http = None
+        self._async_clients = {}
+        self._loop = None
+        self._thread = None
+        self._closed = False
+        self._stats = {"sync_clients": 0, "async_clients": 0, "prewarmed": []}
+
+    # ------------------------------------------------------------------
+    # Sync clients (thread mode and synchronous factories)
+    # ------------------------------------------------------------------
+
+    def get_sync_client(self, provider: str):
+        """Shared blocking client for a provider; safe to use from any thread."""
+        with self._lock:
+            self._ensure_open()
+            if provider not in self._sync_clients:
+                if self._sync_http is None:
+                    self._sync_http = httpx.Client(
+                        limits=_http_limits(), timeout=_http_timeout()
+                    )
+                if provider == "openai":
+                    client = openai.OpenAI(
+                        api_key=OPENAI_API_KEY, http_client=self._sync_http
+                    )
+                else:
+                    client = Anthropic(
+                        api_key=ANTHROPIC_API_KEY, http_client=self._sync_http
+                    )
+                self._sync_clients[provider] = client
+                self._stats["sync_clients"] += 1
+            return self._sync_clients[provider]
+
+    # ------------------------------------------------------------------
+    # Async clients (bound to the registry's I/O loop)
+    # ------------------------------------------------------------------
+
+    def get_async_client(self, provider: str):
+        """Shared async client. Only valid inside coroutines passed to run()/iterate()."""
+        with self._lock:
+            self._ensure_open()
+            if provider not in self._async_clients:
+                if self._async_http is None:
+                    self._async_http = httpx.AsyncClient(
+                        limits=_http_limits(), timeout=_http_timeout()
+                    )
+                if provider == "openai":
+                    client = openai.AsyncOpenAI(
+                        api_key=OPENAI_API_KEY, http_client=self._async_http
+                    )
+                else:
+                    client = AsyncAnthropic(
+                        api_key=ANTHROPIC_API_KEY, http_client=self._async_http
+                    )
+                self._async_clients[provider] = client
+                self._stats["async_clients"] += 1
+            return self._async_clients[provider]
+
+    async def run(self, coro_factory: Callable[[], Awaitable]):
+        """Run a coroutine on the I/O loop and await its result from any loop."""
+        loop = self._io_loop()
+        if asyncio.get_running_loop() is loop:
+            return await coro_factory()
+        future = asyncio.run_coroutine_threadsafe(coro_factory(), loop)
+        return await asyncio.wrap_future(future)
+
+    async def iterate(
+        self, agen_factory: Callable[[], AsyncIterator]
+    ) -> AsyncIterator:
+        """Drive an async generator on the I/O loop, yielding its items here."""
+        loop = self._io_loop()
+        agen = agen_factory()
+        if asyncio.get_running_loop() is loop:
+            async for item in agen:
+                yield item
+            return
+
+        try:
+            while True:
+                future = asyncio.run_coroutine_threadsafe(agen.__anext__(), loop)
+                try:
+                    item = await asyncio.wrap_future(future)
+                except StopAsyncIteration:
+                    return
+                yield item
+        finally:
+            if not loop.is_closed():
+                asyncio.run_coroutine_threadsafe(agen.aclose(), loop)
+
+    # ------------------------------------------------------------------
+    # Warm-up and shutdown
+    # ------------------------------------------------------------------
+
+    def prewarm(self, providers: List[str] = None, timeout: float = 10.0) -> Dict:
+        """
+        Open TCP/TLS connections to the provider APIs ahead of the first call.
+
+        Sends a HEAD to each provider's base URL through both pools; the
+        response status is irrelevant, only the pooled connection is kept.
+        """
+        results = {}
+        for provider in providers or PROVIDERS:
+            started = time.perf_counter()
+            try:
+                base_url = str(self.get_sync_client(provider).base_url)
+                self._sync_http.head(base_url)
+                self._run_blocking(
+                    self._prewarm_async(provider, base_url), timeout=timeout
+                )
+                results[provider] = round(time.perf_counter() - started, 3)
+            except Exception as e:
+                results[provider] = f"failed: {e}"
+        print(f"DEBUG: LLM connection pre-warm: {results}")
+        self._stats["prewarmed"] = [p for p, r in results.items() if not isinstance(r, str)]
+        return results
+
+    def shutdown(self):
+        """Close all clients and pools and stop the I/O loop. Idempotent."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            sync_http, self._sync_http = self._sync_http, None
+            async_http, self._async_http = self._async_http, None
+            loop, thread = self._loop, self._thread
+            self._sync_clients.clear()
+            self._async_clients.clear()
+
+        if sync_http is not None:
+            sync_http.close()
+        if loop is not None and not loop.is_closed():
+            if async_http is not None:
+                try:
+                    asyncio.run_coroutine_threadsafe(
+                        async_http.aclose(), loop
+                    ).result(timeout=5)
+                except Exception as e:
+                    print(f"DEBUG: Error closing async LLM pool: {e}")
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join(timeout=5)
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["io_loop_running"] = bool(self._loop and self._loop.is_running())
+            stats["closed"] = self._closed
+        stats["max_connections"] = LLM_HTTP_MAX_CONNECTIONS
+        stats["max_keepalive"] = LLM_HTTP_MAX_KEEPALIVE
+        return stats
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    async def _prewarm_async(self, provider: str, base_url: str):
+        self.get_async_client(provider)
+        await self._async_http.head(base_url)
+
+    def _run_blocking(self, coro, timeout: Optional[float] = None):
+        return asyncio.run_coroutine_threadsafe(coro, self._io_loop()).result(timeout)
+
+    def _io_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            self._ensure_open()
+            if self._loop is None:
+                ready = threading.Event()
+
+                def serve():
+                    asyncio.set_event_loop(self._loop)
+                    ready.set()
+                    self._loop.run_forever()
+                    self._loop.close()
+
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(
+                    target=serve, name="llm-io-loop", daemon=True
+                )
+                self._thread.start()
+                ready.wait()
+            return self._loop
+
+    def _ensure_open(self):
+        if self._closed:
+            raise RuntimeError("LLM client registry has been shut down")
+
+
+# Global function to get shared client registry
+_clients = None
+_clients_lock = threading.Lock()
+
+
+def get_llm_clients() -> LLMClientRegistry:
+    """Get the shared client registry instance - thread-safe."""
+    global _clients
+    if _clients is None:
+        with _clients_lock:
+            if _clients is None:
+                _clients = LLMClientRegistry()
+                atexit.register(_clients.shutdown)
+    return _clients
@@ -0,0 +1,484 @@
+"""
+LLM Gateway - Shared non-blocking access to OpenAI and Anthropic
+Location: core/llm_gateway.py
+
+All planners, analyzers, synthesizers and agents send their LLM calls through
+this gateway so network waits never block the event loop.
+"""
+
+import asyncio
+import threading
+from typing import AsyncIterator, Dict, List, Optional
+
+from config import (
+    ORCHESTRATOR_MODEL,
+    CLAUDE_MODEL,
+    CLAUDE_MAX_TOKENS,
+    LLM_GATEWAY_MODE,
+    LLM_CACHE_ENABLED,
+    LLM_BACKEND,
+    LLM_GOVERNOR_ENABLED,
+    LLM_RATE_LIMIT_RETRIES,
+    LLM_RATE_LIMIT_BACKOFF_SECONDS,
+)
+from core.llm_cache import LLMResponseCache
+from core.llm_clients import LLMClientRegistry, get_llm_clients
+from core.llm_governor import LLMGovernor
+from core.prompt_budget import get_compaction_stats
+
+
+class LiveProviderBackend:
+    """Calls the real provider APIs with async clients or thread offload."""
+
+    name = "live"
+
+    def __init__(
+        self, mode: str = LLM_GATEWAY_MODE, clients: LLMClientRegistry = None
+    ):
+        self.mode = mode
+        # Pooled clients shared process-wide; async calls run on the
+        # registry's I/O loop so keep-alive connections outlive request loops
+        self.clients = clients or get_llm_clients()
+
+    async def complete(self, request: Dict) -> str:
+        """Execute a normalized request without blocking the event loop."""
+        if self.mode != "async":
+            return await asyncio.to_thread(self.complete_sync, request)
+        return await self.clients.run(lambda: self._complete_async(request))
+
+    async def _complete_async(self, request: Dict) -> str:
+        client = self.clients.get_async_client(request["provider"])
+        if request["provider"] == "openai":
+            response = await client.chat.completions.create(
+                **self._openai_kwargs(request)
+            )
+            return response.choices[0].message.content
+
+        response = await client.messages.create(**self._anthropic_kwargs(request))
+        return response.content[0].text
+
+    def complete_sync(self, request: Dict) -> str:
+        """Execute a normalized request on the calling thread."""
+        client = self.clients.get_sync_client(request["provider"])
+        if request["provider"] == "openai":
+            response = client.chat.completions.create(**self._openai_kwargs(request))
+            return response.choices[0].message.content
+
+        response = client.messages.create(**self._anthropic_kwargs(request))
+        return response.content[0].text
+
+    async def stream(self, request: Dict) -> AsyncIterator[str]:
+        """Yield response text as the provider streams it."""
+        if self.mode != "async":
+            # Thread mode has no native stream; deliver the whole reply at once
+            yield await asyncio.to_thread(self.complete_sync, request)
+            return
+
+        async for chunk in self.clients.iterate(lambda: self._stream_async(request)):
+            yield chunk
+
+    async def _stream_async(self, request: Dict) -> AsyncIterator[str]:
+        client = self.clients.get_async_client(request["provider"])
+        if request["provider"] == "openai":
+            stream = await client.chat.completions.create(
+                stream=True, **self._openai_kwargs(request)
+            )
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+            return
+
+        async with client.messages.stream(**self._anthropic_kwargs(request)) as stream:
+            async for text in stream.text_stream:
+                yield text
+
+    def _openai_kwargs(self, request: Dict) -> Dict:
+        kwargs = {"model": request["model"], "messages": request["messages"]}
+        if request.get("max_tokens") is not None:
+            kwargs["max_completion_tokens"] = request["max_tokens"]
+        if request.get("temperature") is not None:
+            kwargs["temperature"] = request["temperature"]
+        if request.get("response_format"):
+            kwargs["response_format"] = request["response_format"]
+        return kwargs
+
+    def _anthropic_kwargs(self, request: Dict) -> Dict:
+        kwargs = {
+            "model": request["model"],
+            "max_tokens": request.get("max_tokens") or CLAUDE_MAX_TOKENS,
+            "messages": request["messages"],
+        }
+        if request.get("temperature") is not None:
+            kwargs["temperature"] = request["temperature"]
+        if request.get("system"):
+            kwargs["system"] = request["system"]
+        return kwargs
+
+
+def build_backend(name: str = LLM_BACKEND):
+    """Create the provider backend selected by LLM_BACKEND."""
+    if name == "live":
+        return LiveProviderBackend()
+
+    from core.llm_replay import (
+        RecordingBackend,
+        ReplayBackend,
+        RuleBasedFakeBackend,
+    )
+
+    if name == "record":
+        return RecordingBackend(LiveProviderBackend())
+    if name == "replay":
+        return ReplayBackend()
+    if name == "fake":
+        return RuleBasedFakeBackend()
+    raise ValueError(f"Unknown LLM backend '{name}'")
+
+
+class LLMGateway:
+    """Single entry point for every OpenAI and Anthropic call in the fabric."""
+
+    def __init__(
+        self,
+        backend=None,
+        cache: Optional[LLMResponseCache] = None,
+        governor: Optional[LLMGovernor] = None,
+    ):
+        self.backend = backend or build_backend()
+        if cache is None and LLM_CACHE_ENABLED:
+            cache = LLMResponseCache()
+        self.cache = cache
+        if governor is None and LLM_GOVERNOR_ENABLED:
+            governor = LLMGovernor()
+        self.governor = governor
+
+    async def openai_chat(
+        self,
+        messages: List[Dict],
+        model: str = ORCHESTRATOR_MODEL,
+        response_format: Optional[Dict] = None,
+        max_completion_tokens: Optional[int] = None,
+        temperature: Optional[float] = None,
+        use_cache: bool = True,
+        priority: str = "interactive",
+    ) -> str:
+        """Chat completion against OpenAI; returns the message content."""
+        request = self._build_request(
+            "openai", model, messages, max_completion_tokens, temperature, priority
+        )
+        request["response_format"] = response_format
+        return await self._complete(request, use_cache)
+
+    async def claude_message(
+        self,
+        messages: List[Dict],
+        model: str = CLAUDE_MODEL,
+        max_tokens: int = CLAUDE_MAX_TOKENS,
+        temperature: Optional[float] = None,
+        system: Optional[str] = None,
+        use_cache: bool = True,
+        priority: str = "interactive",
+    ) -> str:
+        """Message call against Anthropic; returns the first text block."""
+        request = self._build_request(
+            "anthropic", model, messages, max_tokens, temperature, priority
+        )
+        request["system"] = system
+        return await self._complete(request, use_cache)
+
+    def openai_chat_sync(
+        self,
+        messages: List[Dict],
+        model: str = ORCHESTRATOR_MODEL,
+        response_format: Optional[Dict] = None,
+        max_completion_tokens: Optional[int] = None,
+        temperature: Optional[float] = None,
+        use_cache: bool = True,
+        priority: str = "interactive",
+    ) -> str:
+        """Blocking variant of openai_chat for synchronous factory code."""
+        request = self._build_request(
+            "openai", model, messages, max_completion_tokens, temperature, priority
+        )
+        request["response_format"] = response_format
+        return self._complete_sync(request, use_cache)
+
+    def claude_message_sync(
+        self,
+        messages: List[Dict],
+        model: str = CLAUDE_MODEL,
+        max_tokens: int = CLAUDE_MAX_TOKENS,
+        temperature: Optional[float] = None,
+        system: Optional[str] = None,
+        use_cache: bool = True,
+        priority: str = "interactive",
+    ) -> str:
+        """Blocking variant of claude_message for synchronous factory code."""
+        request = self._build_request(
+            "anthropic", model, messages, max_tokens, temperature, priority
+        )
+        request["system"] = system
+        return self._complete_sync(request, use_cache)
+
+    async def openai_chat_stream(
+        self,
+        messages: List[Dict],
+        model: str = ORCHESTRATOR_MODEL,
+        max_completion_tokens: Optional[int] = None,
+        temperature: Optional[float] = None,
+        use_cache: bool = True,
+        priority: str = "interactive",
+    ) -> AsyncIterator[str]:
+        """Streaming variant of openai_chat; yields text chunks."""
+        request = self._build_request(
+            "openai", model, messages, max_completion_tokens, temperature, priority
+        )
+        request["response_format"] = None
+        async for chunk in self._stream(request, use_cache):
+            yield chunk
+
+    async def claude_message_stream(
+        self,
+        messages: List[Dict],
+        model: str = CLAUDE_MODEL,
+        max_tokens: int = CLAUDE_MAX_TOKENS,
+        temperature: Optional[float] = None,
+        system: Optional[str] = None,
+        use_cache: bool = True,
+        priority: str = "interactive",
+    ) -> AsyncIterator[str]:
+        """Streaming variant of claude_message; yields text chunks."""
+        request = self._build_request(
+            "anthropic", model, messages, max_tokens, temperature, priority
+        )
+        request["system"] = system
+        async for chunk in self._stream(request, use_cache):
+            yield chunk
+
+    def set_backend(self, backend):
+        """Swap the provider backend (e.g. replay in tests and benchmarks)."""
+        self.backend = backend
+        if self.cache:
+            self.cache.clear()
+
+    def get_stats(self) -> Dict:
+        """Gateway-level counters for monitoring."""
+        stats = {
+            "backend": getattr(self.backend, "name", type(self.backend).__name__),
+            "cache": self.cache.get_stats() if self.cache else {"enabled": False},
+            "governor": self.governor.get_metrics() if self.governor else {},
+            "prompt_compaction": get_compaction_stats(),
+        }
+        if hasattr(self.backend, "stats"):
+            stats["backend_stats"] = dict(self.backend.stats)
+        clients = getattr(self.backend, "clients", None) or getattr(
+            getattr(self.backend, "inner", None), "clients", None
+        )
+        if clients is not None:
+            stats["clients"] = clients.get_stats()
+        return stats
+
+    async def _complete(self, request: Dict, use_cache: bool) -> str:
+        key = self.cache.make_key(request) if (use_cache and self.cache) else None
+        if key:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+        response = await self._governed_call(request)
+
+        if key:
+            self.cache.set(key, response)
+        return response
+
+    def _complete_sync(self, request: Dict, use_cache: bool) -> str:
+        key = self.cache.make_key(request) if (use_cache and self.cache) else None
+        if key:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+        response = self._governed_call_sync(request)
+
+        if key:
+            self.cache.set(key, response)
+        return response
+
+    async def _stream(self, request: Dict, use_cache: bool) -> AsyncIterator[str]:
+        key = self.cache.make_key(request) if (use_cache and self.cache) else None
+        if key:
+            cached = self.cache.get(key)
+            if cached is not None:
+                yield cached
+                return
+
+        chunks = []
+        async for chunk in self._governed_stream(request):
+            chunks.append(chunk)
+            yield chunk
+
+        # Only complete streams are cached; an abandoned stream never gets here
+        if key:
+            self.cache.set(key, "".join(chunks))
+
+    async def _governed_stream(self, request: Dict) -> AsyncIterator[str]:
+        """Streaming backend call behind the governor.
+
+        A 429 is retried only before the first chunk; once text has been
+        handed to the caller the error propagates.
+        """
+        if not self.governor:
+            async for chunk in self._backend_stream(request):
+                yield chunk
+            return
+
+        provider, model = request["provider"], request["model"]
+        reserved = estimate_request_tokens(request)
+        for attempt in range(LLM_RATE_LIMIT_RETRIES + 1):
+            await self.governor.acquire(provider, model, reserved, request["priority"])
+            chunks = []
+            try:
+                async for chunk in self._backend_stream(request):
+                    chunks.append(chunk)
+                    yield chunk
+                return
+            except Exception as e:
+                retry_after = self._rate_limit_delay(e, attempt)
+                if chunks or retry_after is None or attempt == LLM_RATE_LIMIT_RETRIES:
+                    raise
+                print(
+                    f"DEBUG: {provider}:{model} rate limited, retrying in {retry_after:.1f}s"
+                )
+                self.governor.penalize(provider, model, retry_after)
+            finally:
+                self.governor.release(
+                    provider,
+                    model,
+                    reserved,
+                    self._tokens_used(request, "".join(chunks) if chunks else None),
+                )
+
+    async def _backend_stream(self, request: Dict) -> AsyncIterator[str]:
+        """Use the backend's native stream, or deliver its reply as one chunk."""
+        if hasattr(self.backend, "stream"):
+            async for chunk in self.backend.stream(request):
+                yield chunk
+        else:
+            yield await self.backend.complete(request)
+
+    async def _governed_call(self, request: Dict) -> str:
+        """Backend call behind the governor, retrying provider rate limits."""
+        if not self.governor:
+            return await self.backend.complete(request)
+
+        provider, model = request["provider"], request["model"]
+        reserved = estimate_request_tokens(request)
+        for attempt in range(LLM_RATE_LIMIT_RETRIES + 1):
+            await self.governor.acquire(provider, model, reserved, request["priority"])
+            response = None
+            try:
+                response = await self.backend.complete(request)
+                return response
+            except Exception as e:
+                retry_after = self._rate_limit_delay(e, attempt)
+                if retry_after is None or attempt == LLM_RATE_LIMIT_RETRIES:
+                    raise
+                print(
+                    f"DEBUG: {provider}:{model} rate limited, retrying in {retry_after:.1f}s"
+                )
+                self.governor.penalize(provider, model, retry_after)
+            finally:
+                self.governor.release(
+                    provider, model, reserved, self._tokens_used(request, response)
+                )
+
+    def _governed_call_sync(self, request: Dict) -> str:
+        """Blocking variant of _governed_call."""
+        if not self.governor:
+            return self.backend.complete_sync(request)
+
+        provider, model = request["provider"], request["model"]
+        reserved = estimate_request_tokens(request)
+        for attempt in range(LLM_RATE_LIMIT_RETRIES + 1):
+            self.governor.acquire_sync(provider, model, reserved, request["priority"])
+            response = None
+            try:
+                response = self.backend.complete_sync(request)
+                return response
+            except Exception as e:
+                retry_after = self._rate_limit_delay(e, attempt)
+                if retry_after is None or attempt == LLM_RATE_LIMIT_RETRIES:
+                    raise
+                print(
+                    f"DEBUG: {provider}:{model} rate limited, retrying in {retry_after:.1f}s"
+                )
+                self.governor.penalize(provider, model, retry_after)
+            finally:
+                self.governor.release(
+                    provider, model, reserved, self._tokens_used(request, response)
+                )
+
+    def _rate_limit_delay(self, error: Exception, attempt: int) -> Optional[float]:
+        """Seconds to back off if `error` is a provider 429, else None."""
+        status = getattr(error, "status_code", None)
+        if status != 429 and type(error).__name__ != "RateLimitError":
+            return None
+
+        response = getattr(error, "response", None)
+        headers = getattr(response, "headers", None) or {}
+        try:
+            return float(headers.get("retry-after"))
+        except (TypeError, ValueError):
+            return LLM_RATE_LIMIT_BACKOFF_SECONDS * (2**attempt)
+
+    def _tokens_used(self, request: Dict, response: Optional[str]) -> Optional[int]:
+        if response is None:
+            return None
+        return estimate_request_tokens(request, include_completion=False) + (
+            len(response) // 4
+        )
+
+    def _build_request(
+        self,
+        provider: str,
+        model: str,
+        messages: List[Dict],
+        max_tokens: Optional[int],
+        temperature: Optional[float],
+        priority: str = "interactive",
+    ) -> Dict:
+        return {
+            "provider": provider,
+            "model": model,
+            "messages": messages,
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+            "priority": priority,
+        }
+
+
+def estimate_request_tokens(request: Dict, include_completion: bool = True) -> int:
+    """Rough token count (~4 chars/token) for rate limiting a request."""
+    chars = len(request.get("system") or "")
+    for message in request.get("messages", []):
+        content = message.get("content", "")
+        chars += len(content) if isinstance(content, str) else len(str(content))
+    tokens = chars // 4 + 1
+    if include_completion:
+        tokens += request.get("max_tokens") or 1024
+    return tokens
+
+
+# Global function to get shared gateway
+_gateway = None
+_gateway_lock = threading.Lock()
+
+
+def get_llm_gateway() -> LLMGateway:
+    """Get the shared LLM gateway instance - thread-safe."""
+    global _gateway
+    if _gateway is None:
+        with _gateway_lock:
+            if _gateway is None:
+                _gateway = LLMGateway()
+    return _gateway
@@ -0,0 +1,240 @@
+"""
+LLM Governor - Process-wide rate limiting for provider calls
+Location: core/llm_governor.py
+
+Requests-per-minute and tokens-per-minute token buckets per provider/model,
+a bounded priority wait queue (interactive ahead of background work) and
+queue-depth / wait-time metrics.
+"""
+
+import asyncio
+import heapq
+import itertools
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from config import (
+    LLM_RATE_LIMITS,
+    LLM_MODEL_RATE_LIMITS,
+    LLM_GOVERNOR_MAX_QUEUE,
+    LLM_GOVERNOR_MAX_IN_FLIGHT,
+)
+
+# Lower rank is served first
+PRIORITY_CLASSES = {"interactive": 0, "planning": 1, "background": 2}
+
+# Upper bound on how long a waiter sleeps before re-checking the queue
+_POLL_INTERVAL = 0.05
+
+
+class GovernorQueueFullError(RuntimeError):
+    """The wait queue for a provider/model is at capacity."""
+
+
+class TokenBucket:
+    """Classic token bucket refilled continuously up to capacity."""
+
+    def __init__(self, capacity: float, per_seconds: float = 60.0):
+        self.capacity = float(capacity)
+        self.refill_rate = self.capacity / per_seconds
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        elapsed = now - self.updated
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.refill_rate)
+            self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until `amount` tokens are available (0 if available now)."""
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.refill_rate
+
+    def consume(self, amount: float):
+        self.tokens -= min(amount, self.capacity)
+
+    def refund(self, amount: float):
+        self.tokens = min(self.capacity, self.tokens + amount)
+
+
+class _Lane:
+    """Buckets, wait queue and counters for one provider/model pair."""
+
+    def __init__(self, limits: Dict):
+        self.rpm = TokenBucket(limits["rpm"])
+        self.tpm = TokenBucket(limits["tpm"])
+        self.queue = []
+        self.in_flight = 0
+        self.paused_until = 0.0
+        self.metrics = {
+            "acquired": 0,
+            "rejected": 0,
+            "rate_limited": 0,
+            "total_wait": 0.0,
+            "max_wait": 0.0,
+            "max_queue_depth": 0,
+        }
+
+
+class LLMGovernor:
+    """Central admission control in front of every provider call."""
+
+    def __init__(
+        self,
+        provider_limits: Dict = None,
+        model_limits: Dict = None,
+        max_queue: int = LLM_GOVERNOR_MAX_QUEUE,
+        max_in_flight: int = LLM_GOVERNOR_MAX_IN_FLIGHT,
+    ):
+        self.provider_limits = provider_limits or LLM_RATE_LIMITS
+        self.model_limits = model_limits or LLM_MODEL_RATE_LIMITS
+        self.max_queue = max_queue
+        self.max_in_flight = max_in_flight
+        self._lanes = {}
+        self._lock = threading.Lock()
+        self._sequence = itertools.count()
+
+    async def acquire(
+        self, provider: str, model: str, tokens: int, priority: str = "interactive"
+    ) -> float:
+        """Wait (without blocking the loop) for capacity. Returns seconds waited."""
+        ticket = self._enqueue(provider, model, tokens, priority)
+        started = time.monotonic()
+        try:
+            while True:
+                wait = self._try_grant(ticket)
+                if wait <= 0:
+                    return self._granted(ticket, started)
+                await asyncio.sleep(min(wait, _POLL_INTERVAL))
+        except BaseException:
+            self._abandon(ticket)
+            raise
+
+    def acquire_sync(
+        self, provider: str, model: str, tokens: int, priority: str = "interactive"
+    ) -> float:
+        """Blocking variant of acquire for synchronous callers."""
+        ticket = self._enqueue(provider, model, tokens, priority)
+        started = time.monotonic()
+        try:
+            while True:
+                wait = self._try_grant(ticket)
+                if wait <= 0:
+                    return self._granted(ticket, started)
+                time.sleep(min(wait, _POLL_INTERVAL))
+        except BaseException:
+            self._abandon(ticket)
+            raise
+
+    def release(self, provider: str, model: str, reserved: int, used: Optional[int]):
+        """Finish a call; refund unused token reservation when usage is known."""
+        with self._lock:
+            lane = self._lane(provider, model)
+            lane.in_flight = max(0, lane.in_flight - 1)
+            if used is not None and used < reserved:
+                lane.tpm.refund(reserved - used)
+
+    def penalize(self, provider: str, model: str, retry_after: float):
+        """Pause a lane after the provider reported a rate limit."""
+        with self._lock:
+            lane = self._lane(provider, model)
+            lane.paused_until = max(lane.paused_until, time.monotonic() + retry_after)
+            lane.metrics["rate_limited"] += 1
+
+    def get_metrics(self) -> Dict:
+        """Queue depth, wait time and throughput counters per provider/model."""
+        with self._lock:
+            metrics = {}
+            for (provider, model), lane in self._lanes.items():
+                acquired = lane.metrics["acquired"]
+                metrics[f"{provider}:{model}"] = {
+                    "queue_depth": len(lane.queue),
+                    "in_flight": lane.in_flight,
+                    "acquired": acquired,
+                    "rejected": lane.metrics["rejected"],
+                    "rate_limited": lane.metrics["rate_limited"],
+                    "max_queue_depth": lane.metrics["max_queue_depth"],
+                    "avg_wait": (
+                        round(lane.metrics["total_wait"] / acquired, 4)
+                        if acquired
+                        else 0.0
+                    ),
+                    "max_wait": round(lane.metrics["max_wait"], 4),
+                    "rpm_available": round(lane.rpm.tokens, 1),
+                    "tpm_available": round(lane.tpm.tokens, 1),
+                }
+            return metrics
+
+    def _limits_for(self, provider: str, model: str) -> Dict:
+        limits = dict(self.provider_limits.get(provider, {"rpm": 60, "tpm": 60000}))
+        limits.update(self.model_limits.get(f"{provider}:{model}", {}))
+        return limits
+
+    def _lane(self, provider: str, model: str) -> _Lane:
+        key = (provider, model)
+        if key not in self._lanes:
+            self._lanes[key] = _Lane(self._limits_for(provider, model))
+        return self._lanes[key]
+
+    def _enqueue(self, provider: str, model: str, tokens: int, priority: str) -> Tuple:
+        rank = PRIORITY_CLASSES.get(priority, PRIORITY_CLASSES["interactive"])
+        with self._lock:
+            lane = self._lane(provider, model)
+            if len(lane.queue) >= self.max_queue:
+                lane.metrics["rejected"] += 1
+                raise GovernorQueueFullError(
+                    f"LLM wait queue full for {provider}:{model} ({self.max_queue})"
+                )
+            ticket = [rank, next(self._sequence), provider, model, tokens]
+            heapq.heappush(lane.queue, ticket)
+            lane.metrics["max_queue_depth"] = max(
+                lane.metrics["max_queue_depth"], len(lane.queue)
+            )
+            return ticket
+
+    def _try_grant(self, ticket) -> float:
+        """Grant if this ticket heads its queue and capacity exists; else wait hint."""
+        _, _, provider, model, tokens = ticket
+        with self._lock:
+            lane = self._lane(provider, model)
+            if lane.queue[0] is not ticket:
+                return _POLL_INTERVAL
+            if lane.in_flight >= self.max_in_flight:
+                return _POLL_INTERVAL
+
+            now = time.monotonic()
+            wait = max(
+                lane.paused_until - now,
+                lane.rpm.wait_time(1, now),
+                lane.tpm.wait_time(tokens, now),
+            )
+            if wait > 0:
+                return wait
+
+            lane.rpm.consume(1)
+            lane.tpm.consume(tokens)
+            lane.in_flight += 1
+            heapq.heappop(lane.queue)
+            return 0.0
+
+    def _granted(self, ticket, started: float) -> float:
+        waited = time.monotonic() - started
+        with self._lock:
+            lane = self._lane(ticket[2], ticket[3])
+            lane.metrics["acquired"] += 1
+            lane.metrics["total_wait"] += waited
+            lane.metrics["max_wait"] = max(lane.metrics["max_wait"], waited)
+        return waited
+
+    def _abandon(self, ticket):
+        """Drop a cancelled waiter from its queue."""
+        with self._lock:
+            lane = self._lane(ticket[2], ticket[3])
+            if ticket in lane.queue:
+                lane.queue.remove(ticket)
+                heapq.heapify(lane.queue)
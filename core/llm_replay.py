@@ -0,0 +1,331 @@
+"""
+LLM Record/Replay Backends - Deterministic provider stand-ins
+Location: core/llm_replay.py
+
+Record real request/response pairs to a fixture store, replay them with
+synthetic latency, or answer new prompts with a rule-based fake so the whole
+fabric runs offline for CI and benchmarking.
+"""
+
+import asyncio
+import json
+import os
+import random
+import re
+import threading
+import time
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from config import (
+    LLM_FIXTURES_DIR,
+    LLM_REPLAY_LATENCY_MS,
+    LLM_REPLAY_JITTER_MS,
+    LLM_REPLAY_USE_RECORDED_LATENCY,
+    LLM_REPLAY_SEED,
+    LLM_REPLAY_ON_MISS,
+    LLM_FAKE_RULES_PATH,
+)
+from core.llm_cache import request_fingerprint
+
+
+class FixtureMissingError(LookupError):
+    """Replay was asked for a request that has no recorded fixture."""
+
+
+async def stream_text(text: str, delay: float) -> AsyncIterator[str]:
+    """Yield `text` word by word, spreading `delay` seconds across the chunks."""
+    chunks = re.findall(r"\s*\S+\s*", text) or [text]
+    per_chunk = delay / len(chunks)
+    for chunk in chunks:
+        await asyncio.sleep(per_chunk)
+        yield chunk
+
+
+class FixtureStore:
+    """One JSON file per request fingerprint."""
+
+    def __init__(self, fixtures_dir: str = LLM_FIXTURES_DIR):
+        self.fixtures_dir = fixtures_dir
+        self._lock = threading.Lock()
+        os.makedirs(self.fixtures_dir, exist_ok=True)
+
+    def load(self, key: str) -> Optional[Dict]:
+        path = self._path(key)
+        if not os.path.exists(path):
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def save(self, key: str, request: Dict, response: str, latency: float):
+        fixture = {
+            "key": key,
+            "request": request,
+            "response": response,
+            "latency": round(latency, 4),
+            "recorded_at": datetime.now().isoformat(),
+        }
+        path = self._path(key)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with self._lock:
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(fixture, f, indent=2, default=str)
+            os.replace(temp_path, path)
+
+    def count(self) -> int:
+        return len([f for f in os.listdir(self.fixtures_dir) if f.endswith(".json")])
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.fixtures_dir, f"{key}.json")
+
+
+class SyntheticLatency:
+    """Configurable delay + deterministic jitter for stand-in backends."""
+
+    def __init__(
+        self,
+        latency_ms: float = LLM_REPLAY_LATENCY_MS,
+        jitter_ms: float = LLM_REPLAY_JITTER_MS,
+        use_recorded: bool = LLM_REPLAY_USE_RECORDED_LATENCY,
+        seed: int = LLM_REPLAY_SEED,
+    ):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.use_recorded = use_recorded
+        self.seed = seed
+
+    def delay_for(self, key: str, recorded: Optional[float] = None) -> float:
+        """Seconds to wait. Jitter is seeded by the request key so runs repeat."""
+        if self.use_recorded and recorded is not None:
+            base = recorded
+        else:
+            base = self.latency_ms / 1000.0
+
+        jitter = 0.0
+        if self.jitter_ms:
+            rng = random.Random(f"{self.seed}:{key}")
+            jitter = rng.uniform(-self.jitter_ms, self.jitter_ms) / 1000.0
+        return max(0.0, base + jitter)
+
+
+class RuleBasedFakeBackend:
+    """
+    Offline responder for prompts with no fixture.
+
+    User rules (JSON list at LLM_FAKE_RULES_PATH) are checked first:
+        [{"contains": "text in prompt", "provider": "openai", "response": {...}}]
+    Otherwise JSON-style prompts get the example JSON embedded in the prompt
+    itself, normalized to concrete values; text prompts get a canned reply.
+    """
+
+    name = "fake"
+
+    def __init__(
+        self,
+        rules_path: Optional[str] = LLM_FAKE_RULES_PATH,
+        latency: SyntheticLatency = None,
+    ):
+        self.latency = latency or SyntheticLatency()
+        self.rules = self._load_rules(rules_path)
+
+    async def complete(self, request: Dict) -> str:
+        key = request_fingerprint(request)
+        await asyncio.sleep(self.latency.delay_for(key))
+        return self.respond(request)
+
+    def complete_sync(self, request: Dict) -> str:
+        key = request_fingerprint(request)
+        time.sleep(self.latency.delay_for(key))
+        return self.respond(request)
+
+    async def stream(self, request: Dict) -> AsyncIterator[str]:
+        key = request_fingerprint(request)
+        async for chunk in stream_text(
+            self.respond(request), self.latency.delay_for(key)
+        ):
+            yield chunk
+
+    def respond(self, request: Dict) -> str:
+        prompt = self._prompt_text(request)
+
+        for rule in self.rules:
+            if rule.get("provider") and rule["provider"] != request.get("provider"):
+                continue
+            if rule.get("contains", "") in prompt:
+                response = rule.get("response", "")
+                return response if isinstance(response, str) else json.dumps(response)
+
+        wants_json = bool(request.get("response_format")) or "JSON" in prompt
+        if wants_json:
+            example = self._example_json(prompt)
+            return json.dumps(example if example is not None else {})
+
+        first_line = next(
+            (line.strip() for line in prompt.splitlines() if line.strip()), ""
+        )
+        return f"Offline response: {first_line[:200]}"
+
+    def _prompt_text(self, request: Dict) -> str:
+        parts = [request.get("system") or ""]
+        for message in request.get("messages", []):
+            content = message.get("content", "")
+            parts.append(content if isinstance(content, str) else json.dumps(content))
+        return "\n".join(parts)
+
+    def _example_json(self, prompt: str) -> Optional[Any]:
+        """Parse the last example object following a JSON marker in the prompt."""
+        markers = [m.end() for m in re.finditer(r"JSON", prompt)]
+        for marker in reversed(markers):
+            start = prompt.find("{", marker)
+            if start == -1:
+                continue
+            block = self._balanced_block(prompt, start)
+            if block is None:
+                continue
+            try:
+                return json.loads(self._normalize_example(block))
+            except json.JSONDecodeError:
+                continue
+        return None
+
+    def _balanced_block(self, text: str, start: int) -> Optional[str]:
+        depth = 0
+        in_string = False
+        for index in range(start, len(text)):
+            char = text[index]
+            if char == '"' and text[index - 1] != "\\":
+                in_string = not in_string
+            elif not in_string:
+                if char == "{":
+                    depth += 1
+                elif char == "}":
+                    depth -= 1
+                    if depth == 0:
+                        return text[start : index + 1]
+        return None
+
+    def _normalize_example(self, block: str) -> str:
+        """Turn prompt placeholders into concrete JSON values."""
+        # "simple|medium|complex" -> "simple"
+        block = re.sub(r'"([^"|]*)\|[^"]*"', r'"\1"', block)
+        # 0.0-1.0 -> 1.0 (upper bound keeps confidence checks on the happy path)
+        block = re.sub(r"(?<![\w.])\d+(?:\.\d+)?-(\d+(?:\.\d+)?)", r"\1", block)
+        # true/false -> true
+        block = re.sub(r"\b(true|false)/(?:true|false)\b", r"\1", block)
+        # trailing commas
+        block = re.sub(r",(\s*[}\]])", r"\1", block)
+        return block
+
+    def _load_rules(self, rules_path: Optional[str]) -> List[Dict]:
+        if not rules_path or not os.path.exists(rules_path):
+            return []
+        try:
+            with open(rules_path, "r", encoding="utf-8") as f:
+                rules = json.load(f)
+            return rules if isinstance(rules, list) else []
+        except Exception as e:
+            print(f"DEBUG: Could not load fake LLM rules from {rules_path}: {e}")
+            return []
+
+
+class RecordingBackend:
+    """Pass calls through to a real backend and save every pair as a fixture."""
+
+    name = "record"
+
+    def __init__(self, inner, store: FixtureStore = None):
+        self.inner = inner
+        self.store = store or FixtureStore()
+
+    async def complete(self, request: Dict) -> str:
+        started = time.perf_counter()
+        response = await self.inner.complete(request)
+        self.store.save(
+            request_fingerprint(request),
+            request,
+            response,
+            time.perf_counter() - started,
+        )
+        return response
+
+    def complete_sync(self, request: Dict) -> str:
+        started = time.perf_counter()
+        response = self.inner.complete_sync(request)
+        self.store.save(
+            request_fingerprint(request),
+            request,
+            response,
+            time.perf_counter() - started,
+        )
+        return response
+
+    async def stream(self, request: Dict) -> AsyncIterator[str]:
+        """Stream from the inner backend; save the fixture once it completes."""
+        started = time.perf_counter()
+        chunks = []
+        async for chunk in self.inner.stream(request):
+            chunks.append(chunk)
+            yield chunk
+        self.store.save(
+            request_fingerprint(request),
+            request,
+            "".join(chunks),
+            time.perf_counter() - started,
+        )
+
+
+class ReplayBackend:
+    """Serve recorded fixtures deterministically; fake or fail on a miss."""
+
+    name = "replay"
+
+    def __init__(
+        self,
+        store: FixtureStore = None,
+        latency: SyntheticLatency = None,
+        on_miss: str = LLM_REPLAY_ON_MISS,
+    ):
+        self.store = store or FixtureStore()
+        self.latency = latency or SyntheticLatency()
+        self.on_miss = on_miss
+        self.fallback = RuleBasedFakeBackend(latency=self.latency)
+        self.stats = {"replayed": 0, "faked": 0}
+
+    async def complete(self, request: Dict) -> str:
+        key, fixture = self._lookup(request)
+        if fixture is None:
+            return await self.fallback.complete(request)
+        await asyncio.sleep(self.latency.delay_for(key, fixture.get("latency")))
+        return fixture["response"]
+
+    def complete_sync(self, request: Dict) -> str:
+        key, fixture = self._lookup(request)
+        if fixture is None:
+            return self.fallback.complete_sync(request)
+        time.sleep(self.latency.delay_for(key, fixture.get("latency")))
+        return fixture["response"]
+
+    async def stream(self, request: Dict) -> AsyncIterator[str]:
+        key, fixture = self._lookup(request)
+        if fixture is None:
+            async for chunk in self.fallback.stream(request):
+                yield chunk
+            return
+        delay = self.latency.delay_for(key, fixture.get("latency"))
+        async for chunk in stream_text(fixture["response"], delay):
+            yield chunk
+
+    def _lookup(self, request: Dict):
+        key = request_fingerprint(request)
+        fixture = self.store.load(key)
+        if fixture is not None:
+            self.stats["replayed"] += 1
+            return key, fixture
+
+        if self.on_miss != "fake":
+            raise FixtureMissingError(
+                f"No LLM fixture for {request.get('provider')}/{request.get('model')} "
+                f"request {key[:12]} in {self.store.fixtures_dir}"
+            )
+        self.stats["faked"] += 1
+        return key, None
@@ -0,0 +1,131 @@
+"""
+LLM Task Graph - Dependency-aware concurrent execution of planner sub-calls
+Location: core/llm_task_graph.py
+
+Planners declare their LLM stages as nodes with dependencies; independent
+nodes run together under a shared semaphore so planning time tracks the
+critical path instead of the sum of all calls.
+"""
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from config import PLANNER_MAX_CONCURRENCY
+
+
+class LLMTaskGraph:
+    """Small DAG runner for async planner stages."""
+
+    def __init__(
+        self,
+        max_concurrency: int = PLANNER_MAX_CONCURRENCY,
+        semaphore: Optional[asyncio.Semaphore] = None,
+    ):
+        self.semaphore = semaphore or asyncio.Semaphore(max(1, max_concurrency))
+        self.nodes = {}
+        self.timings = {}
+
+    def add(
+        self,
+        name: str,
+        func: Callable[[Dict[str, Any]], Awaitable[Any]],
+        depends_on: List[str] = None,
+        bounded: bool = True,
+    ):
+        """
+        Register a stage.
+
+        Args:
+            name: Unique node name; its result is stored under this key
+            func: Coroutine factory receiving the results of finished nodes
+            depends_on: Nodes that must finish before this one starts
+            bounded: Hold a semaphore slot while running. Coordinator nodes
+                that fan out into their own graph should pass False.
+        """
+        if name in self.nodes:
+            raise ValueError(f"Duplicate task graph node: {name}")
+        self.nodes[name] = {
+            "func": func,
+            "depends_on": list(depends_on or []),
+            "bounded": bounded,
+        }
+
+    async def run(self) -> Dict[str, Any]:
+        """Execute all nodes, respecting dependencies. Returns results by name."""
+        self._validate()
+
+        results = {}
+        futures = {}
+
+        async def run_node(name: str):
+            node = self.nodes[name]
+            if node["depends_on"]:
+                await asyncio.gather(*(futures[dep] for dep in node["depends_on"]))
+
+            started = time.perf_counter()
+            if node["bounded"]:
+                async with self.semaphore:
+                    result = await node["func"](results)
+            else:
+                result = await node["func"](results)
+
+            self.timings[name] = {
+                "started": started,
+                "duration": time.perf_counter() - started,
+            }
+            results[name] = result
+            return result
+
+        for name in self.nodes:
+            futures[name] = asyncio.ensure_future(run_node(name))
+
+        try:
+            await asyncio.gather(*futures.values())
+        except BaseException:
+            for future in futures.values():
+                future.cancel()
+            raise
+
+        return results
+
+    def get_summary(self) -> Dict[str, Any]:
+        """Wall-clock vs summed stage time for the last run."""
+        if not self.timings:
+            return {"nodes": 0, "wall_time": 0.0, "total_stage_time": 0.0}
+
+        start = min(t["started"] for t in self.timings.values())
+        end = max(t["started"] + t["duration"] for t in self.timings.values())
+        return {
+            "nodes": len(self.timings),
+            "wall_time": round(end - start, 3),
+            "total_stage_time": round(
+                sum(t["duration"] for t in self.timings.values()), 3
+            ),
+            "stage_times": {
+                name: round(t["duration"], 3) for name, t in self.timings.items()
+            },
+        }
+
+    def _validate(self):
+        """Reject unknown dependencies and cycles before scheduling."""
+        for name, node in self.nodes.items():
+            for dep in node["depends_on"]:
+                if dep not in self.nodes:
+                    raise ValueError(f"Node '{name}' depends on unknown node '{dep}'")
+
+        visiting, done = set(), set()
+
+        def visit(name: str):
+            if name in done:
+                return
+            if name in visiting:
+                raise ValueError(f"Cycle detected in task graph at '{name}'")
+            visiting.add(name)
+            for dep in self.nodes[name]["depends_on"]:
+                visit(dep)
+            visiting.discard(name)
+            done.add(name)
+
+        for name in self.nodes:
+            visit(name)
@@ -7,7 +7,7 @@ import os
 import sys
 import json
 import asyncio
-import importlib.util
+import time
 from typing import Dict, List, Optional, Any, TypedDict
 from datetime import datetime
 import traceback
@@ -21,14 +21,20 @@ from langgraph.checkpoint.memory import MemorySaver
 from config import (
     MAX_WORKFLOW_STEPS,
     WORKFLOW_TIMEOUT_SECONDS,
-    AGENT_TIMEOUT_SECONDS,
     AGENT_MAX_RETRIES,
     ENABLE_PARALLEL_EXECUTION,
     MAX_PARALLEL_AGENTS,
     GENERATED_AGENTS_DIR,
     PREBUILT_AGENTS_DIR,
+    AGENT_EXECUTION_BACKEND,
 )
 from core.registry import RegistryManager
+from core.component_loader import get_component_loader
+from core.sandbox_executor import (
+    SandboxLimitError,
+    SandboxTimeoutError,
+    get_sandbox_executor,
+)
 
 
 class PipelineState(TypedDict):
@@ -314,79 +320,91 @@ class PipelineExecutor:
         agent = self.registry.get_agent(agent_name)
         agent_path = agent["location"]
 
-        # Verify agent file exists
-        if not os.path.exists(agent_path):
-            return {
-                "status": "error",
-                "error": f"Agent file not found: {agent_path}",
-                "agent_name": agent_name,
-            }
-
         try:
-            # Load agent module
-            spec = importlib.util.spec_from_file_location(agent_name, agent_path)
-            agent_module = importlib.util.module_from_spec(spec)
-            spec.loader.exec_module(agent_module)
-
-            # Get agent function
+            # Load agent function (cached per source version, shared process-wide)
             function_name = self._get_agent_function_name(agent_name)
-            print(f"DEBUG: Looking for function: {function_name}")
-
+            fallback_name = (
+                f"{agent_name}_agent" if agent_name.endswith("_agent") else agent_name
+            )
+            sandboxed = AGENT_EXECUTION_BACKEND == "sandbox"
             try:
-                agent_function = getattr(agent_module, function_name)
-                print(f"DEBUG: Found agent function: {function_name}")
-            except AttributeError:
-                # Try the other pattern
-                fallback_name = (
-                    f"{agent_name}_agent"
-                    if agent_name.endswith("_agent")
-                    else agent_name
-                )
-                if fallback_name != function_name:
-                    try:
-                        agent_function = getattr(agent_module, fallback_name)
-                        print(f"DEBUG: Found with fallback: {fallback_name}")
-                    except AttributeError:
-                        available_funcs = [
-                            name
-                            for name in dir(agent_module)
-                            if not name.startswith("_")
-                        ]
-                        print(f"DEBUG: Available functions: {available_funcs}")
-                        raise AttributeError(
-                            f"No agent function found. Tried: {function_name}, {fallback_name}"
-                        )
+                if sandboxed:
+                    # Loaded in the worker process, never in this one
+                    if not os.path.exists(agent_path):
+                        raise FileNotFoundError(agent_path)
                 else:
-                    available_funcs = [
-                        name for name in dir(agent_module) if not name.startswith("_")
-                    ]
-                    print(f"DEBUG: Available functions: {available_funcs}")
-                    raise AttributeError(f"Agent function not found: {function_name}")
+                    agent_function = get_component_loader().load(
+                        agent_path,
+                        [function_name, fallback_name],
+                        version=agent.get("version"),
+                        module_name=agent_name,
+                    )
+            except FileNotFoundError:
+                return {
+                    "status": "error",
+                    "error": f"Agent file not found: {agent_path}",
+                    "agent_name": agent_name,
+                }
 
             # Prepare agent state with pipeline context
             agent_state = self._prepare_agent_state_for_pipeline(state, step_plan)
 
-            # Execute agent with timeout
-            agent_result = await asyncio.wait_for(
-                agent_function(agent_state), timeout=AGENT_TIMEOUT_SECONDS
-            )
+            # Execute agent with a timeout derived from its p99 latency
+            timeout = self.registry.agent_timeout(agent_name)
+            started = time.perf_counter()
+            try:
+                if sandboxed:
+                    agent_result = await get_sandbox_executor().run(
+                        agent_path,
+                        [function_name, fallback_name],
+                        (agent_state,),
+                        version=agent.get("version"),
+                        timeout=timeout,
+                    )
+                else:
+                    agent_result = await asyncio.wait_for(
+                        agent_function(agent_state), timeout=timeout
+                    )
+            except SandboxLimitError as e:
+                self.registry.update_agent_metrics(
+                    agent_name, time.perf_counter() - started, "error"
+                )
+                return {
+                    "status": "error",
+                    "error": f"Agent stopped by sandbox: {str(e)}",
+                    "agent_name": agent_name,
+                }
+            except (asyncio.TimeoutError, SandboxTimeoutError):
+                self.registry.update_agent_metrics(
+                    agent_name, time.perf_counter() - started, "timeout"
+                )
+                return {
+                    "status": "error",
+                    "error": f"Agent execution timeout ({timeout}s)",
+                    "agent_name": agent_name,
+                }
+            except Exception:
+                self.registry.update_agent_metrics(
+                    agent_name, time.perf_counter() - started, "error"
+                )
+                raise
 
             # Validate and process result
             if isinstance(agent_result, dict):
-                return self._process_agent_result(agent_result, agent_name, step_plan)
+                result = self._process_agent_result(agent_result, agent_name, step_plan)
             else:
-                return {
+                result = {
                     "status": "error",
                     "error": f"Agent returned invalid result type: {type(agent_result)}",
                     "agent_name": agent_name,
                 }
+            self.registry.update_agent_metrics(
+                agent_name,
+                time.perf_counter() - started,
+                "error" if result.get("status") == "error" else "success",
+            )
+            return result
 
-        except asyncio.TimeoutError:
-            return {
-                "status": "error",
-                "error": f"Agent execution timeout ({AGENT_TIMEOUT_SECONDS}s)",
-                "agent_name": agent_name,
-            }
         except Exception as e:
             return {
                 "status": "error",
@@ -9,13 +9,11 @@ import json
 import asyncio
 from typing import Dict, List, Optional, Any, Tuple
 from datetime import datetime
-import openai
 import networkx as nx
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from config import (
-    OPENAI_API_KEY,
     ORCHESTRATOR_MODEL,
     ORCHESTRATOR_TEMPERATURE,
     ORCHESTRATOR_MAX_TOKENS,
@@ -26,6 +24,9 @@ from config import (
     PIPELINE_RECOVERY_PROMPT,
 )
 from core.registry import RegistryManager
+from core.llm_gateway import get_llm_gateway
+from core.llm_task_graph import LLMTaskGraph
+from core.prompt_budget import agent_digest, fit_section
 from core.agent_compatibility import AgentCompatibilityAnalyzer
 from core.agent_factory import AgentFactory
 from core.tool_factory import ToolFactory
@@ -39,7 +40,7 @@ class PipelineOrchestrator:
 
     def __init__(self):
         """Initialize the pipeline orchestrator."""
-        self.client = openai.OpenAI(api_key=OPENAI_API_KEY)
+        self.llm = get_llm_gateway()
         from core.registry_singleton import get_shared_registry
 
         self.registry = get_shared_registry()  # ← FIX: Use shared instance
@@ -73,7 +74,7 @@ class PipelineOrchestrator:
         # Build analysis prompt
         prompt = PIPELINE_ANALYSIS_PROMPT.format(
             request=request,
-            files=json.dumps(files) if files else "None",
+            files=fit_section(files, "file_context") if files else "None",
             available_agents=agents_desc,
             available_tools=tools_desc,
         )
@@ -130,14 +131,25 @@ class PipelineOrchestrator:
             "estimated_time": 0,
         }
 
+        # Step planning calls don't consume each other's results (previous
+        # output is not tracked at planning time), so every step is an
+        # independent node and the whole plan costs one critical-path call.
+        graph = LLMTaskGraph()
         for i, step in enumerate(steps):
-            previous_output = None
-            if i > 0:
-                # Get output from previous step if available
-                prev_step_name = pipeline_plan["steps"][i - 1].get("name")
-                # This would need to be enhanced to track actual data flow
+            graph.add(
+                f"step_{i}",
+                lambda r, i=i, step=step: self._plan_step(step, i, auto_create, None),
+            )
+        step_results = await graph.run()
+
+        summary = graph.get_summary()
+        print(
+            f"DEBUG: Planned {len(steps)} steps in {summary['wall_time']}s "
+            f"(sequential would be ~{summary['total_stage_time']}s)"
+        )
 
-            step_plan = await self._plan_step(step, i, auto_create, previous_output)
+        for i in range(len(steps)):
+            step_plan = step_results[f"step_{i}"]
             pipeline_plan["steps"].append(step_plan)
 
             if step_plan.get("needs_creation"):
@@ -207,8 +219,10 @@ class PipelineOrchestrator:
         prompt = DYNAMIC_AGENT_SPEC_PROMPT.format(
             step_description=step.get("description", ""),
             step_index=step_index,
-            input_requirements=json.dumps(step.get("input_requirements", {})),
-            output_requirements=json.dumps(step.get("output_requirements", {})),
+            input_requirements=fit_section(step.get("input_requirements", {}), "plan"),
+            output_requirements=fit_section(
+                step.get("output_requirements", {}), "plan"
+            ),
             available_tools=json.dumps([t["name"] for t in self.registry.list_tools()]),
         )
 
@@ -612,7 +626,7 @@ class PipelineOrchestrator:
             step_name=step_plan["name"],
             step_description=step_plan["description"],
             failure_reason=step_result.get("error", "Unknown error"),
-            failure_analysis=json.dumps(failure_analysis),
+            failure_analysis=fit_section(failure_analysis, "context"),
             available_agents=json.dumps(
                 [a["name"] for a in self.registry.list_agents()]
             ),
@@ -677,11 +691,15 @@ class PipelineOrchestrator:
 
         formatted = []
         for comp in components:
-            name = comp.get("name", "unknown")
-            desc = comp.get("description", "No description")
-            formatted.append(f"- {name}: {desc}")
+            digest = agent_digest(comp.get("name", "unknown"), comp)
+            line = f"- {digest['name']}: {digest['description'] or 'No description'}"
+            if digest["tags"]:
+                line += f" [tags: {', '.join(map(str, digest['tags']))}]"
+            if digest["inputs"] or digest["outputs"]:
+                line += f" (in: {digest['inputs']}, out: {digest['outputs']})"
+            formatted.append(line)
 
-        return "\n".join(formatted)
+        return fit_section("\n".join(formatted), "registry")
 
     async def _call_gpt4_json(
         self, system_prompt: str, user_prompt: str, temperature: float = 0.1
@@ -698,7 +716,7 @@ class PipelineOrchestrator:
             f"{user_prompt}\n\nRespond with ONLY valid JSON, no other text."
         )
 
-        response = self.client.chat.completions.create(
+        content = await self.llm.openai_chat(
             model=ORCHESTRATOR_MODEL,
             max_completion_tokens=ORCHESTRATOR_MAX_TOKENS,
             messages=[
@@ -707,8 +725,6 @@ class PipelineOrchestrator:
             ],
         )
 
-        content = response.choices[0].message.content
-
         # Extract JSON from response if it's wrapped in text
         if "```json" in content:
             start = content.find("```json") + 7
@@ -821,7 +837,13 @@ class PipelineOrchestrator:
 
             if compatibility_score >= 0.6:
                 step_plan["agent_assigned"] = best_agent["name"]
-                step_plan["estimated_time"] = best_agent.get("avg_execution_time", 5)
+                # Plan for the agent's p95 latency rather than its mean
+                latency = (self.registry.get_latency(best_agent["name"]) or {}).get(
+                    "latency", {}
+                )
+                step_plan["estimated_time"] = latency.get(
+                    "p95", best_agent.get("avg_execution_time", 5)
+                )
             elif auto_create:
                 # Create new agent for better compatibility
                 step_plan["needs_creation"] = True
@@ -0,0 +1,163 @@
+"""
+Plan Cache - Reuse workflow plans for repeated requests
+Location: core/plan_cache.py
+
+Plans are keyed on the normalized request text, the schema fingerprint of the
+uploaded files (structure, columns, dtypes - not values) and the registry
+generation. Each entry remembers the version of every agent it references and
+is dropped on lookup if any of them changed or disappeared.
+"""
+
+import copy
+import hashlib
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from config import PLAN_CACHE_MAX_ENTRIES, PLAN_CACHE_TTL_SECONDS
+
+
+def normalize_request(request: str) -> str:
+    """Case, whitespace and trailing punctuation insensitive form of a request."""
+    text = re.sub(r"\s+", " ", (request or "").strip().lower())
+    return text.rstrip(" .!?")
+
+
+class PlanCache:
+    """Bounded LRU of workflow plans with per-agent version validation."""
+
+    def __init__(
+        self,
+        max_entries: int = PLAN_CACHE_MAX_ENTRIES,
+        ttl_seconds: float = PLAN_CACHE_TTL_SECONDS,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "stores": 0,
+            "invalidated": 0,
+            "expired": 0,
+            "evictions": 0,
+        }
+
+    def make_key(self, request: str, schema_fingerprint: str, generation: int) -> str:
+        material = {
+            "request": normalize_request(request),
+            "schema": schema_fingerprint,
+            "generation": generation,
+        }
+        encoded = json.dumps(material, sort_keys=True)
+        return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+    def get(self, key: str, registry) -> Optional[Dict]:
+        """Return a copy of the cached plan if it is fresh and its agents are unchanged."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+
+            if time.time() - entry["created_at"] > self.ttl_seconds:
+                del self._entries[key]
+                self._stats["expired"] += 1
+                self._stats["misses"] += 1
+                return None
+
+            changed = self._changed_agents(entry["agent_versions"], registry)
+            if changed:
+                print(f"DEBUG: Plan cache entry invalidated, agents changed: {changed}")
+                del self._entries[key]
+                self._stats["invalidated"] += 1
+                self._stats["misses"] += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return copy.deepcopy(entry["plan"])
+
+    def set(self, key: str, plan: Dict, registry):
+        """Store a plan along with the versions of the agents it uses."""
+        entry = {
+            "plan": copy.deepcopy(plan),
+            "agent_versions": self._agent_versions(plan.get("agents", []), registry),
+            "created_at": time.time(),
+        }
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            self._stats["stores"] += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def invalidate_agent(self, agent_name: str) -> int:
+        """Drop every plan that references agent_name. Returns entries removed."""
+        with self._lock:
+            stale = [
+                key
+                for key, entry in self._entries.items()
+                if agent_name in entry["agent_versions"]
+            ]
+            for key in stale:
+                del self._entries[key]
+            self._stats["invalidated"] += len(stale)
+            return len(stale)
+
+    def on_registry_change(self, changes: Dict):
+        """Registry change listener: drop plans using removed or updated agents."""
+        agent_changes = changes.get("agents", {})
+        for name in agent_changes.get("removed", []) + agent_changes.get("updated", []):
+            self.invalidate_agent(name)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._entries)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 3) if lookups else 0.0
+        return stats
+
+    def _agent_versions(self, agent_names: List[str], registry) -> Dict:
+        versions = {}
+        for name in agent_names:
+            agent = registry.get_agent(name)
+            versions[name] = self._version_of(agent)
+        return versions
+
+    def _changed_agents(self, agent_versions: Dict, registry) -> List[str]:
+        return [
+            name
+            for name, version in agent_versions.items()
+            if self._version_of(registry.get_agent(name)) != version
+        ]
+
+    def _version_of(self, agent: Optional[Dict]) -> Optional[List]:
+        if not agent:
+            return None
+        return [agent.get("version"), agent.get("status"), agent.get("created_at")]
+
+
+# Global function to get shared plan cache
+_plan_cache = None
+_plan_cache_lock = threading.Lock()
+
+
+def get_plan_cache() -> PlanCache:
+    """Get the shared plan cache instance - thread-safe."""
+    global _plan_cache
+    if _plan_cache is None:
+        with _plan_cache_lock:
+            if _plan_cache is None:
+                _plan_cache = PlanCache()
+    return _plan_cache
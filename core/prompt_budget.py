@@ -0,0 +1,245 @@
+"""
+Prompt Budget - Token-budgeted prompt sections for registry and data payloads
+Location: core/prompt_budget.py
+
+Local approximate token counting, compact one-line digests of registry
+entries, and JSON compaction that truncates strings and samples long
+lists/dicts until a section fits its token budget. Prompt builders use this
+instead of dumping whole registries and agent outputs with json.dumps.
+"""
+
+import json
+import math
+import re
+import threading
+from typing import Any, Dict, List, Optional, Union
+
+from config import PROMPT_MAX_TOKENS, PROMPT_SECTION_BUDGETS
+
+# Word runs, number runs and individual punctuation marks each cost roughly
+# one token; long words split into ~4 character pieces.
+_TOKEN_PATTERN = re.compile(r"[A-Za-z]+|\d+|[^\sA-Za-z\d]")
+
+# Progressively tighter (string chars, list items, dict keys, depth) limits
+# tried by fit_json until the serialized value fits.
+_COMPACTION_LEVELS = (
+    (None, None, None, None),
+    (2000, 50, 60, 8),
+    (600, 20, 40, 6),
+    (240, 10, 24, 5),
+    (120, 6, 16, 4),
+    (60, 4, 10, 3),
+    (30, 2, 6, 2),
+)
+
+_DEFAULT_SECTION_BUDGET = 1500
+
+_stats = {"sections": 0, "compacted": 0, "tokens_in": 0, "tokens_out": 0}
+_stats_lock = threading.Lock()
+
+
+def count_tokens(text: str) -> int:
+    """Approximate token count without a provider tokenizer."""
+    if not text:
+        return 0
+    tokens = 0
+    for piece in _TOKEN_PATTERN.findall(text):
+        tokens += math.ceil(len(piece) / 4) if len(piece) > 4 else 1
+    return tokens
+
+
+def agent_digest(name: str, agent_info: Dict) -> Dict:
+    """Compact view of one registry entry: name, one-line description, tags, I/O types."""
+    description = (agent_info.get("description") or "").strip()
+    digest = {
+        "name": name,
+        "description": description.split("\n")[0][:160],
+        "tags": list(agent_info.get("tags", []))[:6],
+        "inputs": _schema_types(agent_info.get("input_schema")),
+        "outputs": _schema_types(agent_info.get("output_schema")),
+    }
+    tools = agent_info.get("uses_tools") or []
+    if tools:
+        digest["tools"] = list(tools)[:6]
+    return digest
+
+
+def registry_digest(entries: Union[Dict[str, Dict], List[Dict]]) -> List[Dict]:
+    """Digest a registry section given as {name: info} or a list of infos."""
+    if isinstance(entries, dict):
+        items = entries.items()
+    else:
+        items = ((entry.get("name", "unknown"), entry) for entry in entries or [])
+    return [agent_digest(name, info) for name, info in items if info]
+
+
+def compact_value(
+    value: Any,
+    max_string: Optional[int] = None,
+    max_items: Optional[int] = None,
+    max_keys: Optional[int] = None,
+    max_depth: Optional[int] = None,
+    _depth: int = 0,
+) -> Any:
+    """
+    Shrink a JSON-like value.
+
+    Strings are truncated, lists keep their head and tail with a marker for
+    the omitted middle, dicts keep their first keys, and containers nested
+    deeper than max_depth collapse to a short description.
+    """
+    limits = (max_string, max_items, max_keys, max_depth)
+
+    if isinstance(value, str):
+        if max_string is not None and len(value) > max_string:
+            return f"{value[:max_string]}...[+{len(value) - max_string} chars]"
+        return value
+
+    if isinstance(value, dict):
+        if max_depth is not None and _depth >= max_depth:
+            return f"<object with {len(value)} keys>"
+        keys = list(value.keys())
+        kept = keys if max_keys is None else keys[:max_keys]
+        result = {
+            str(key): compact_value(value[key], *limits, _depth=_depth + 1)
+            for key in kept
+        }
+        if len(kept) < len(keys):
+            result["..."] = f"{len(keys) - len(kept)} more keys"
+        return result
+
+    if isinstance(value, (list, tuple, set)):
+        items = list(value)
+        if max_depth is not None and _depth >= max_depth:
+            return f"<list of {len(items)} items>"
+        if max_items is None or len(items) <= max_items:
+            return [compact_value(item, *limits, _depth=_depth + 1) for item in items]
+
+        head = max(1, (max_items + 1) // 2)
+        tail = max_items - head
+        sampled = [compact_value(item, *limits, _depth=_depth + 1) for item in items[:head]]
+        sampled.append(f"... {len(items) - head - tail} more items ...")
+        if tail:
+            sampled.extend(
+                compact_value(item, *limits, _depth=_depth + 1) for item in items[-tail:]
+            )
+        return sampled
+
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    return compact_value(str(value), *limits, _depth=_depth)
+
+
+def fit_json(value: Any, max_tokens: int) -> str:
+    """Serialize `value` compactly, sampling/truncating until it fits max_tokens."""
+    text = _dumps(value)
+    for level in _COMPACTION_LEVELS[1:]:
+        if count_tokens(text) <= max_tokens:
+            return text
+        text = _dumps(compact_value(value, *level))
+
+    if count_tokens(text) <= max_tokens:
+        return text
+    return fit_text(text, max_tokens)
+
+
+def fit_text(text: str, max_tokens: int) -> str:
+    """Truncate plain text to roughly max_tokens, marking the cut."""
+    text = text or ""
+    total = count_tokens(text)
+    if total <= max_tokens:
+        return text
+    keep = max(0, int(len(text) * max_tokens / total) - 40)
+    return f"{text[:keep]}...[truncated {total - max_tokens} tokens]"
+
+
+def fit_section(value: Any, section: str, max_tokens: Optional[int] = None) -> str:
+    """Fit one value to the configured budget of a named section."""
+    return PromptBudget().section(section, value, max_tokens)
+
+
+def get_compaction_stats() -> Dict:
+    """Process-wide counters for sections built through a PromptBudget."""
+    with _stats_lock:
+        stats = dict(_stats)
+    stats["tokens_saved"] = stats["tokens_in"] - stats["tokens_out"]
+    return stats
+
+
+class PromptBudget:
+    """
+    Per-prompt token budget split across named sections.
+
+    Each section gets min(its configured budget, what is left of the prompt
+    total), so a prompt with several large payloads stays bounded overall.
+    """
+
+    def __init__(
+        self,
+        max_tokens: int = PROMPT_MAX_TOKENS,
+        section_budgets: Dict[str, int] = None,
+    ):
+        self.max_tokens = max_tokens
+        self.section_budgets = section_budgets or PROMPT_SECTION_BUDGETS
+        self.used = 0
+        self.sections = {}
+
+    def remaining(self) -> int:
+        return max(0, self.max_tokens - self.used)
+
+    def section(self, name: str, value: Any, max_tokens: Optional[int] = None) -> str:
+        """Render `value` (str or JSON-like) within the section's budget."""
+        budget = max_tokens or self.section_budgets.get(name, _DEFAULT_SECTION_BUDGET)
+        budget = max(1, min(budget, self.remaining()))
+
+        if isinstance(value, str):
+            original = count_tokens(value)
+            text = fit_text(value, budget)
+        else:
+            original = count_tokens(_dumps(value))
+            text = fit_json(value, budget)
+
+        fitted = count_tokens(text)
+        self.used += fitted
+        self.sections[name] = {
+            "budget": budget,
+            "original_tokens": original,
+            "tokens": fitted,
+            "compacted": fitted < original,
+        }
+
+        with _stats_lock:
+            _stats["sections"] += 1
+            _stats["compacted"] += int(fitted < original)
+            _stats["tokens_in"] += original
+            _stats["tokens_out"] += fitted
+        return text
+
+    def report(self) -> Dict:
+        """Tokens per section for the prompt built so far."""
+        return {
+            "max_tokens": self.max_tokens,
+            "used": self.used,
+            "sections": dict(self.sections),
+        }
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, separators=(",", ":"), default=str)
+
+
+def _schema_types(schema: Any, limit: int = 8) -> Dict[str, str]:
+    """Field -> type name for an input/output schema in any of the registry's shapes."""
+    if not isinstance(schema, dict):
+        return {}
+    fields = schema.get("properties") if isinstance(schema.get("properties"), dict) else schema
+
+    types = {}
+    for field, spec in list(fields.items())[:limit]:
+        if isinstance(spec, dict):
+            types[field] = str(spec.get("type", "object"))
+        elif isinstance(spec, str):
+            types[field] = spec.split()[0][:24] if spec else "any"
+        else:
+            types[field] = type(spec).__name__
+    return types
@@ -5,8 +5,8 @@ Unified registry management for agents and tools with advanced features
 
 import json
 import os
-import shutil
 import hashlib
+from contextvars import ContextVar
 from datetime import datetime
 from typing import Dict, List, Optional, Any, Tuple
 from pathlib import Path
@@ -25,11 +25,28 @@ from config import (
     BACKUP_DIR,
     CLAUDE_MODEL,
     AGENT_OUTPUT_SCHEMA,
-    MIN_AGENT_LINES,
-    MAX_AGENT_LINES,
     MIN_TOOL_LINES,
     MAX_TOOL_LINES,
+    PLANNER_AGENT_SHORTLIST,
+    AGENT_TIMEOUT_SECONDS,
+    STEP_TIMEOUT_SECONDS,
+    AGENT_TIMEOUT_P99_MULTIPLIER,
+    AGENT_TIMEOUT_MIN_SAMPLES,
+    AGENT_EXECUTION_BACKEND,
 )
+from core.registry_index import RegistryIndex, tokenize
+from core.registry_graph import RegistryGraph
+from core.registry_storage import build_registry_storage
+from core.registry_metrics import get_metrics_buffer
+from core.registry_latency import SUCCESS, LatencySketch, latency_report
+from core.registry_backup import get_backup_store
+from core.registry_transaction import RegistryTransaction
+from core.component_loader import (
+    MissingFunctionError,
+    check_source,
+    get_component_loader,
+)
+from core.registry_watcher import get_registry_watcher, subscribe_file_changes
 
 
 class RegistryManager:
@@ -38,11 +55,23 @@ class RegistryManager:
     Handles agent and tool registration, validation, dependencies, and analytics.
     """
 
-    def __init__(self, agents_path: str = None, tools_path: str = None):
-        """Initialize registry manager with paths from config."""
+    def __init__(
+        self, agents_path: str = None, tools_path: str = None, storage=None
+    ):
+        """Initialize registry manager with paths and storage backend from config."""
         self.agents_path = agents_path or AGENTS_REGISTRY_PATH
         self.tools_path = tools_path or TOOLS_REGISTRY_PATH
         self.backup_dir = BACKUP_DIR
+        self.storage = storage or build_registry_storage(
+            agents_path=self.agents_path, tools_path=self.tools_path
+        )
+        self._indexes = {}  # kind -> RegistryIndex, built on first search
+        self._graph = None  # RegistryGraph, built on first dependency query
+        self._latency_cache = None  # (agents, tools, executions, overview)
+        # Transaction of the current context, and all open ones (their staged
+        # entries must survive reloads)
+        self._transaction = ContextVar(f"registry_transaction_{id(self)}", default=None)
+        self._open_transactions = set()
 
         # Create necessary directories
         os.makedirs(GENERATED_AGENTS_DIR, exist_ok=True)
@@ -52,15 +81,11 @@ class RegistryManager:
         os.makedirs(self.backup_dir, exist_ok=True)
 
         # ADD THIS DEBUG AND VERIFICATION
-        print(f"DEBUG: Loading registries from:")
-        print(f"  Agents: {self.agents_path}")
-        print(f"  Tools: {self.tools_path}")
-        print(f"  Agents file exists: {os.path.exists(self.agents_path)}")
-        print(f"  Tools file exists: {os.path.exists(self.tools_path)}")
+        print(f"DEBUG: Loading registries from: {self.storage.describe()}")
 
         # Load registries
-        self.agents = self._load_registry(self.agents_path)
-        self.tools = self._load_registry(self.tools_path)
+        self.agents = self._load_registry("agents")
+        self.tools = self._load_registry("tools")
 
         # ADD THIS VERIFICATION
         print(f"DEBUG: Loaded {len(self.agents.get('agents', {}))} agents")
@@ -68,55 +93,144 @@ class RegistryManager:
         print(f"DEBUG: Agent keys: {list(self.agents.get('agents', {}).keys())}")
         print(f"DEBUG: Tool keys: {list(self.tools.get('tools', {}).keys())}")
 
-    def _load_registry(self, path: str) -> Dict:
-        """Load registry from JSON file with proper structure."""
-        print(f"DEBUG: Loading registry from {path}")
+    def _load_registry(self, kind: str) -> Dict:
+        """Load one registry ("agents" or "tools") from the storage backend."""
+        return self.storage.load(kind)
 
-        try:
-            if not os.path.exists(path):
-                print(f"DEBUG: Registry file doesn't exist: {path}")
-                if "agents" in path:
-                    return {"agents": {}}
-                else:
-                    return {"tools": {}}
+    def _save_registry(
+        self, kind: str, changed: List[str] = None, removed: List[str] = None
+    ):
+        """
+        Persist one registry. Pass the touched names when known so row-based
+        backends write only those; without them the whole registry is synced.
+        """
+        document = self.agents if kind == "agents" else self.tools
+        self.storage.save(kind, document, changed=changed, removed=removed)
 
-            with open(path, "r") as f:
-                data = json.load(f)
-                print(f"DEBUG: Loaded registry data keys: {list(data.keys())}")
+    def _document(self, kind: str) -> Dict:
+        return self.agents if kind == "agents" else self.tools
 
-                # Ensure proper structure
-                if "agents" in path and "agents" not in data:
-                    print(
-                        f"DEBUG: Agents registry missing 'agents' key, creating empty"
-                    )
-                    return {"agents": {}}
-                elif "tools" in path and "tools" not in data:
-                    print(f"DEBUG: Tools registry missing 'tools' key, creating empty")
-                    return {"tools": {}}
-
-                return data
-
-        except (FileNotFoundError, json.JSONDecodeError) as e:
-            print(f"DEBUG: Error loading registry {path}: {e}")
-            # Initialize empty registry with proper structure
-            if "agents" in path:
-                return {"agents": {}}
-            else:
-                return {"tools": {}}
+    def _entries(self, kind: str) -> Dict:
+        return self._document(kind).setdefault(kind, {})
+
+    def transaction(self) -> RegistryTransaction:
+        """
+        Batch registrations: entries are persisted in one write with one reload
+        notification when the block exits (see core/registry_transaction.py).
+        """
+        active = self._transaction.get()
+        if active is not None and not active.closed:
+            return active  # Nested blocks join the outer transaction
+        return RegistryTransaction(self)
+
+    def pending_entries(self, kind: str) -> Dict[str, Dict]:
+        """Entries staged by open transactions and not yet persisted."""
+        pending = {}
+        for transaction in list(self._open_transactions):
+            pending.update(transaction.pending_entries(kind))
+        return pending
+
+    def staged_previous(self, kind: str) -> Dict[str, Optional[Dict]]:
+        """Entries as they were before open transactions changed them (None: new)."""
+        previous = {}
+        for transaction in list(self._open_transactions):
+            previous.update(transaction.staged_previous(kind))
+        return previous
+
+    def _write_source(self, file_path: str, code: str):
+        """Write a component's source; fsynced now, or at transaction commit."""
+        transaction = self._transaction.get()
+        if transaction is not None:
+            transaction.stage_source(file_path)
+        with open(file_path, "w") as f:
+            f.write(code)
+            if transaction is None:
+                f.flush()
+                os.fsync(f.fileno())  # Force write to disk
+
+    def _commit_registration(self, changed: Dict[str, List[str]], previous: Dict):
+        """
+        Persist entries just set in memory (changed = {kind: names}) and
+        notify other instances - or stage them in the current transaction.
+        """
+        for kind, names in changed.items():
+            self.reindex(kind, names)
+
+        transaction = self._transaction.get()
+        if transaction is not None:
+            for kind, names in changed.items():
+                for name in names:
+                    transaction.stage_entry(kind, name, previous[kind].get(name))
+            return
+
+        # Update registry through the storage backend (atomic per backend)
+        for kind, names in changed.items():
+            self._save_registry(kind, changed=names)
+
+        # Force reload for all instances
+        from core.registry_singleton import RegistrySingleton
+
+        RegistrySingleton().force_reload()
 
-    def _save_registry(self, data: Dict, path: str):
-        """Save registry to JSON file."""
-        # Ensure directory exists
-        os.makedirs(os.path.dirname(path), exist_ok=True)
-        with open(path, "w") as f:
-            json.dump(data, f, indent=2, default=str)
+    def register_many(
+        self, agents: List[Dict] = None, tools: List[Dict] = None, atomic: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Register several tools and agents in one transaction. Tools go first so
+        agents can use them; each item holds register_tool/register_agent
+        keyword arguments. With atomic=True any failure registers nothing
+        (rolling back the whole enclosing transaction when nested in one).
+        """
+        results = {"tools": {}, "agents": {}}
+        with self.transaction() as transaction:
+            for spec in tools or []:
+                results["tools"][spec["name"]] = self.register_tool(**spec)
+            for spec in agents or []:
+                results["agents"][spec["name"]] = self.register_agent(**spec)
+
+            failed = [
+                name
+                for section in results.values()
+                for name, result in section.items()
+                if result.get("status") != "success"
+            ]
+            if failed and atomic:
+                transaction.rollback()
+                for section in results.values():
+                    for name, result in section.items():
+                        if result.get("status") == "success":
+                            section[name] = {
+                                "status": "error",
+                                "message": f"Rolled back, failed in the same batch: {', '.join(failed)}",
+                            }
+
+        registered = [
+            name
+            for section in results.values()
+            for name, result in section.items()
+            if result.get("status") == "success"
+        ]
+        if not failed:
+            status = "success"
+        elif registered:
+            status = "partial"
+        else:
+            status = "error"
+        return {
+            "status": status,
+            "registered": registered,
+            "failed": failed,
+            "results": results,
+        }
 
     def save_all(self):
         """Save both registries to disk and notify singleton to reload."""
-        self._save_registry(self.agents, self.agents_path)
-        self._save_registry(self.tools, self.tools_path)
+        self._save_registry("agents")
+        self._save_registry("tools")
+        self._notify_singleton()
 
-        # Notify singleton pattern to reload for other instances
+    def _notify_singleton(self):
+        """Notify singleton pattern to reload for other instances."""
         try:
             from core.registry_singleton import RegistrySingleton
 
@@ -168,10 +282,7 @@ class RegistryManager:
         os.makedirs(os.path.dirname(file_path), exist_ok=True)
 
         try:
-            with open(file_path, "w") as f:
-                f.write(code)
-                f.flush()
-                os.fsync(f.fileno())  # Force write to disk
+            self._write_source(file_path, code)
         except IOError as e:
             return {
                 "status": "error",
@@ -185,27 +296,30 @@ class RegistryManager:
                 "message": f"Agent file was not created: {file_path}",
             }
 
-        # Try to import it to verify syntax
+        # Load it to verify syntax and that the agent function exists; the
+        # loaded module stays cached for the agent's first execution. Agents
+        # that run in sandbox workers are only parsed, never executed here
+        loader = get_component_loader()
         try:
-            import importlib.util
-
-            spec = importlib.util.spec_from_file_location(f"{name}_module", file_path)
-            module = importlib.util.module_from_spec(spec)
-            spec.loader.exec_module(module)
-
-            # Verify the agent function exists
-            agent_func_name = f"{name}_agent"
-            if not hasattr(module, agent_func_name) and not hasattr(module, name):
-                # Delete the broken file
-                os.remove(file_path)
-                return {
-                    "status": "error",
-                    "message": f"Agent function {agent_func_name} not found in generated code",
-                }
+            if AGENT_EXECUTION_BACKEND == "sandbox":
+                check_source(file_path, [f"{name}_agent", name])
+            else:
+                loader.load(
+                    file_path, [f"{name}_agent", name], module_name=f"{name}_module"
+                )
+        except MissingFunctionError:
+            # Delete the broken file
+            os.remove(file_path)
+            loader.invalidate(file_path)
+            return {
+                "status": "error",
+                "message": f"Agent function {name}_agent not found in generated code",
+            }
         except Exception as e:
             # Delete the broken file
             if os.path.exists(file_path):
                 os.remove(file_path)
+            loader.invalidate(file_path)
             return {
                 "status": "error",
                 "message": f"Agent code validation failed: {str(e)}",
@@ -234,28 +348,25 @@ class RegistryManager:
             "status": "active",
         }
 
-        # Update registry using singleton for atomic write
+        previous = {"agents": {name: self.agents["agents"].get(name)}, "tools": {}}
+        changed = {"agents": [name]}
         self.agents["agents"][name] = agent_entry
 
-        # Use singleton's atomic update
-        from core.registry_singleton import RegistrySingleton
-
-        singleton = RegistrySingleton()
-        singleton.atomic_update(self.agents_path, self.agents)
-
-        # Update tool references
+        # Update tool references. Entries are replaced, never modified:
+        # published snapshots share the old dicts
         if uses_tools:
             for tool_name in uses_tools:
                 if tool_name in self.tools.get("tools", {}):
-                    if "used_by_agents" not in self.tools["tools"][tool_name]:
-                        self.tools["tools"][tool_name]["used_by_agents"] = []
-                    if name not in self.tools["tools"][tool_name]["used_by_agents"]:
-                        self.tools["tools"][tool_name]["used_by_agents"].append(name)
+                    tool = self.tools["tools"][tool_name]
+                    previous["tools"][tool_name] = tool
+                    users = list(tool.get("used_by_agents", []))
+                    if name not in users:
+                        users.append(name)
+                    self.tools["tools"][tool_name] = {**tool, "used_by_agents": users}
 
-            singleton.atomic_update(self.tools_path, self.tools)
+            changed["tools"] = uses_tools
 
-        # Force reload for all instances
-        singleton.force_reload()
+        self._commit_registration(changed, previous)
 
         print(f"DEBUG: Agent '{name}' registered successfully with verification")
 
@@ -274,6 +385,13 @@ class RegistryManager:
         self, tags: List[str] = None, active_only: bool = True
     ) -> List[Dict]:
         """List agents with optional filtering."""
+        names = self.storage.query(
+            "agents", status="active" if active_only else None, tags=tags
+        )
+        if names is not None:
+            entries = self.agents.get("agents", {})
+            return [{"name": n, **entries[n]} for n in names if n in entries]
+
         agents = []
         for name, details in self.agents.get("agents", {}).items():
             # Filter by status
@@ -290,38 +408,106 @@ class RegistryManager:
 
     def agent_exists(self, name: str) -> bool:
         """Check if an agent exists and is active."""
-        print(f"DEBUG: Checking if agent '{name}' exists")
-        print(
-            f"DEBUG: Available agent keys: {list(self.agents.get('agents', {}).keys())}"
-        )
-
         agent = self.get_agent(name)
-        exists = agent is not None and agent.get("status") == "active"
+        return agent is not None and agent.get("status") == "active"
 
-        print(f"DEBUG: Agent '{name}' exists: {exists}")
-        if agent:
-            print(f"DEBUG: Agent status: {agent.get('status')}")
-        else:
-            print(f"DEBUG: Agent '{name}' not found in registry")
+    def set_status(self, kind: str, name: str, status: str):
+        """
+        Change an agent's or tool's status in memory (persist with save_all).
+        The entry is replaced by a copy, since published snapshots share it.
+        """
+        entries = self._entries(kind)
+        entries[name] = {**entries[name], "status": status}
 
-        return exists
+    def rename_agent(self, old_name: str, new_name: str) -> bool:
+        """
+        Move an agent's entry to a new name (its source stays where it is),
+        repointing tool references, the search index and the dependency
+        graph, and persist both registries. Returns False if there is no
+        such agent.
+        """
+        agents = self._entries("agents")
+        entry = agents.get(old_name)
+        if entry is None:
+            return False
+        del agents[old_name]
+        agents[new_name] = {**entry, "name": new_name}
+
+        tools = self._entries("tools")
+        repointed = []
+        for tool_name, tool in tools.items():
+            users = tool.get("used_by_agents", [])
+            if old_name in users:
+                users = [new_name if user == old_name else user for user in users]
+                tools[tool_name] = {**tool, "used_by_agents": list(dict.fromkeys(users))}
+                repointed.append(tool_name)
+
+        self.reindex("agents", [old_name, new_name])
+        self.reindex("tools", repointed)
+        self._save_registry("agents", changed=[new_name], removed=[old_name])
+        if repointed:
+            self._save_registry("tools", changed=repointed)
 
-    def update_agent_metrics(self, name: str, execution_time: float):
-        """Update execution metrics for an agent."""
-        if name in self.agents.get("agents", {}):
-            agent = self.agents["agents"][name]
-            count = agent.get("execution_count", 0)
-            avg_time = agent.get("avg_execution_time", 0)
+        from core.registry_singleton import RegistrySingleton
 
-            # Calculate new average
-            new_count = count + 1
-            new_avg = ((avg_time * count) + execution_time) / new_count
+        RegistrySingleton().force_reload()
+        return True
 
-            agent["execution_count"] = new_count
-            agent["avg_execution_time"] = round(new_avg, 3)
-            agent["last_executed"] = datetime.now().isoformat()
+    def update_agent_metrics(
+        self, name: str, execution_time: float, outcome: str = SUCCESS
+    ):
+        """
+        Record an agent execution with its outcome ("success", "error" or
+        "timeout"). Metrics are buffered and written behind (see
+        core/registry_metrics.py), so they reach the registry - and readers -
+        within REGISTRY_METRICS_FLUSH_INTERVAL seconds.
+        """
+        if name in self.agents.get("agents", {}):
+            get_metrics_buffer(self.storage).record(name, execution_time, outcome)
+
+    def update_tool_metrics(
+        self, name: str, execution_time: float, outcome: str = SUCCESS
+    ):
+        """Record a tool execution; see update_agent_metrics."""
+        if name in self.tools.get("tools", {}):
+            get_metrics_buffer(self.storage).record(
+                name, execution_time, outcome, kind="tools"
+            )
+
+    def get_latency(self, name: str, kind: str = "agents") -> Optional[Dict]:
+        """Latency percentiles and error/timeout counts of one agent or tool."""
+        entry = self._entries(kind).get(name)
+        if entry is None:
+            return None
+        return {"name": name, **latency_report(entry)}
+
+    def get_latency_statistics(self, kind: str = "agents") -> List[Dict]:
+        """Latency reports of every active component that has executed, slowest p95 first."""
+        reports = [
+            {"name": name, **latency_report(entry)}
+            for name, entry in self._entries(kind).items()
+            if entry.get("status") == "active" and entry.get("latency")
+        ]
+        reports.sort(key=lambda r: r["latency"].get("p95", 0), reverse=True)
+        return reports
+
+    def agent_timeout(self, name: str) -> float:
+        """
+        Timeout for one agent execution: p99 latency x
+        AGENT_TIMEOUT_P99_MULTIPLIER once the agent has
+        AGENT_TIMEOUT_MIN_SAMPLES samples, clamped to
+        [AGENT_TIMEOUT_SECONDS, STEP_TIMEOUT_SECONDS].
+        """
+        entry = self.agents.get("agents", {}).get(name) or {}
+        sketch = LatencySketch.from_dict(entry.get("latency"))
+        if sketch.count < AGENT_TIMEOUT_MIN_SAMPLES:
+            return AGENT_TIMEOUT_SECONDS
+        timeout = sketch.quantile(0.99) * AGENT_TIMEOUT_P99_MULTIPLIER
+        return round(min(max(timeout, AGENT_TIMEOUT_SECONDS), STEP_TIMEOUT_SECONDS), 1)
 
-            self.save_all()
+    def flush_metrics(self) -> int:
+        """Write buffered execution metrics now. Returns executions flushed."""
+        return get_metrics_buffer(self.storage).flush()
 
     # =============================================================================
     # TOOL OPERATIONS
@@ -352,10 +538,7 @@ class RegistryManager:
         os.makedirs(os.path.dirname(file_path), exist_ok=True)
 
         try:
-            with open(file_path, "w") as f:
-                f.write(code)
-                f.flush()
-                os.fsync(f.fileno())
+            self._write_source(file_path, code)
         except IOError as e:
             return {
                 "status": "error",
@@ -368,25 +551,22 @@ class RegistryManager:
                 "message": f"Tool file was not created: {file_path}",
             }
 
-        # Import and test the tool
+        # Load and test the tool
+        loader = get_component_loader()
         try:
-            import importlib.util
-
-            spec = importlib.util.spec_from_file_location(name, file_path)
-            module = importlib.util.module_from_spec(spec)
-            spec.loader.exec_module(module)
-
-            if not hasattr(module, name):
-                os.remove(file_path)
-                return {"status": "error", "message": f"Tool function {name} not found"}
+            tool_func = loader.load(file_path, [name], module_name=name)
 
             # Test the tool with None input (should not crash)
-            tool_func = getattr(module, name)
             result = tool_func(None)  # Tools must handle None
 
+        except MissingFunctionError:
+            os.remove(file_path)
+            loader.invalidate(file_path)
+            return {"status": "error", "message": f"Tool function {name} not found"}
         except Exception as e:
             if os.path.exists(file_path):
                 os.remove(file_path)
+            loader.invalidate(file_path)
             return {"status": "error", "message": f"Tool validation failed: {str(e)}"}
 
         # Extract signature if not provided
@@ -413,14 +593,9 @@ class RegistryManager:
             "status": "active",
         }
 
-        # Update registry using singleton
+        previous = {"tools": {name: self.tools["tools"].get(name)}}
         self.tools["tools"][name] = tool_entry
-
-        from core.registry_singleton import RegistrySingleton
-
-        singleton = RegistrySingleton()
-        singleton.atomic_update(self.tools_path, self.tools)
-        singleton.force_reload()
+        self._commit_registration({"tools": [name]}, previous)
 
         print(f"DEBUG: Tool '{name}' registered successfully with verification")
 
@@ -437,6 +612,16 @@ class RegistryManager:
 
     def list_tools(self, tags: List[str] = None, pure_only: bool = False) -> List[Dict]:
         """List tools with optional filtering."""
+        names = self.storage.query("tools", tags=tags)
+        if names is not None:
+            entries = self.tools.get("tools", {})
+            return [
+                {"name": n, **entries[n]}
+                for n in names
+                if n in entries
+                and (not pure_only or entries[n].get("is_pure_function", True))
+            ]
+
         tools = []
         for name, details in self.tools.get("tools", {}).items():
             # Filter by purity
@@ -453,19 +638,8 @@ class RegistryManager:
 
     def tool_exists(self, name: str) -> bool:
         """Check if a tool exists and is active."""
-        print(f"DEBUG: Checking if tool '{name}' exists")
-        print(f"DEBUG: Available tool keys: {list(self.tools.get('tools', {}).keys())}")
-
         tool = self.get_tool(name)
-        exists = tool is not None and tool.get("status") == "active"
-
-        print(f"DEBUG: Tool '{name}' exists: {exists}")
-        if tool:
-            print(f"DEBUG: Tool status: {tool.get('status')}")
-        else:
-            print(f"DEBUG: Tool '{name}' not found in registry")
-
-        return exists
+        return tool is not None and tool.get("status") == "active"
 
     # =============================================================================
     # DEPENDENCY MANAGEMENT
@@ -473,122 +647,53 @@ class RegistryManager:
 
     def get_agent_dependencies(self, agent_name: str) -> Dict[str, List[str]]:
         """Get all dependencies for an agent."""
-        agent = self.get_agent(agent_name)
-        if not agent:
-            return {"tools": [], "missing_tools": []}
-
-        tools_needed = agent.get("uses_tools", [])
-        missing_tools = [tool for tool in tools_needed if not self.tool_exists(tool)]
-
-        return {
-            "tools": tools_needed,
-            "missing_tools": missing_tools,
-            "available_tools": [t for t in tools_needed if self.tool_exists(t)],
-        }
+        return self._dependency_graph().agent_dependencies(agent_name)
 
     def get_tool_usage(self, tool_name: str) -> List[str]:
         """Get list of agents using a specific tool."""
-        tool = self.get_tool(tool_name)
-        return tool.get("used_by_agents", []) if tool else []
+        return self._dependency_graph().tool_usage(tool_name)
 
     def get_dependency_graph(self) -> Dict[str, Any]:
-        """Build complete dependency graph."""
-        graph = {
-            "agents_to_tools": {},
-            "tools_to_agents": {},
-            "missing_dependencies": [],
-            "unused_tools": [],
-        }
-
-        # Build agent to tool mapping
-        for agent_name, agent_data in self.agents.get("agents", {}).items():
-            if agent_data.get("status") == "active":
-                tools = agent_data.get("uses_tools", [])
-                graph["agents_to_tools"][agent_name] = tools
-
-                # Check for missing dependencies
-                for tool in tools:
-                    if not self.tool_exists(tool):
-                        graph["missing_dependencies"].append(
-                            {"agent": agent_name, "missing_tool": tool}
-                        )
-
-        # Build tool to agent mapping
-        for tool_name, tool_data in self.tools.get("tools", {}).items():
-            if tool_data.get("status") == "active":
-                agents = tool_data.get("used_by_agents", [])
-                graph["tools_to_agents"][tool_name] = agents
-
-                # Check for unused tools
-                if not agents:
-                    graph["unused_tools"].append(tool_name)
-
-        return graph
+        """
+        Build complete dependency graph. Served from the incrementally
+        maintained RegistryGraph; only rebuilt after entries change.
+        """
+        return self._dependency_graph().dependency_report()
+
+    def _dependency_graph(self) -> RegistryGraph:
+        agents = self.agents.get("agents", {})
+        tools = self.tools.get("tools", {})
+        if self._graph is None:
+            self._graph = RegistryGraph()
+            self._graph.rebuild(agents, tools)
+            # Module edits invalidate cached validation without stat() sweeps
+            subscribe_file_changes(
+                self._graph.on_files_changed,
+                [
+                    GENERATED_AGENTS_DIR,
+                    GENERATED_TOOLS_DIR,
+                    PREBUILT_AGENTS_DIR,
+                    PREBUILT_TOOLS_DIR,
+                ],
+            )
+        elif self._graph.count("agent") != len(agents) or self._graph.count(
+            "tool"
+        ) != len(tools):
+            # Entries added or deleted behind the manager's back
+            self._graph.rebuild(agents, tools)
+        return self._graph
 
     # =============================================================================
     # VALIDATION
     # =============================================================================
 
     def validate_all(self) -> Dict[str, List]:
-        """Validate all components in the registry."""
-        results = {
-            "valid_agents": [],
-            "invalid_agents": [],
-            "valid_tools": [],
-            "invalid_tools": [],
-            "missing_files": [],
-            "dependency_issues": [],
-        }
-
-        # Validate agents
-        for name, agent in self.agents.get("agents", {}).items():
-            file_path = agent.get("location", "")
-            issues = []
-
-            # Check file existence
-            if not os.path.exists(file_path):
-                issues.append(f"Missing file: {file_path}")
-                results["missing_files"].append(f"Agent: {name}")
-
-            # Check dependencies
-            deps = self.get_agent_dependencies(name)
-            if deps["missing_tools"]:
-                issues.append(f"Missing tools: {', '.join(deps['missing_tools'])}")
-                results["dependency_issues"].append(
-                    {"agent": name, "missing": deps["missing_tools"]}
-                )
-
-            # Check line count
-            line_count = agent.get("line_count", 0)
-            if line_count < MIN_AGENT_LINES or line_count > MAX_AGENT_LINES:
-                issues.append(f"Invalid size: {line_count} lines")
-
-            if issues:
-                results["invalid_agents"].append({"name": name, "issues": issues})
-            else:
-                results["valid_agents"].append(name)
-
-        # Validate tools
-        for name, tool in self.tools.get("tools", {}).items():
-            file_path = tool.get("location", "")
-            issues = []
-
-            # Check file existence
-            if not os.path.exists(file_path):
-                issues.append(f"Missing file: {file_path}")
-                results["missing_files"].append(f"Tool: {name}")
-
-            # Check line count
-            line_count = tool.get("line_count", 0)
-            if line_count < MIN_TOOL_LINES or line_count > MAX_TOOL_LINES:
-                issues.append(f"Invalid size: {line_count} lines")
-
-            if issues:
-                results["invalid_tools"].append({"name": name, "issues": issues})
-            else:
-                results["valid_tools"].append(name)
-
-        return results
+        """
+        Validate all components in the registry. Results are cached per entry
+        and recomputed only for entries that changed or whose module file did.
+        """
+        watching = get_registry_watcher() is not None
+        return self._dependency_graph().validation_report(watching=watching)
 
     def health_check(self) -> Dict[str, Any]:
         """Perform comprehensive health check."""
@@ -630,51 +735,132 @@ class RegistryManager:
     # SEARCH AND DISCOVERY
     # =============================================================================
 
-    def search_agents(self, query: str) -> List[Dict]:
-        """Search agents by name or description."""
-        query_lower = query.lower()
-        results = []
-
-        for name, details in self.agents.get("agents", {}).items():
-            if details.get("status") != "active":
-                continue
-
-            if (
-                query_lower in name.lower()
-                or query_lower in details.get("description", "").lower()
-                or any(query_lower in tag for tag in details.get("tags", []))
-            ):
-                results.append({"name": name, **details})
-
-        return results
-
-    def search_tools(self, query: str) -> List[Dict]:
-        """Search tools by name or description."""
-        query_lower = query.lower()
-        results = []
-
-        for name, details in self.tools.get("tools", {}).items():
-            if details.get("status") != "active":
-                continue
+    def search_agents(
+        self,
+        query: str,
+        top_k: int = None,
+        tags: List[str] = None,
+        status: Optional[str] = "active",
+    ) -> List[Dict]:
+        """Search agents by name, tags and description, best match first."""
+        return self._search("agents", query, top_k, tags, status)
 
-            if (
-                query_lower in name.lower()
-                or query_lower in details.get("description", "").lower()
-                or any(query_lower in tag for tag in details.get("tags", []))
-            ):
-                results.append({"name": name, **details})
+    def search_tools(
+        self,
+        query: str,
+        top_k: int = None,
+        tags: List[str] = None,
+        status: Optional[str] = "active",
+    ) -> List[Dict]:
+        """Search tools by name, tags and description, best match first."""
+        return self._search("tools", query, top_k, tags, status)
 
-        return results
+    def find_capable_agents(self, task: str, top_k: int = 10) -> List[Dict]:
+        """
+        Find agents capable of handling a task. Every word of the task counts
+        towards the score; ties go to the more frequently executed agent.
+        """
+        agents = self.search_agents(task, top_k=top_k)
+        agents.sort(
+            key=lambda x: (-x["search_score"], -x.get("execution_count", 0))
+        )
+        return agents
 
-    def find_capable_agents(self, task: str) -> List[Dict]:
-        """Find agents capable of handling a task."""
-        # Search by task keywords
-        agents = self.search_agents(task)
+    def shortlist_agents(
+        self, request: str, candidates: List[str] = None, limit: int = None
+    ) -> List[str]:
+        """
+        Names of the agents most relevant to a request, for planner prompts.
+        Returns the candidates unchanged when there are no more than `limit`.
+        """
+        limit = limit or PLANNER_AGENT_SHORTLIST
+        entries = self.agents.get("agents", {})
+        if candidates is None:
+            candidates = [
+                name for name, agent in entries.items() if agent.get("status") == "active"
+            ]
+        if len(candidates) <= limit:
+            return list(candidates)
+
+        allowed = set(candidates)
+        ranked = self._search_index("agents").search(
+            request, top_k=limit, accept=allowed.__contains__
+        )
+        shortlist = [name for name, _ in ranked]
+        if len(shortlist) < limit:
+            # Pad with the most used agents so the planner still has options
+            # when the request shares few words with the registry
+            chosen = set(shortlist)
+            rest = sorted(
+                (name for name in candidates if name not in chosen),
+                key=lambda name: -(entries.get(name) or {}).get("execution_count", 0),
+            )
+            shortlist.extend(rest[: limit - len(shortlist)])
+        return shortlist
+
+    def reindex(self, kind: str, names: List[str]):
+        """
+        Refresh the search index and dependency graph for entries added,
+        changed (including status changes) or removed.
+        """
+        entries = (self.agents if kind == "agents" else self.tools).get(kind, {})
+        index = self._indexes.get(kind)
+        if index is not None:  # Otherwise built lazily on first search
+            for name in names:
+                if name in entries:
+                    index.add(name, entries[name])
+                else:
+                    index.remove(name)
+
+        if self._graph is not None:
+            graph_kind = "agent" if kind == "agents" else "tool"
+            for name in names:
+                self._graph.update(graph_kind, name, entries.get(name))
+
+    def _search_index(self, kind: str) -> RegistryIndex:
+        entries = (self.agents if kind == "agents" else self.tools).get(kind, {})
+        index = self._indexes.get(kind)
+        # Entries added or deleted behind the manager's back (direct dict
+        # edits) show up as a size mismatch; rebuild rather than go stale
+        if index is None or len(index) != len(entries):
+            index = RegistryIndex()
+            index.rebuild(entries)
+            self._indexes[kind] = index
+        return index
+
+    def _search(
+        self,
+        kind: str,
+        query: str,
+        top_k: Optional[int],
+        tags: Optional[List[str]],
+        status: Optional[str],
+    ) -> List[Dict]:
+        entries = (self.agents if kind == "agents" else self.tools).get(kind, {})
+
+        # Status and tags are read from the live entries, so status changes
+        # (deprecate, mark broken) apply without re-indexing
+        def accept(name: str) -> bool:
+            details = entries.get(name)
+            if details is None:
+                return False
+            if status is not None and details.get("status") != status:
+                return False
+            if tags and not any(tag in details.get("tags", []) for tag in tags):
+                return False
+            return True
 
-        # Sort by relevance (execution count as proxy for reliability)
-        agents.sort(key=lambda x: x.get("execution_count", 0), reverse=True)
+        if not tokenize(query):
+            # Empty query: everything that passes the filters
+            matches = [(name, 0.0) for name in entries if accept(name)]
+            matches = matches[:top_k] if top_k else matches
+        else:
+            matches = self._search_index(kind).search(query, top_k, accept)
 
-        return agents
+        return [
+            {"name": name, **entries[name], "search_score": score}
+            for name, score in matches
+        ]
 
     # =============================================================================
     # STATISTICS AND ANALYTICS
@@ -682,6 +868,13 @@ class RegistryManager:
 
     def get_statistics(self) -> Dict[str, Any]:
         """Get comprehensive registry statistics."""
+        agent_stats = self.storage.statistics("agents")
+        tool_stats = self.storage.statistics("tools")
+        if agent_stats is not None and tool_stats is not None:
+            stats = self._statistics_from_aggregates(agent_stats, tool_stats)
+            stats["latency"] = self._latency_overview(stats["total_executions"])
+            return stats
+
         agents_list = self.agents.get("agents", {})
         tools_list = self.tools.get("tools", {})
 
@@ -691,7 +884,7 @@ class RegistryManager:
         # Calculate metrics
         total_executions = sum(a.get("execution_count", 0) for a in active_agents)
 
-        return {
+        stats = {
             "total_agents": len(active_agents),
             "total_tools": len(active_tools),
             "prebuilt_agents": sum(1 for a in active_agents if a.get("is_prebuilt")),
@@ -727,59 +920,139 @@ class RegistryManager:
                 else None
             ),
         }
+        stats["latency"] = self._latency_overview(total_executions)
+        return stats
+
+    def _latency_overview(self, total_executions: int) -> Dict[str, Any]:
+        """
+        Merged latency sketch and outcome totals of all active agents and
+        tools. Metrics only change on reload, which swaps in new sections, so
+        the result is cached until a section or the execution total changes.
+        """
+        agents = self.agents.get("agents", {})
+        tools = self.tools.get("tools", {})
+        cached = self._latency_cache
+        if (
+            cached is not None
+            and cached[0] is agents
+            and cached[1] is tools
+            and cached[2] == total_executions
+        ):
+            return cached[3]
+
+        overview = {}
+        for kind, entries in (("agents", agents), ("tools", tools)):
+            sketch = LatencySketch()
+            totals = {"errors": 0, "timeouts": 0, "window_errors": 0, "window_timeouts": 0}
+            for entry in entries.values():
+                if entry.get("status") != "active" or not entry.get("latency"):
+                    continue
+                sketch.merge(LatencySketch.from_dict(entry["latency"]))
+                report = latency_report(entry)
+                totals["errors"] += report["error_count"] or 0
+                totals["timeouts"] += report["timeout_count"] or 0
+                totals["window_errors"] += report["window"]["errors"]
+                totals["window_timeouts"] += report["window"]["timeouts"]
+            overview[kind] = {**sketch.summary(), **totals}
+
+        self._latency_cache = (agents, tools, total_executions, overview)
+        return overview
+
+    def _statistics_from_aggregates(
+        self, agent_stats: Dict, tool_stats: Dict
+    ) -> Dict[str, Any]:
+        """get_statistics() computed from backend aggregates instead of a scan."""
+        agents_total = agent_stats["active"]
+        tools_total = tool_stats["active"]
+        return {
+            "total_agents": agents_total,
+            "total_tools": tools_total,
+            "prebuilt_agents": agent_stats["prebuilt"],
+            "generated_agents": agent_stats["generated"],
+            "prebuilt_tools": tool_stats["prebuilt"],
+            "generated_tools": tool_stats["generated"],
+            "total_executions": agent_stats["total_executions"],
+            "avg_agent_lines": round(
+                agent_stats["total_lines"] / max(agents_total, 1), 1
+            ),
+            "avg_tool_lines": round(tool_stats["total_lines"] / max(tools_total, 1), 1),
+            "tool_reuse_rate": round(
+                tool_stats["total_used_by"] / max(tools_total, 1), 2
+            ),
+            "most_used_agent": agent_stats["most_used"],
+            "newest_agent": agent_stats["newest"],
+        }
 
     # =============================================================================
     # BACKUP AND RESTORE
     # =============================================================================
 
     def backup_registries(self, tag: str = None) -> str:
-        """Create backup of current registries."""
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        backup_name = f"backup_{timestamp}"
-        if tag:
-            backup_name += f"_{tag}"
-
-        backup_path = os.path.join(self.backup_dir, backup_name)
-        os.makedirs(backup_path, exist_ok=True)
-
-        # Copy registry files
-        shutil.copy(self.agents_path, os.path.join(backup_path, "agents.json"))
-        shutil.copy(self.tools_path, os.path.join(backup_path, "tools.json"))
-
-        # Save metadata
-        metadata = {
-            "timestamp": datetime.now().isoformat(),
-            "tag": tag,
-            "stats": self.get_statistics(),
-            "health": self.health_check(),
-        }
-
-        with open(os.path.join(backup_path, "metadata.json"), "w") as f:
-            json.dump(metadata, f, indent=2)
+        """
+        Back up both registries and the generated agent/tool sources as
+        content-addressed objects (see core/registry_backup.py). Only new
+        content is written; returns the manifest path.
+        """
+        store = get_backup_store(self.backup_dir)
+        manifest = store.create(self.agents, self.tools, tag=tag)
+        store.prune()
+        return store.manifest_path(manifest["name"])
 
-        return backup_path
+    def list_backups(self) -> List[Dict]:
+        """Backup manifests, newest first."""
+        return get_backup_store(self.backup_dir).list_manifests()
 
     def restore_registries(self, backup_name: str) -> bool:
-        """Restore registries from backup."""
-        backup_path = os.path.join(self.backup_dir, backup_name)
-
-        if not os.path.exists(backup_path):
-            return False
+        """Restore registries (and generated sources) from a backup."""
+        store = get_backup_store(self.backup_dir)
+        legacy_path = os.path.join(self.backup_dir, backup_name)
 
         try:
-            # Create current backup before restore
-            self.backup_registries("before_restore")
+            if store.get_manifest(backup_name) is not None:
+                # Everything is read and verified before anything changes
+                backup = store.load(backup_name)
+                agents = backup["registries"]["agents"]
+                tools = backup["registries"]["tools"]
+            elif os.path.isdir(legacy_path):
+                # Full-copy backup directory from before the object store
+                with open(os.path.join(legacy_path, "agents.json"), "r") as f:
+                    agents = json.load(f)
+                with open(os.path.join(legacy_path, "tools.json"), "r") as f:
+                    tools = json.load(f)
+                backup = None
+            else:
+                return False
 
-            # Restore files
-            shutil.copy(os.path.join(backup_path, "agents.json"), self.agents_path)
-            shutil.copy(os.path.join(backup_path, "tools.json"), self.tools_path)
+            from core.registry_singleton import RegistrySingleton
 
-            # Reload registries
-            self.agents = self._load_registry(self.agents_path)
-            self.tools = self._load_registry(self.tools_path)
+            # Buffered executions go in before the lock (the flusher takes it too)
+            self.flush_metrics()
+
+            singleton = RegistrySingleton()
+            with singleton._lock:
+                # Current state, nearly free since its content is mostly stored
+                self.backup_registries("before_restore")
+
+                if backup is not None:
+                    store.restore_files(backup["files"])
+                    store.remove_files_not_in(backup["files"])
+
+                agents.setdefault("agents", {})
+                tools.setdefault("tools", {})
+                self.agents = agents
+                self.tools = tools
+                self._indexes = {}
+                self._graph = None
+                # Both registries in one write, so no reader sees one restored
+                # without the other
+                self.storage.save_many(
+                    {"agents": (agents, None, None), "tools": (tools, None, None)}
+                )
+            singleton.force_reload()
 
             return True
-        except Exception:
+        except Exception as e:
+            print(f"DEBUG: Restore of {backup_name} failed: {e}")
             return False
 
     # =============================================================================
@@ -809,7 +1082,7 @@ class RegistryManager:
             # Remove unused tools
             for tool_name in report["unused_tools"]:
                 if tool_name in self.tools["tools"]:
-                    self.tools["tools"][tool_name]["status"] = "deprecated"
+                    self.set_status("tools", tool_name, "deprecated")
                     report["actions_taken"].append(
                         f"Deprecated unused tool: {tool_name}"
                     )
@@ -817,35 +1090,40 @@ class RegistryManager:
             # Mark broken components
             for agent_name in report["broken_agents"]:
                 if agent_name in self.agents["agents"]:
-                    self.agents["agents"][agent_name]["status"] = "broken"
+                    self.set_status("agents", agent_name, "broken")
                     report["actions_taken"].append(f"Marked broken agent: {agent_name}")
 
             for tool_name in report["broken_tools"]:
                 if tool_name in self.tools["tools"]:
-                    self.tools["tools"][tool_name]["status"] = "broken"
+                    self.set_status("tools", tool_name, "broken")
                     report["actions_taken"].append(f"Marked broken tool: {tool_name}")
 
+            self.reindex("agents", report["broken_agents"])
+            self.reindex("tools", report["unused_tools"] + report["broken_tools"])
             self.save_all()
 
         return report
 
     def cleanup_deprecated(self) -> int:
         """Remove deprecated components."""
-        count = 0
-
         # Clean deprecated agents
+        removed_agents = []
         for name in list(self.agents["agents"].keys()):
             if self.agents["agents"][name].get("status") == "deprecated":
                 del self.agents["agents"][name]
-                count += 1
+                removed_agents.append(name)
 
         # Clean deprecated tools
+        removed_tools = []
         for name in list(self.tools["tools"].keys()):
             if self.tools["tools"][name].get("status") == "deprecated":
                 del self.tools["tools"][name]
-                count += 1
+                removed_tools.append(name)
 
+        count = len(removed_agents) + len(removed_tools)
         if count > 0:
+            self.reindex("agents", removed_agents)
+            self.reindex("tools", removed_tools)
             self.save_all()
 
         return count
@@ -0,0 +1,354 @@
+"""
+Registry Backup Store - Content-addressed, deduplicated registry backups
+Location: core/registry_backup.py
+
+Layout under BACKUP_DIR:
+
+    objects/ab/abcdef...   zstd-compressed blobs named by the SHA-256 of
+                           their uncompressed content
+    manifests/<name>.json  registry documents and generated source files of
+                           one backup, by object hash
+
+A backup serializes both registries canonically (sorted keys) and hashes
+every generated agent/tool source file; only content not already stored is
+compressed and written, so an unchanged registry costs one small manifest.
+Restore reads and verifies every object before anything is touched, then
+swaps the registries and changed source files in by rename, removing
+generated sources the backup doesn't have. Retention keeps
+the newest REGISTRY_BACKUP_KEEP_LAST manifests plus everything younger than
+REGISTRY_BACKUP_KEEP_DAYS and garbage-collects objects nothing references.
+"""
+
+import fcntl
+import hashlib
+import json
+import os
+import threading
+import zlib
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List, Optional
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+from config import (
+    PROJECT_ROOT,
+    GENERATED_AGENTS_DIR,
+    GENERATED_TOOLS_DIR,
+    REGISTRY_DURABILITY,
+    REGISTRY_BACKUP_KEEP_LAST,
+    REGISTRY_BACKUP_KEEP_DAYS,
+    REGISTRY_BACKUP_ZSTD_LEVEL,
+)
+
+MANIFEST_VERSION = 1
+_ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+
+def canonical_json(document: Dict) -> bytes:
+    """Stable serialization so identical registries hash identically."""
+    return json.dumps(
+        document, sort_keys=True, separators=(",", ":"), default=str
+    ).encode("utf-8")
+
+
+def _compress(data: bytes) -> bytes:
+    if zstandard is not None:
+        return zstandard.ZstdCompressor(level=REGISTRY_BACKUP_ZSTD_LEVEL).compress(data)
+    return zlib.compress(data, 6)  # Readable by both code paths
+
+
+def _decompress(blob: bytes) -> bytes:
+    if blob.startswith(_ZSTD_MAGIC):
+        if zstandard is None:
+            raise RuntimeError("zstandard is required to read this backup")
+        return zstandard.ZstdDecompressor().decompress(blob)
+    return zlib.decompress(blob)
+
+
+def _write_atomic(path: str, data: bytes, durability: str):
+    """temp file + rename, fsynced according to REGISTRY_DURABILITY."""
+    temp_path = f"{path}.tmp.{os.getpid()}.{threading.get_ident()}"
+    with open(temp_path, "wb") as f:
+        f.write(data)
+        if durability in ("file", "full"):
+            f.flush()
+            os.fsync(f.fileno())
+    os.replace(temp_path, path)
+    if durability == "full":
+        fd = os.open(os.path.dirname(path), os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+
+class BackupStore:
+    """Object store plus manifests for registry backups in one directory."""
+
+    def __init__(
+        self,
+        root: str,
+        source_dirs: List[str] = None,
+        durability: str = None,
+    ):
+        self.root = root
+        self.objects_dir = os.path.join(root, "objects")
+        self.manifests_dir = os.path.join(root, "manifests")
+        self.source_dirs = source_dirs or [GENERATED_AGENTS_DIR, GENERATED_TOOLS_DIR]
+        self.durability = durability or REGISTRY_DURABILITY
+        self._lock = threading.Lock()
+        self._file_hashes = {}  # abs path -> ((mtime_ns, size), sha256)
+        os.makedirs(self.objects_dir, exist_ok=True)
+        os.makedirs(self.manifests_dir, exist_ok=True)
+
+    # ------------------------------------------------------------------
+    # Backup
+    # ------------------------------------------------------------------
+
+    def create(self, agents: Dict, tools: Dict, tag: str = None) -> Dict:
+        """Store a backup of both registry documents and the generated sources."""
+        with self._exclusive():
+            written = {"objects": 0, "bytes": 0}
+            registries = {
+                "agents": self._put(canonical_json(agents), written),
+                "tools": self._put(canonical_json(tools), written),
+            }
+            files = {}
+            for path in self._source_files():
+                digest = self._hash_file(path, written)
+                if digest is not None:
+                    files[os.path.relpath(path, PROJECT_ROOT)] = digest
+
+            manifest = {
+                "version": MANIFEST_VERSION,
+                "name": self._new_name(tag),
+                "timestamp": datetime.now().isoformat(),
+                "tag": tag,
+                "registries": registries,
+                "files": files,
+                "counts": {
+                    "agents": len(agents.get("agents", {})),
+                    "tools": len(tools.get("tools", {})),
+                    "files": len(files),
+                },
+                "new_objects": written["objects"],
+                "new_bytes": written["bytes"],
+            }
+            _write_atomic(
+                self.manifest_path(manifest["name"]),
+                json.dumps(manifest, indent=2).encode("utf-8"),
+                self.durability,
+            )
+            return manifest
+
+    def _put(self, data: bytes, written: Dict) -> str:
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._object_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            blob = _compress(data)
+            _write_atomic(path, blob, self.durability)
+            written["objects"] += 1
+            written["bytes"] += len(blob)
+        return digest
+
+    def _hash_file(self, path: str, written: Dict) -> Optional[str]:
+        """Store a source file; unchanged files (same mtime and size) are not reread."""
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        key = (st.st_mtime_ns, st.st_size)
+        cached = self._file_hashes.get(path)
+        if cached is not None and cached[0] == key and os.path.exists(
+            self._object_path(cached[1])
+        ):
+            return cached[1]
+
+        with open(path, "rb") as f:
+            digest = self._put(f.read(), written)
+        self._file_hashes[path] = (key, digest)
+        return digest
+
+    def _source_files(self) -> List[str]:
+        paths = []
+        for directory in self.source_dirs:
+            if not os.path.isdir(directory):
+                continue
+            for dirpath, dirnames, filenames in os.walk(directory):
+                dirnames[:] = [d for d in dirnames if d != "__pycache__"]
+                paths.extend(
+                    os.path.join(dirpath, name)
+                    for name in filenames
+                    if not name.endswith((".pyc", ".tmp"))
+                )
+        return sorted(paths)
+
+    # ------------------------------------------------------------------
+    # Restore
+    # ------------------------------------------------------------------
+
+    def load(self, name: str) -> Dict:
+        """
+        Read and verify everything a backup references. Raises before any
+        state is modified if the manifest or an object is missing or corrupt.
+        """
+        manifest = self.get_manifest(name)
+        if manifest is None:
+            raise FileNotFoundError(f"Backup not found: {name}")
+
+        registries = {
+            kind: json.loads(self._get(digest))
+            for kind, digest in manifest["registries"].items()
+        }
+        files = {
+            os.path.join(PROJECT_ROOT, relpath): (digest, self._get(digest))
+            for relpath, digest in manifest["files"].items()
+        }
+        return {"manifest": manifest, "registries": registries, "files": files}
+
+    def restore_files(self, files: Dict[str, tuple]) -> List[str]:
+        """Swap in source files whose content differs from the backup."""
+        restored = []
+        for path, (digest, data) in files.items():
+            try:
+                with open(path, "rb") as f:
+                    if hashlib.sha256(f.read()).hexdigest() == digest:
+                        continue
+            except OSError:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+            _write_atomic(path, data, self.durability)
+            restored.append(path)
+        return restored
+
+    def remove_files_not_in(self, files: Dict[str, tuple]) -> List[str]:
+        """Delete generated sources that a backup doesn't have (newer than it)."""
+        keep = {os.path.abspath(path) for path in files}
+        removed = []
+        for path in self._source_files():
+            if os.path.abspath(path) in keep:
+                continue
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                continue
+            self._file_hashes.pop(path, None)
+            removed.append(path)
+        return removed
+
+    def _get(self, digest: str) -> bytes:
+        with open(self._object_path(digest), "rb") as f:
+            data = _decompress(f.read())
+        if hashlib.sha256(data).hexdigest() != digest:
+            raise ValueError(f"Corrupt backup object: {digest}")
+        return data
+
+    # ------------------------------------------------------------------
+    # Manifests and retention
+    # ------------------------------------------------------------------
+
+    def list_manifests(self) -> List[Dict]:
+        """All manifests, newest first."""
+        manifests = []
+        for filename in os.listdir(self.manifests_dir):
+            if filename.endswith(".json"):
+                manifest = self.get_manifest(filename[: -len(".json")])
+                if manifest is not None:
+                    manifests.append(manifest)
+        return sorted(manifests, key=lambda m: m["timestamp"], reverse=True)
+
+    def get_manifest(self, name: str) -> Optional[Dict]:
+        try:
+            with open(self.manifest_path(name), "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def prune(
+        self,
+        keep_last: int = REGISTRY_BACKUP_KEEP_LAST,
+        keep_days: float = REGISTRY_BACKUP_KEEP_DAYS,
+    ) -> Dict:
+        """
+        Delete manifests beyond the newest `keep_last` that are also older
+        than `keep_days`, then objects no remaining manifest references.
+        """
+        with self._exclusive():
+            cutoff = datetime.now().timestamp() - keep_days * 86400
+            manifests = self.list_manifests()
+            removed = []
+            for manifest in manifests[keep_last:]:
+                created = datetime.fromisoformat(manifest["timestamp"]).timestamp()
+                if created < cutoff:
+                    os.remove(self.manifest_path(manifest["name"]))
+                    removed.append(manifest["name"])
+
+            referenced = set()
+            for manifest in manifests:
+                if manifest["name"] not in removed:
+                    referenced.update(manifest["registries"].values())
+                    referenced.update(manifest["files"].values())
+
+            deleted_objects = 0
+            for prefix in os.listdir(self.objects_dir):
+                prefix_dir = os.path.join(self.objects_dir, prefix)
+                for filename in os.listdir(prefix_dir):
+                    if filename not in referenced:
+                        os.remove(os.path.join(prefix_dir, filename))
+                        deleted_objects += 1
+            return {"removed_manifests": removed, "deleted_objects": deleted_objects}
+
+    # ------------------------------------------------------------------
+    # Helpers
+    # ------------------------------------------------------------------
+
+    def _object_path(self, digest: str) -> str:
+        return os.path.join(self.objects_dir, digest[:2], digest)
+
+    def manifest_path(self, name: str) -> str:
+        if os.sep in name or name.startswith("."):
+            raise ValueError(f"Invalid backup name: {name}")
+        return os.path.join(self.manifests_dir, f"{name}.json")
+
+    def _new_name(self, tag: str = None) -> str:
+        name = f"backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        if tag:
+            name += f"_{tag}"
+        candidate, counter = name, 1
+        while os.path.exists(self.manifest_path(candidate)):
+            candidate = f"{name}_{counter}"
+            counter += 1
+        return candidate
+
+    @contextmanager
+    def _exclusive(self):
+        """Serialize backups and pruning across threads and processes."""
+        with self._lock:
+            with open(os.path.join(self.root, ".lock"), "w") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+# Global function to get the backup store of a directory
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_backup_store(root: str) -> BackupStore:
+    """Get the shared backup store for a backup directory - thread-safe."""
+    root = os.path.abspath(root)
+    store = _stores.get(root)
+    if store is None:
+        with _stores_lock:
+            store = _stores.get(root)
+            if store is None:
+                store = BackupStore(root)
+                _stores[root] = store
+    return store
@@ -0,0 +1,312 @@
+"""
+Registry Graph - Incrementally maintained agent/tool dependency graph
+Location: core/registry_graph.py
+
+A networkx DiGraph with an edge agent -> tool for every tool an agent uses,
+updated entry by entry as components are registered, change status or are
+removed. Missing dependencies, unused tools and per-entry validation results
+are derived from it and cached, so get_dependency_graph(), validate_all()
+and health_check() only redo work for entries that changed.
+
+Validation only depends on whether each entry's module file exists, so
+cached results are invalidated by file watcher events when the watcher runs,
+otherwise by the mtime of the directories holding the modules (creating,
+deleting or renaming a file bumps its directory's mtime) - one stat() per
+directory per report rather than one per entry. Reports are shared between callers and must
+be treated as read-only.
+"""
+
+import os
+import threading
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import networkx as nx
+
+from config import (
+    MIN_AGENT_LINES,
+    MAX_AGENT_LINES,
+    MIN_TOOL_LINES,
+    MAX_TOOL_LINES,
+)
+
+AGENT = "agent"
+TOOL = "tool"
+
+
+def _file_key(path: str) -> Optional[int]:
+    """mtime of a file or directory, or None if it does not exist."""
+    try:
+        return os.stat(path).st_mtime_ns
+    except (OSError, ValueError, TypeError):
+        return None
+
+
+class RegistryGraph:
+    """Dependency graph plus cached validation for one RegistryManager."""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._reset()
+
+    def _reset(self):
+        self.graph = nx.DiGraph()
+        # (kind, name) -> (missing file, size) issues; dependency issues come
+        # from the graph when a report is built
+        self._validation = {}
+        self._locations = {}  # abs module path -> (kind, name)
+        self._directories = {}  # module directory -> {(kind, name)}
+        self._directory_keys = {}  # module directory -> mtime at last sweep
+        self._counts = {AGENT: 0, TOOL: 0}
+        self._dependency_report = None
+        self._validation_report = None
+
+    def count(self, kind: str) -> int:
+        """Registered (non-placeholder) entries of a kind."""
+        return self._counts[kind]
+
+    def rebuild(self, agents: Dict[str, Dict], tools: Dict[str, Dict]):
+        with self._lock:
+            self._reset()
+            for name, entry in tools.items():
+                self.update(TOOL, name, entry)
+            for name, entry in agents.items():
+                self.update(AGENT, name, entry)
+
+    def update(self, kind: str, name: str, entry: Optional[Dict]):
+        """Apply one added/changed (entry) or removed (None) component."""
+        with self._lock:
+            node = (kind, name)
+            previous = self.graph.nodes[node].get("entry") if node in self.graph else None
+            if previous is not None:
+                self._forget_location(node, previous.get("location", ""))
+            self._counts[kind] += (entry is not None) - (previous is not None)
+            self._validation.pop(node, None)
+            self._dependency_report = None
+            self._validation_report = None
+
+            if kind == AGENT:
+                self._update_agent(node, entry)
+            else:
+                self._update_tool(node, entry)
+
+            if entry is not None:
+                location = os.path.abspath(entry.get("location", ""))
+                self._locations[location] = node
+                self._directories.setdefault(os.path.dirname(location), set()).add(node)
+
+    def on_files_changed(self, paths: Set[str]):
+        """File watcher callback: module files changed, revalidate their entries."""
+        with self._lock:
+            for path in paths:
+                node = self._locations.get(path)
+                if node is not None:
+                    self._validation.pop(node, None)
+                    self._validation_report = None
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def agent_dependencies(self, agent_name: str) -> Dict[str, List[str]]:
+        with self._lock:
+            node = (AGENT, agent_name)
+            if node not in self.graph or self.graph.nodes[node].get("entry") is None:
+                return {"tools": [], "missing_tools": []}
+
+            tools = self.graph.nodes[node]["entry"].get("uses_tools", []) or []
+            missing = [tool for tool in tools if not self._tool_active(tool)]
+            return {
+                "tools": list(tools),
+                "missing_tools": missing,
+                "available_tools": [tool for tool in tools if tool not in missing],
+            }
+
+    def tool_usage(self, tool_name: str) -> List[str]:
+        """Agents whose uses_tools lists the tool, whatever their status."""
+        with self._lock:
+            node = (TOOL, tool_name)
+            if node not in self.graph:
+                return []
+            return [agent for _, agent in self.graph.predecessors(node)]
+
+    def dependency_report(self) -> Dict:
+        """Same shape as RegistryManager.get_dependency_graph(); cached."""
+        with self._lock:
+            if self._dependency_report is None:
+                self._dependency_report = self._build_dependency_report()
+            return self._dependency_report
+
+    def validation_report(self, watching: bool = False) -> Dict:
+        """Same shape as RegistryManager.validate_all(); cached."""
+        with self._lock:
+            if not watching:
+                self._expire_changed_files()
+            if self._validation_report is None:
+                self._validation_report = self._build_validation_report()
+            return self._validation_report
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _update_agent(self, node: Tuple[str, str], entry: Optional[Dict]):
+        old_tools = []
+        if node in self.graph:
+            old_tools = [tool for _, tool in self.graph.out_edges(node)]
+            self.graph.remove_edges_from(list(self.graph.out_edges(node)))
+
+        if entry is None:
+            if node in self.graph:
+                self.graph.remove_node(node)
+        else:
+            # Update in place so nodes keep registration order in reports
+            self.graph.add_node(node, entry=entry)
+            for tool_name in entry.get("uses_tools", []) or []:
+                tool_node = (TOOL, tool_name)
+                if tool_node not in self.graph:
+                    self.graph.add_node(tool_node, entry=None)  # Missing tool
+                self.graph.add_edge(node, tool_node)
+
+        for tool_node in old_tools:
+            self._drop_placeholder(tool_node)
+
+    def _update_tool(self, node: Tuple[str, str], entry: Optional[Dict]):
+        if entry is not None:
+            if node in self.graph:
+                self.graph.nodes[node]["entry"] = entry
+            else:
+                self.graph.add_node(node, entry=entry)
+        elif node in self.graph:
+            # Keep the node while agents still reference it (as missing)
+            self.graph.nodes[node]["entry"] = None
+            self._drop_placeholder(node)
+
+    def _drop_placeholder(self, tool_node: Tuple[str, str]):
+        if (
+            tool_node in self.graph
+            and self.graph.nodes[tool_node].get("entry") is None
+            and self.graph.in_degree(tool_node) == 0
+        ):
+            self.graph.remove_node(tool_node)
+
+    def _tool_active(self, tool_name: str) -> bool:
+        node = (TOOL, tool_name)
+        if node not in self.graph:
+            return False
+        entry = self.graph.nodes[node].get("entry")
+        return entry is not None and entry.get("status") == "active"
+
+    def _entries(self, kind: str) -> Iterable[Tuple[str, Dict]]:
+        for (node_kind, name), data in self.graph.nodes(data=True):
+            if node_kind == kind and data.get("entry") is not None:
+                yield name, data["entry"]
+
+    def _build_dependency_report(self) -> Dict:
+        report = {
+            "agents_to_tools": {},
+            "tools_to_agents": {},
+            "missing_dependencies": [],
+            "unused_tools": [],
+        }
+        for name, entry in self._entries(AGENT):
+            if entry.get("status") != "active":
+                continue
+            tools = entry.get("uses_tools", []) or []
+            report["agents_to_tools"][name] = tools
+            for tool in tools:
+                if not self._tool_active(tool):
+                    report["missing_dependencies"].append(
+                        {"agent": name, "missing_tool": tool}
+                    )
+
+        for name, entry in self._entries(TOOL):
+            if entry.get("status") != "active":
+                continue
+            agents = self.tool_usage(name)
+            report["tools_to_agents"][name] = agents
+            if not agents:
+                report["unused_tools"].append(name)
+        return report
+
+    def _forget_location(self, node: Tuple[str, str], location: str):
+        location = os.path.abspath(location)
+        if self._locations.get(location) == node:
+            del self._locations[location]
+        directory = os.path.dirname(location)
+        nodes = self._directories.get(directory)
+        if nodes is not None:
+            nodes.discard(node)
+            if not nodes:
+                del self._directories[directory]
+                self._directory_keys.pop(directory, None)
+
+    def _file_issues(self, kind: str, name: str, entry: Dict) -> Tuple:
+        """(missing file issue, size issue) for an entry, cached until its file changes."""
+        node = (kind, name)
+        cached = self._validation.get(node)
+        if cached is not None:
+            return cached
+
+        file_path = entry.get("location", "")
+        missing = None if os.path.exists(file_path) else f"Missing file: {file_path}"
+
+        low, high = (
+            (MIN_AGENT_LINES, MAX_AGENT_LINES)
+            if kind == AGENT
+            else (MIN_TOOL_LINES, MAX_TOOL_LINES)
+        )
+        line_count = entry.get("line_count", 0)
+        size = None
+        if line_count < low or line_count > high:
+            size = f"Invalid size: {line_count} lines"
+
+        self._validation[node] = (missing, size)
+        return missing, size
+
+    def _expire_changed_files(self):
+        """Without a watcher, drop cached results in directories that changed."""
+        for directory, nodes in self._directories.items():
+            # Read the key before revalidating so a change racing with the
+            # revalidation is caught by the next sweep
+            key = _file_key(directory)
+            if self._directory_keys.get(directory, -1) == key:
+                continue
+            self._directory_keys[directory] = key
+            for node in nodes:
+                self._validation.pop(node, None)
+            self._validation_report = None
+
+    def _build_validation_report(self) -> Dict:
+        results = {
+            "valid_agents": [],
+            "invalid_agents": [],
+            "valid_tools": [],
+            "invalid_tools": [],
+            "missing_files": [],
+            "dependency_issues": [],
+        }
+
+        for kind, label in ((AGENT, "Agent"), (TOOL, "Tool")):
+            for name, entry in self._entries(kind):
+                missing_file, size = self._file_issues(kind, name, entry)
+                issues = []
+                if missing_file:
+                    issues.append(missing_file)
+                    results["missing_files"].append(f"{label}: {name}")
+
+                if kind == AGENT:
+                    missing_tools = self.agent_dependencies(name)["missing_tools"]
+                    if missing_tools:
+                        issues.append(f"Missing tools: {', '.join(missing_tools)}")
+                        results["dependency_issues"].append(
+                            {"agent": name, "missing": missing_tools}
+                        )
+
+                if size:
+                    issues.append(size)
+
+                if issues:
+                    results[f"invalid_{kind}s"].append({"name": name, "issues": issues})
+                else:
+                    results[f"valid_{kind}s"].append(name)
+        return results
@@ -0,0 +1,179 @@
+"""
+Registry Index - Ranked token search over agents and tools
+Location: core/registry_index.py
+
+Inverted index (term -> {entry name: weighted term frequency}) over each
+entry's name, tags and description, scored with BM25. Kept up to date by
+RegistryManager as entries are registered, reloaded or removed, so searches
+and planner shortlists cost a few dictionary lookups instead of a scan over
+every entry.
+"""
+
+import bisect
+import heapq
+import math
+import re
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# Names count more than tags, tags more than free-text description
+FIELD_WEIGHTS = {"name": 3.0, "tags": 2.0, "description": 1.0}
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+_WORD_PATTERN = re.compile(r"[a-z0-9]+")
+
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from in into is it of on or that the this "
+    "to with me my i you your please can could would should will".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens (snake_case and punctuation split), light plural stemming."""
+    tokens = []
+    for word in _WORD_PATTERN.findall((text or "").lower()):
+        if word in _STOPWORDS:
+            continue
+        if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        tokens.append(word)
+    return tokens
+
+
+class RegistryIndex:
+    """BM25 inverted index for one registry section (agents or tools)."""
+
+    def __init__(self):
+        self._postings = {}  # term -> {name: weighted tf}
+        self._terms = {}  # name -> {term: weighted tf}
+        self._lengths = {}  # name -> weighted document length
+        self._total_length = 0.0
+        self._vocabulary = []  # Sorted terms for prefix expansion
+        self._vocabulary_dirty = False
+        self._norms = None  # name -> BM25 length norm, cached between changes
+
+    def __len__(self) -> int:
+        return len(self._terms)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._terms
+
+    def rebuild(self, entries: Dict[str, Dict]):
+        self.__init__()
+        for name, entry in entries.items():
+            self.add(name, entry)
+
+    def add(self, name: str, entry: Dict):
+        """Index (or re-index) one entry."""
+        if name in self._terms:
+            self.remove(name)
+
+        terms = {}
+        fields = {
+            "name": name,
+            "tags": " ".join(str(tag) for tag in entry.get("tags", []) or []),
+            "description": entry.get("description") or "",
+        }
+        for field, text in fields.items():
+            for token in tokenize(text):
+                terms[token] = terms.get(token, 0.0) + FIELD_WEIGHTS[field]
+
+        self._terms[name] = terms
+        self._norms = None
+        length = sum(terms.values())
+        self._lengths[name] = length
+        self._total_length += length
+        for term, tf in terms.items():
+            if term not in self._postings:
+                self._postings[term] = {}
+                self._vocabulary_dirty = True
+            self._postings[term][name] = tf
+
+    def remove(self, name: str):
+        terms = self._terms.pop(name, None)
+        if terms is None:
+            return
+        self._norms = None
+        self._total_length -= self._lengths.pop(name)
+        for term in terms:
+            posting = self._postings[term]
+            posting.pop(name, None)
+            if not posting:
+                del self._postings[term]
+                self._vocabulary_dirty = True
+
+    def search(
+        self,
+        query: str,
+        top_k: Optional[int] = None,
+        accept: Callable[[str], bool] = None,
+    ) -> List[Tuple[str, float]]:
+        """
+        (name, score) pairs for entries matching any query term, best first.
+
+        Query terms without an exact match fall back to vocabulary terms they
+        prefix ("extract" finds "extractor"), at half weight. `accept` filters
+        candidates (status, tags, allowed names) before ranking.
+        """
+        doc_count = len(self._terms)
+        if not doc_count:
+            return []
+        norms = self._length_norms()
+
+        scores = {}
+        for term, weight in self._expand(tokenize(query)):
+            posting = self._postings[term]
+            idf = math.log(1 + (doc_count - len(posting) + 0.5) / (len(posting) + 0.5))
+            factor = weight * idf * (BM25_K1 + 1)
+            for name, tf in posting.items():
+                scores[name] = scores.get(name, 0.0) + factor * tf / (tf + norms[name])
+
+        ranked = None
+        if top_k and len(scores) > top_k:
+            # Filters rarely reject much, so rank first and filter the top;
+            # only fall back to filtering everything if too few survive
+            best = heapq.nlargest(top_k, scores, key=scores.get)
+            ranked = [name for name in best if accept is None or accept(name)]
+            if len(ranked) < top_k and len(ranked) < len(best):
+                ranked = None
+        if ranked is None:
+            ranked = [name for name in scores if accept is None or accept(name)]
+            ranked.sort(key=scores.get, reverse=True)
+            ranked = ranked[:top_k] if top_k else ranked
+
+        return [(name, round(scores[name], 4)) for name in ranked]
+
+    def _length_norms(self) -> Dict[str, float]:
+        """BM25 length normalisation per entry, recomputed after index changes."""
+        if self._norms is None:
+            avg_length = self._total_length / len(self._terms) or 1.0
+            self._norms = {
+                name: BM25_K1 * (1 - BM25_B + BM25_B * length / avg_length)
+                for name, length in self._lengths.items()
+            }
+        return self._norms
+
+    def _expand(self, tokens: Iterable[str]) -> List[Tuple[str, float]]:
+        expanded = {}
+        for token in tokens:
+            if token in self._postings:
+                expanded[token] = 1.0
+                continue
+            if len(token) < 3:
+                continue
+            for term in self._prefixed(token):
+                expanded.setdefault(term, 0.5)
+        return list(expanded.items())
+
+    def _prefixed(self, prefix: str) -> List[str]:
+        if self._vocabulary_dirty:
+            self._vocabulary = sorted(self._postings)
+            self._vocabulary_dirty = False
+        start = bisect.bisect_left(self._vocabulary, prefix)
+        matches = []
+        for term in self._vocabulary[start:]:
+            if not term.startswith(prefix):
+                break
+            matches.append(term)
+        return matches
@@ -0,0 +1,204 @@
+"""
+Registry Latency - Mergeable latency sketches and rolling outcome windows
+Location: core/registry_latency.py
+
+execution_count and a running avg_execution_time hide tail latency, so every
+agent and tool entry also keeps:
+
+- "latency": a log-bucketed histogram (DDSketch-style: bucket i holds values
+  in (gamma^(i-1), gamma^i] seconds). Any quantile is within
+  REGISTRY_LATENCY_ACCURACY relative error, two sketches merge by adding
+  bucket counts, and the sparse [index, count] list stays a few hundred
+  bytes of JSON whatever the number of executions.
+- "outcomes": per-slot [slot start, successes, errors, timeouts] counts over
+  the last REGISTRY_OUTCOME_WINDOW_SECONDS, next to lifetime error_count
+  and timeout_count.
+
+Timed-out executions count as outcomes but not as latency samples (their
+duration is the timeout, not the agent's).
+"""
+
+import math
+import time
+from typing import Dict, List, Optional
+
+from config import (
+    REGISTRY_LATENCY_ACCURACY,
+    REGISTRY_LATENCY_MAX_BUCKETS,
+    REGISTRY_LATENCY_MIN_SECONDS,
+    REGISTRY_OUTCOME_SLOT_SECONDS,
+    REGISTRY_OUTCOME_WINDOW_SECONDS,
+)
+
+SUCCESS = "success"
+ERROR = "error"
+TIMEOUT = "timeout"
+OUTCOMES = (SUCCESS, ERROR, TIMEOUT)
+
+_GAMMA = (1 + REGISTRY_LATENCY_ACCURACY) / (1 - REGISTRY_LATENCY_ACCURACY)
+_LOG_GAMMA = math.log(_GAMMA)
+
+
+class LatencySketch:
+    """Relative-error latency histogram over log-spaced buckets (seconds)."""
+
+    __slots__ = ("buckets", "count", "sum", "min", "max")
+
+    def __init__(self):
+        self.buckets = {}  # bucket index -> count
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+
+    def add(self, seconds: float, count: int = 1):
+        seconds = max(seconds, REGISTRY_LATENCY_MIN_SECONDS)
+        index = math.ceil(math.log(seconds) / _LOG_GAMMA)
+        self.buckets[index] = self.buckets.get(index, 0) + count
+        self.count += count
+        self.sum += seconds * count
+        self.min = seconds if self.min is None else min(self.min, seconds)
+        self.max = seconds if self.max is None else max(self.max, seconds)
+        self._collapse()
+
+    def merge(self, other: "LatencySketch"):
+        if not other.count:
+            return
+        for index, count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + count
+        self.count += other.count
+        self.sum += other.sum
+        self.min = other.min if self.min is None else min(self.min, other.min)
+        self.max = other.max if self.max is None else max(self.max, other.max)
+        self._collapse()
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Value at quantile q (0..1), None if the sketch is empty."""
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen > rank:
+                # Midpoint of the bucket in relative terms, clamped to what
+                # was actually observed
+                value = 2 * _GAMMA**index / (_GAMMA + 1)
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    def summary(self) -> Dict:
+        """count, mean, p50/p90/p95/p99 and max in seconds (rounded)."""
+        if not self.count:
+            return {"count": 0}
+        return {
+            "count": self.count,
+            "mean": round(self.sum / self.count, 4),
+            "p50": round(self.quantile(0.50), 4),
+            "p90": round(self.quantile(0.90), 4),
+            "p95": round(self.quantile(0.95), 4),
+            "p99": round(self.quantile(0.99), 4),
+            "max": round(self.max, 4),
+        }
+
+    def to_dict(self) -> Dict:
+        return {
+            "buckets": [[index, self.buckets[index]] for index in sorted(self.buckets)],
+            "count": self.count,
+            "sum": round(self.sum, 6),
+            "min": self.min,
+            "max": self.max,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict]) -> "LatencySketch":
+        sketch = cls()
+        if data:
+            sketch.buckets = {int(index): count for index, count in data["buckets"]}
+            sketch.count = data.get("count", 0)
+            sketch.sum = data.get("sum", 0.0)
+            sketch.min = data.get("min")
+            sketch.max = data.get("max")
+        return sketch
+
+    def _collapse(self):
+        """Fold the lowest buckets together to bound the size; tails stay exact."""
+        if len(self.buckets) <= REGISTRY_LATENCY_MAX_BUCKETS:
+            return
+        indexes = sorted(self.buckets)
+        excess = len(indexes) - REGISTRY_LATENCY_MAX_BUCKETS
+        target = indexes[excess]
+        for index in indexes[:excess]:
+            self.buckets[target] += self.buckets.pop(index)
+
+
+class OutcomeWindow:
+    """Success/error/timeout counts in fixed time slots over a rolling window."""
+
+    __slots__ = ("slots",)
+
+    def __init__(self, slots: List[List] = None):
+        self.slots = {slot[0]: list(slot[1:]) for slot in slots or []}
+
+    def add(self, outcome: str, timestamp: float = None, count: int = 1):
+        timestamp = time.time() if timestamp is None else timestamp
+        start = int(timestamp // REGISTRY_OUTCOME_SLOT_SECONDS) * REGISTRY_OUTCOME_SLOT_SECONDS
+        counts = self.slots.setdefault(start, [0, 0, 0])
+        counts[OUTCOMES.index(outcome)] += count
+
+    def merge(self, other: "OutcomeWindow"):
+        for start, other_counts in other.slots.items():
+            counts = self.slots.setdefault(start, [0, 0, 0])
+            for i, count in enumerate(other_counts):
+                counts[i] += count
+
+    def prune(self, now: float = None):
+        now = time.time() if now is None else now
+        cutoff = now - REGISTRY_OUTCOME_WINDOW_SECONDS
+        for start in [s for s in self.slots if s + REGISTRY_OUTCOME_SLOT_SECONDS <= cutoff]:
+            del self.slots[start]
+
+    def totals(self, now: float = None) -> Dict:
+        """Counts and rates over the window ending now."""
+        self.prune(now)
+        successes = sum(counts[0] for counts in self.slots.values())
+        errors = sum(counts[1] for counts in self.slots.values())
+        timeouts = sum(counts[2] for counts in self.slots.values())
+        executions = successes + errors + timeouts
+        return {
+            "window_seconds": REGISTRY_OUTCOME_WINDOW_SECONDS,
+            "executions": executions,
+            "errors": errors,
+            "timeouts": timeouts,
+            "error_rate": round(errors / executions, 4) if executions else 0.0,
+            "timeout_rate": round(timeouts / executions, 4) if executions else 0.0,
+        }
+
+    def to_list(self) -> List[List]:
+        return [[start, *self.slots[start]] for start in sorted(self.slots)]
+
+
+def merge_latency(entry: Dict, delta: Dict):
+    """Fold a buffered delta's sketch, outcomes and error counts into an entry."""
+    sketch = LatencySketch.from_dict(entry.get("latency"))
+    sketch.merge(delta["latency"])
+    entry["latency"] = sketch.to_dict()
+
+    window = OutcomeWindow(entry.get("outcomes"))
+    window.merge(delta["outcomes"])
+    window.prune()
+    entry["outcomes"] = window.to_list()
+
+    entry["error_count"] = (entry.get("error_count", 0) or 0) + delta["errors"]
+    entry["timeout_count"] = (entry.get("timeout_count", 0) or 0) + delta["timeouts"]
+
+
+def latency_report(entry: Dict) -> Dict:
+    """Percentiles plus windowed and lifetime outcomes of one registry entry."""
+    return {
+        "latency": LatencySketch.from_dict(entry.get("latency")).summary(),
+        "window": OutcomeWindow(entry.get("outcomes")).totals(),
+        "execution_count": entry.get("execution_count", 0),
+        "error_count": entry.get("error_count", 0),
+        "timeout_count": entry.get("timeout_count", 0),
+    }
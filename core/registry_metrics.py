@@ -0,0 +1,209 @@
+"""
+Registry Metrics Buffer - Write-behind execution metrics
+Location: core/registry_metrics.py
+
+update_agent_metrics() used to rewrite both registries (and force a full
+reload) on every agent execution. Executions are now accumulated in memory
+per agent (and tool) and folded into the registry in one write, either every
+REGISTRY_METRICS_FLUSH_INTERVAL seconds (the durability window) or as soon as
+REGISTRY_METRICS_FLUSH_THRESHOLD executions are pending, and at exit. Each
+delta carries a latency sketch and outcome window (core/registry_latency.py)
+that merge into the entry's own.
+"""
+
+import atexit
+import threading
+import time
+from datetime import datetime
+from typing import Dict
+
+from config import REGISTRY_METRICS_FLUSH_INTERVAL, REGISTRY_METRICS_FLUSH_THRESHOLD
+from core.registry_latency import (
+    ERROR,
+    SUCCESS,
+    TIMEOUT,
+    LatencySketch,
+    OutcomeWindow,
+)
+
+
+def new_delta() -> Dict:
+    return {
+        "count": 0,
+        "total_time": 0.0,
+        "last_executed": None,
+        "errors": 0,
+        "timeouts": 0,
+        "latency": LatencySketch(),
+        "outcomes": OutcomeWindow(),
+    }
+
+
+class MetricsBuffer:
+    """Accumulates execution metrics and flushes them to a storage backend."""
+
+    def __init__(
+        self,
+        storage,
+        flush_interval: float = REGISTRY_METRICS_FLUSH_INTERVAL,
+        flush_threshold: int = REGISTRY_METRICS_FLUSH_THRESHOLD,
+    ):
+        self.storage = storage
+        self.flush_interval = flush_interval
+        self.flush_threshold = flush_threshold
+        self._pending = {"agents": {}, "tools": {}}  # kind -> name -> delta
+        self._pending_count = 0
+        self._lock = threading.Lock()  # Guards _pending only
+        self._flush_lock = threading.Lock()  # One flush at a time
+        self._wakeup = threading.Event()
+        self._closed = False
+        self._thread = None
+        self._stats = {
+            "recorded": 0,
+            "flushes": 0,
+            "flushed_executions": 0,
+            "flush_errors": 0,
+            "last_flush": None,
+        }
+
+    def record(
+        self,
+        name: str,
+        execution_time: float,
+        outcome: str = SUCCESS,
+        kind: str = "agents",
+    ):
+        """Buffer one execution ("success", "error" or "timeout") of an agent or tool."""
+        now = time.time()
+        with self._lock:
+            delta = self._pending[kind].get(name)
+            if delta is None:
+                delta = self._pending[kind][name] = new_delta()
+            delta["count"] += 1
+            delta["total_time"] += execution_time
+            delta["last_executed"] = datetime.fromtimestamp(now).isoformat()
+            delta["outcomes"].add(outcome, now)
+            if outcome == TIMEOUT:
+                delta["timeouts"] += 1
+            else:
+                delta["latency"].add(execution_time)
+                if outcome == ERROR:
+                    delta["errors"] += 1
+            self._pending_count += 1
+            self._stats["recorded"] += 1
+            due = self._pending_count >= self.flush_threshold
+
+        if self.flush_interval <= 0 or self._closed:
+            # Write-through mode
+            self.flush()
+            return
+
+        self._ensure_thread()
+        if due:
+            self._wakeup.set()
+
+    def flush(self) -> int:
+        """Write all pending deltas in one storage write. Returns executions flushed."""
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {"agents": {}, "tools": {}}
+                count, self._pending_count = self._pending_count, 0
+            if not count:
+                return 0
+
+            for kind, deltas in pending.items():
+                if not deltas:
+                    continue
+                try:
+                    self.storage.apply_metrics(kind, deltas)
+                except Exception as e:
+                    executions = sum(delta["count"] for delta in deltas.values())
+                    print(
+                        f"DEBUG: Metrics flush failed, keeping {executions} executions: {e}"
+                    )
+                    self._requeue(kind, deltas, executions)
+                    self._stats["flush_errors"] += 1
+                    count -= executions
+            if not count:
+                return 0
+
+            self._stats["flushes"] += 1
+            self._stats["flushed_executions"] += count
+            self._stats["last_flush"] = time.time()
+            return count
+
+    def pending_count(self) -> int:
+        with self._lock:
+            return self._pending_count
+
+    def shutdown(self):
+        """Stop the flusher and write whatever is still pending."""
+        self._closed = True
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        self.flush()
+
+    def get_stats(self) -> Dict:
+        stats = dict(self._stats)
+        stats["pending"] = self.pending_count()
+        stats["flush_interval"] = self.flush_interval
+        stats["flush_threshold"] = self.flush_threshold
+        return stats
+
+    def _requeue(self, kind: str, deltas: Dict, count: int):
+        """Merge a failed batch back in front of anything recorded meanwhile."""
+        with self._lock:
+            for name, delta in deltas.items():
+                current = self._pending[kind].get(name)
+                if current is None:
+                    self._pending[kind][name] = delta
+                    continue
+                current["count"] += delta["count"]
+                current["total_time"] += delta["total_time"]
+                current["errors"] += delta["errors"]
+                current["timeouts"] += delta["timeouts"]
+                current["latency"].merge(delta["latency"])
+                current["outcomes"].merge(delta["outcomes"])
+            self._pending_count += count
+
+    def _ensure_thread(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="registry-metrics-flusher", daemon=True
+                )
+                self._thread.start()
+
+    def _run(self):
+        while not self._closed:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
+
+# Global function to get the metrics buffer of a storage backend
+_buffers = {}
+_buffers_lock = threading.Lock()
+
+
+def get_metrics_buffer(storage) -> MetricsBuffer:
+    """Get the shared metrics buffer for a storage backend - thread-safe."""
+    buffer = _buffers.get(storage)
+    if buffer is None:
+        with _buffers_lock:
+            buffer = _buffers.get(storage)
+            if buffer is None:
+                buffer = MetricsBuffer(storage)
+                _buffers[storage] = buffer
+                atexit.register(buffer.shutdown)
+    return buffer
+
+
+def flush_all_metrics() -> int:
+    """Flush every buffer now (e.g. before a backup or on shutdown)."""
+    with _buffers_lock:
+        buffers = list(_buffers.values())
+    return sum(buffer.flush() for buffer in buffers)
@@ -0,0 +1,380 @@
+"""
+Shared Registry Snapshot - One published snapshot for all worker processes
+Location: core/registry_shared.py
+
+Under gunicorn every worker used to keep its own parsed registry and poll
+storage to find out about changes. With REGISTRY_SHARED_SNAPSHOT on, one
+process (whichever holds the publisher lock; another takes over if it dies)
+watches storage and publishes each registry generation as a binary snapshot
+file that every worker memory-maps:
+
+    <path>          control block: magic, format version, sequence, generation
+    <path>.<seq>    snapshot: header, per-kind sorted record tables
+                    (name, entry offset/length, active flag), names, entries
+
+Workers read the sequence straight from the mapped control block (no system
+call), remap when it moves and decode individual entries lazily from the
+mapping, so a worker's snapshot memory stays flat as the registry grows and
+page cache is shared. The sequence is also what tells a worker's own
+RegistryManager to reload, instead of stat()ing storage every
+_reload_interval: the worker diffs the new snapshot against the one it last
+applied (comparing encoded entries in the mappings) and decodes only the
+entries that changed, never re-reading storage. Keep the path on tmpfs
+(/dev/shm) to avoid disk writes.
+"""
+
+import fcntl
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+from collections.abc import Mapping
+from typing import Dict, Iterator, List, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+from config import REGISTRY_SHARED_SNAPSHOT_PATH, REGISTRY_SHARED_ENTRY_CACHE
+from core.registry_singleton import RegistrySnapshot
+
+FORMAT_VERSION = 1
+_MAGIC = b"AFRS"
+_CONTROL = struct.Struct("<4sHHQQ")  # magic, version, flags, sequence, generation
+_CONTROL_SEQUENCE = struct.Struct("<Q")
+_CONTROL_SEQUENCE_OFFSET = 8
+# magic, version, flags, sequence, generation, published at, agents/tools tables
+_HEADER = struct.Struct("<4sHHQQdQQ")
+_SECTION = struct.Struct("<I")  # record count
+_RECORD = struct.Struct("<QIQIB3x")  # name off/len, entry off/len, active
+
+
+def _dumps(entry: Dict) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(entry, default=str, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(entry, separators=(",", ":"), default=str).encode("utf-8")
+
+
+def _loads(data) -> Dict:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(bytes(data))
+
+
+def encode_snapshot(sequence: int, generation: int, agents: Dict, tools: Dict) -> bytes:
+    """Serialize both registry sections into the snapshot file format."""
+    sections = []
+    for entries in (agents, tools):
+        names = sorted(entries, key=lambda name: name.encode("utf-8"))
+        sections.append(
+            [(name.encode("utf-8"), _dumps(entries[name]), entries[name]) for name in names]
+        )
+
+    # Layout: header | section tables | names | entries
+    offset = _HEADER.size
+    table_offsets = []
+    for records in sections:
+        table_offsets.append(offset)
+        offset += _SECTION.size + _RECORD.size * len(records)
+
+    names_blob = bytearray()
+    entries_blob = bytearray()
+    tables = bytearray()
+    names_start = offset
+    entries_start = names_start + sum(len(n) for records in sections for n, _, _ in records)
+    for records in sections:
+        tables += _SECTION.pack(len(records))
+        for name, data, entry in records:
+            tables += _RECORD.pack(
+                names_start + len(names_blob),
+                len(name),
+                entries_start + len(entries_blob),
+                len(data),
+                1 if entry.get("status") == "active" else 0,
+            )
+            names_blob += name
+            entries_blob += data
+
+    header = _HEADER.pack(
+        _MAGIC, FORMAT_VERSION, 0, sequence, generation, time.time(), *table_offsets
+    )
+    return b"".join([header, bytes(tables), bytes(names_blob), bytes(entries_blob)])
+
+
+class SharedSection(Mapping):
+    """Read-only name -> entry mapping decoded lazily from a snapshot mapping."""
+
+    def __init__(self, buffer: mmap.mmap, table_offset: int):
+        self._buffer = buffer
+        self._count = _SECTION.unpack_from(buffer, table_offset)[0]
+        self._records = table_offset + _SECTION.size
+        self._cache = {}
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __iter__(self) -> Iterator[str]:
+        for i in range(self._count):
+            yield self._name(self._record(i))
+
+    def __contains__(self, name) -> bool:
+        return isinstance(name, str) and self._find(name) is not None
+
+    def __getitem__(self, name: str) -> Dict:
+        entry = self._cache.get(name)
+        if entry is not None:
+            return entry
+        record = self._find(name) if isinstance(name, str) else None
+        if record is None:
+            raise KeyError(name)
+        _, _, entry_offset, entry_length, _ = record
+        entry = _loads(self._buffer[entry_offset : entry_offset + entry_length])
+        if len(self._cache) >= REGISTRY_SHARED_ENTRY_CACHE:
+            self._cache.clear()
+        self._cache[name] = entry
+        return entry
+
+    def load_entry(self, name: str) -> Dict:
+        """A freshly decoded (uncached, caller-owned) copy of one entry."""
+        record = self._find(name)
+        if record is None:
+            raise KeyError(name)
+        return _loads(self._buffer[record[2] : record[2] + record[3]])
+
+    def diff(self, older: "SharedSection") -> Tuple[List[str], List[str]]:
+        """
+        (added or changed names, removed names) relative to an older
+        section: one merge walk of the two sorted tables comparing encoded
+        entries in place, without decoding any of them.
+        """
+        changed, removed = [], []
+        i = j = 0
+        with memoryview(self._buffer) as new_view, memoryview(older._buffer) as old_view:
+            while i < self._count or j < older._count:
+                new = self._record(i) if i < self._count else None
+                old = older._record(j) if j < older._count else None
+                new_key = bytes(new_view[new[0] : new[0] + new[1]]) if new else None
+                old_key = bytes(old_view[old[0] : old[0] + old[1]]) if old else None
+                if old is None or (new is not None and new_key < old_key):
+                    changed.append(new_key.decode("utf-8"))
+                    i += 1
+                elif new is None or old_key < new_key:
+                    removed.append(old_key.decode("utf-8"))
+                    j += 1
+                else:
+                    if (
+                        new_view[new[2] : new[2] + new[3]]
+                        != old_view[old[2] : old[2] + old[3]]
+                    ):
+                        changed.append(new_key.decode("utf-8"))
+                    i += 1
+                    j += 1
+        return changed, removed
+
+    def is_active(self, name: str) -> bool:
+        record = self._find(name)
+        return record is not None and bool(record[4])
+
+    def active_names(self) -> List[str]:
+        """Names of active entries, from the record flags (no entry decoding)."""
+        names = []
+        for i in range(self._count):
+            record = self._record(i)
+            if record[4]:
+                names.append(self._name(record))
+        return names
+
+    def _record(self, i: int) -> tuple:
+        return _RECORD.unpack_from(self._buffer, self._records + i * _RECORD.size)
+
+    def _name(self, record: tuple) -> str:
+        return self._buffer[record[0] : record[0] + record[1]].decode("utf-8")
+
+    def _find(self, name: str) -> Optional[tuple]:
+        """Binary search of the sorted record table."""
+        key = name.encode("utf-8")
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            record = self._record(middle)
+            current = self._buffer[record[0] : record[0] + record[1]]
+            if current == key:
+                return record
+            if current < key:
+                low = middle + 1
+            else:
+                high = middle
+        return None
+
+
+class SharedRegistrySnapshot(RegistrySnapshot):
+    """RegistrySnapshot backed by a mapped snapshot file instead of dicts."""
+
+    __slots__ = ("sequence", "_buffer")
+
+    def __init__(self, buffer: mmap.mmap):
+        (
+            magic,
+            version,
+            _,
+            sequence,
+            generation,
+            published_at,
+            agents_offset,
+            tools_offset,
+        ) = _HEADER.unpack_from(buffer, 0)
+        if magic != _MAGIC or version != FORMAT_VERSION:
+            raise ValueError("Not a registry snapshot (or an incompatible version)")
+        object.__setattr__(self, "_buffer", buffer)  # Kept mapped while in use
+        object.__setattr__(self, "sequence", sequence)
+        object.__setattr__(self, "generation", generation)
+        object.__setattr__(self, "agents", SharedSection(buffer, agents_offset))
+        object.__setattr__(self, "tools", SharedSection(buffer, tools_offset))
+        object.__setattr__(self, "created_at", published_at)
+
+    def agent_exists(self, name: str) -> bool:
+        return self.agents.is_active(name)
+
+    def tool_exists(self, name: str) -> bool:
+        return self.tools.is_active(name)
+
+    def active_agent_names(self) -> List[str]:
+        return self.agents.active_names()
+
+
+def _map_file(path: str) -> mmap.mmap:
+    with open(path, "rb") as f:
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+class SharedSnapshotReader:
+    """Worker side: follows the control block and maps the current snapshot."""
+
+    role = "reader"
+
+    def __init__(self, path: str = None):
+        self.path = path or REGISTRY_SHARED_SNAPSHOT_PATH
+        self._control = None
+        self._snapshot = None
+        self._lock = threading.Lock()
+
+    def sequence(self) -> int:
+        """Published sequence, read from the mapped control block (0 if none yet)."""
+        control = self._control or self._map_control()
+        if control is None:
+            return 0
+        return _CONTROL_SEQUENCE.unpack_from(control, _CONTROL_SEQUENCE_OFFSET)[0]
+
+    def snapshot(self) -> Optional[SharedRegistrySnapshot]:
+        """Current snapshot, remapped only when the publisher moved the sequence."""
+        sequence = self.sequence()
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.sequence == sequence:
+            return snapshot
+        if not sequence:
+            return None
+
+        with self._lock:
+            if self._snapshot is not None and self._snapshot.sequence == sequence:
+                return self._snapshot
+            try:
+                self._snapshot = SharedRegistrySnapshot(
+                    _map_file(f"{self.path}.{sequence}")
+                )
+            except (OSError, ValueError) as e:
+                # Superseded between reading the sequence and opening it;
+                # keep the previous snapshot and retry on the next call
+                print(f"DEBUG: Shared snapshot {sequence} unavailable: {e}")
+            return self._snapshot
+
+    def _map_control(self) -> Optional[mmap.mmap]:
+        try:
+            with open(self.path, "rb") as f:
+                control = mmap.mmap(f.fileno(), _CONTROL.size, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+        if control[:4] != _MAGIC:
+            control.close()
+            return None
+        self._control = control
+        return control
+
+
+class SharedSnapshotPublisher(SharedSnapshotReader):
+    """The single writer: publishes snapshot files and bumps the control block."""
+
+    role = "publisher"
+
+    def __init__(self, path: str, lock_file):
+        super().__init__(path)
+        self._lock_file = lock_file  # Held for the life of the process
+        self._writable = self._open_control()
+
+    def publish(self, generation: int, agents: Dict, tools: Dict) -> int:
+        """Write the next snapshot file, then point the control block at it."""
+        with self._lock:
+            sequence = (
+                _CONTROL_SEQUENCE.unpack_from(self._writable, _CONTROL_SEQUENCE_OFFSET)[0]
+                + 1
+            )
+            data_path = f"{self.path}.{sequence}"
+            temp_path = f"{data_path}.tmp"
+            with open(temp_path, "wb") as f:
+                f.write(encode_snapshot(sequence, generation, agents, tools))
+            os.replace(temp_path, data_path)
+
+            # Sequence last: readers only follow it to a complete file
+            self._writable[: _CONTROL.size] = _CONTROL.pack(
+                _MAGIC, FORMAT_VERSION, 0, sequence, generation
+            )
+            self._remove_old_snapshots(sequence)
+            return sequence
+
+    def _open_control(self) -> mmap.mmap:
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if os.fstat(fd).st_size < _CONTROL.size:
+                os.ftruncate(fd, _CONTROL.size)
+            control = mmap.mmap(fd, _CONTROL.size)
+        finally:
+            os.close(fd)
+        if control[:4] != _MAGIC:
+            control[: _CONTROL.size] = _CONTROL.pack(_MAGIC, FORMAT_VERSION, 0, 0, 0)
+        return control
+
+    def _remove_old_snapshots(self, sequence: int):
+        """Keep the previous file for readers mid-open; older ones go (mappings survive)."""
+        directory, base = os.path.split(self.path)
+        for filename in os.listdir(directory or "."):
+            suffix = filename[len(base) + 1 :]
+            if filename.startswith(f"{base}.") and suffix.isdigit():
+                if int(suffix) < sequence - 1:
+                    try:
+                        os.remove(os.path.join(directory, filename))
+                    except FileNotFoundError:
+                        pass
+
+
+def acquire_publisher(path: str = None, blocking: bool = False) -> Optional[SharedSnapshotPublisher]:
+    """
+    Become the publisher if no other live process is. The lock is released by
+    the kernel when the process exits, so a blocking call is how a worker
+    waits to take over.
+    """
+    path = path or REGISTRY_SHARED_SNAPSHOT_PATH
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    lock_file = open(f"{path}.lock", "w")
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+    except BlockingIOError:
+        lock_file.close()
+        return None
+    return SharedSnapshotPublisher(path, lock_file)
+
+
+def open_shared_snapshot(path: str = None):
+    """Publisher if the lock is free, otherwise a reader of the current publisher."""
+    return acquire_publisher(path) or SharedSnapshotReader(path)
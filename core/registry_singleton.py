@@ -5,11 +5,60 @@ Ensures all components share the same registry instance with proper synchronizat
 
 import threading
 import os
+from contextlib import contextmanager
+from contextvars import ContextVar
+from types import MappingProxyType
 import fcntl
 import time
 import json
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Dict, List, Optional
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class RegistrySnapshot:
+    """
+    Immutable view of the registry at one generation.
+
+    Published by RegistrySingleton after every reload that changed anything;
+    readers just take the current object (no lock, no file checks) and can
+    keep using it for as long as they need a consistent view. Entry dicts are
+    shared with the live registry and must be treated as read-only; the
+    registry replaces an entry to change it, so a snapshot never sees a
+    change published after it.
+    """
+
+    __slots__ = ("generation", "agents", "tools", "created_at")
+
+    def __init__(self, generation: int, agents: Dict, tools: Dict):
+        object.__setattr__(self, "generation", generation)
+        object.__setattr__(self, "agents", MappingProxyType(dict(agents)))
+        object.__setattr__(self, "tools", MappingProxyType(dict(tools)))
+        object.__setattr__(self, "created_at", time.time())
+
+    def __setattr__(self, name, value):
+        raise AttributeError("RegistrySnapshot is immutable")
+
+    def get_agent(self, name: str) -> Optional[Dict]:
+        return self.agents.get(name)
+
+    def get_tool(self, name: str) -> Optional[Dict]:
+        return self.tools.get(name)
+
+    def agent_exists(self, name: str) -> bool:
+        agent = self.agents.get(name)
+        return agent is not None and agent.get("status") == "active"
+
+    def tool_exists(self, name: str) -> bool:
+        tool = self.tools.get(name)
+        return tool is not None and tool.get("status") == "active"
+
+    def active_agent_names(self) -> List[str]:
+        return [n for n, a in self.agents.items() if a.get("status") == "active"]
 
 
 class RegistrySingleton:
@@ -19,59 +68,304 @@ class RegistrySingleton:
     _lock = threading.RLock()  # Reentrant lock
     _registry = None
     _file_locks = {}
+    _file_lock_depth = {}  # filepath -> nesting depth of file_lock() in this process
     _last_reload = 0
     _reload_interval = 0.5  # Minimum seconds between reloads
+    _generation = 0  # Bumped whenever the registry's structure changes
+    _tokens = None  # Storage change token per kind, from the last reload
+    _identities = None  # {kind: {name: (version, status, created_at)}}
+    _listeners = None
+    _snapshot = None  # Current RegistrySnapshot, replaced (never mutated) on change
+    _push_updates = False  # A watcher delivers changes; skip polling on reads
+    _shared = None  # SharedSnapshotPublisher/Reader when REGISTRY_SHARED_SNAPSHOT is on
+    _shared_sequence = 0  # Shared sequence this process last reloaded at
+    _shared_applied = None  # Shared snapshot the live registry was last synced to
 
     def __new__(cls):
         if cls._instance is None:
             with cls._lock:
                 if cls._instance is None:
-                    cls._instance = super(RegistrySingleton, cls).__new__(cls)
+                    instance = super(RegistrySingleton, cls).__new__(cls)
                     # Import here to avoid circular dependency
                     from core.registry import RegistryManager
 
-                    cls._instance._registry = RegistryManager()
-                    cls._instance._last_reload = time.time()
+                    instance._registry = RegistryManager()
+                    instance._last_reload = time.time()
+                    instance._tokens = dict(instance._registry.storage.load_tokens)
+                    instance._identities = {
+                        kind: _identities(instance._section(kind))
+                        for kind in ("agents", "tools")
+                    }
+                    instance._listeners = []
+                    instance._publish_snapshot()
+                    cls._instance = instance
+                    instance._attach_shared_snapshot()
         return cls._instance
 
     def get_registry(self):
         """Get the shared registry instance with automatic reload if needed."""
+        # Between checks this is lock-free; only a due check takes the lock
+        if not self._should_reload():
+            return self._registry
         with self._lock:
-            # Check if files have been modified since last load
+            # Check if storage has changed since last load
             if self._should_reload():
                 self._reload_registry()
             return self._registry
 
+    def get_snapshot(self) -> RegistrySnapshot:
+        """Current published snapshot: one attribute read, no lock, no I/O."""
+        shared = self._shared
+        if shared is not None and shared.role == "reader":
+            # Attached to another process's snapshot: one read from the
+            # mapped control block, a remap only when it was republished
+            return shared.snapshot() or self._snapshot
+        return self._snapshot
+
+    def _publish_snapshot(self):
+        agents = self._published_section("agents")
+        tools = self._published_section("tools")
+        self._snapshot = RegistrySnapshot(self._generation, agents, tools)
+        if self._shared is not None and self._shared.role == "publisher":
+            try:
+                self._shared_sequence = self._shared.publish(
+                    self._generation, agents, tools
+                )
+            except Exception as e:
+                print(f"DEBUG: Shared registry snapshot publish failed: {e}")
+
+    def _attach_shared_snapshot(self):
+        """
+        With REGISTRY_SHARED_SNAPSHOT on, publish for all workers if no other
+        process does (watching storage so other workers' writes are picked
+        up), otherwise attach to the publisher's snapshot and wait in the
+        background to take over if it exits.
+        """
+        from config import REGISTRY_SHARED_SNAPSHOT
+
+        if REGISTRY_SHARED_SNAPSHOT != "on":
+            return
+        from core.registry_shared import open_shared_snapshot
+
+        self._shared = open_shared_snapshot()
+        if self._shared.role == "publisher":
+            self._become_publisher(self._shared)
+        else:
+            self._shared_sequence = self._shared.sequence()
+            threading.Thread(
+                target=self._await_publisher_role,
+                name="registry-shared-standby",
+                daemon=True,
+            ).start()
+        print(f"DEBUG: Shared registry snapshot attached as {self._shared.role}")
+
+    def _become_publisher(self, publisher):
+        from core.registry_watcher import start_registry_watcher
+
+        with self._lock:
+            self._shared = publisher
+            self._reload_registry()
+            self._publish_snapshot()
+        if start_registry_watcher() is None:
+            start_registry_watcher(mode="auto")
+
+    def _await_publisher_role(self):
+        from core.registry_shared import acquire_publisher
+
+        publisher = acquire_publisher(self._shared.path, blocking=True)
+        print("DEBUG: Previous registry publisher exited, taking over")
+        self._become_publisher(publisher)
+
     def _should_reload(self) -> bool:
-        """Check if registry files have been modified."""
-        current_time = time.time()
-        if current_time - self._last_reload < self._reload_interval:
+        """Rate-limit change checks; the check itself is a stat()/revision read."""
+        if self._push_updates:
             return False
+        shared = self._shared
+        if shared is not None and shared.role == "reader":
+            # The publisher watches storage; reload when it has published
+            return shared.sequence() != self._shared_sequence
+        return time.time() - self._last_reload >= self._reload_interval
 
-        # Check file modification times
-        from config import AGENTS_REGISTRY_PATH, TOOLS_REGISTRY_PATH
+    def enable_push_updates(self):
+        """Called once a watcher is subscribed: reads stop polling storage."""
+        self._push_updates = True
 
-        for path in [AGENTS_REGISTRY_PATH, TOOLS_REGISTRY_PATH]:
-            if os.path.exists(path):
-                mtime = os.path.getmtime(path)
-                if mtime > self._last_reload:
-                    return True
-        return False
+    def disable_push_updates(self):
+        """Called when the watcher stops: reads poll storage again, starting now."""
+        self._push_updates = False
+        self._last_reload = 0
 
-    def _reload_registry(self):
-        """Reload registry from disk with file locking."""
-        from core.registry import RegistryManager
+    def on_storage_changed(self, paths):
+        """Watcher callback: storage files changed, reload incrementally now."""
+        with self._lock:
+            self._reload_registry()
 
-        # Create new registry instance that will load from files
-        new_registry = RegistryManager()
+    def _reload_registry(self) -> Dict[str, Dict[str, List[str]]]:
+        """
+        Incrementally reload from storage.
 
-        # Atomic swap
-        self._registry = new_registry
+        Each registry is polled separately and only re-parsed if its content
+        changed. Changed entries are diffed against the last load by name and
+        (version, status, created_at) and swapped into the live registry; the
+        generation is bumped only for structural changes, not metric updates.
+        A shared-snapshot reader takes changed entries from the publisher's
+        snapshot instead of storage, decoding only those.
+        """
+        storage = self._registry.storage
+        shared_snapshot = None
+        if self._shared is not None and self._shared.role == "reader":
+            self._shared_sequence = self._shared.sequence()
+            shared_snapshot = self._shared.snapshot()
+        changes = {}
+        reloaded = False
+        for kind in ("agents", "tools"):
+            if shared_snapshot is not None:
+                # The publisher already parsed storage: apply only what its
+                # snapshot changed since the one applied last
+                updated, removed = self._shared_changes(kind, shared_snapshot)
+                if not updated and not removed:
+                    continue
+                reloaded = True
+                kind_changes = self._apply_entries(kind, updated, removed)
+            else:
+                token, document = storage.poll(kind, self._tokens.get(kind))
+                self._tokens[kind] = token
+                if document is None:
+                    continue
+                reloaded = True
+                kind_changes = self._apply_document(kind, document)
+            if any(kind_changes.values()):
+                changes[kind] = kind_changes
+        if shared_snapshot is not None:
+            self._shared_applied = shared_snapshot
+            self._shared_sequence = shared_snapshot.sequence
         self._last_reload = time.time()
-        print(f"DEBUG: Registry reloaded at {self._last_reload}")
+
+        if changes:
+            self._generation += 1
+        if reloaded:
+            self._publish_snapshot()
+
+        if changes:
+            print(
+                f"DEBUG: Registry reloaded (generation {self._generation}): {changes}"
+            )
+            for listener in list(self._listeners):
+                try:
+                    listener(changes)
+                except Exception as e:
+                    print(f"DEBUG: Registry change listener failed: {e}")
+        return changes
+
+    def _apply_document(self, kind: str, document: Dict) -> Dict[str, List[str]]:
+        """Diff a freshly loaded registry against the live one and apply it."""
+        new_entries = document.get(kind, {})
+        live = self._registry.agents if kind == "agents" else self._registry.tools
+        live_entries = live.get(kind, {})
+        updated = {
+            name: entry
+            for name, entry in new_entries.items()
+            if live_entries.get(name) != entry
+        }
+        removed = [name for name in live_entries if name not in new_entries]
+        for key, value in document.items():
+            if key != kind:
+                live[key] = value
+        return self._apply_entries(kind, updated, removed)
+
+    def _shared_changes(self, kind: str, snapshot) -> tuple:
+        """(updated entries, removed names) of a shared snapshot vs the last applied."""
+        section = getattr(snapshot, kind)
+        previous = self._shared_applied
+        if previous is None:
+            # First sync from the shared snapshot: take all of it
+            live_entries = self._section(kind)
+            changed = list(section)
+            removed = [name for name in live_entries if name not in section]
+        else:
+            changed, removed = section.diff(getattr(previous, kind))
+        return {name: section.load_entry(name) for name in changed}, removed
+
+    def _apply_entries(
+        self, kind: str, updated: Dict[str, Dict], removed: List[str]
+    ) -> Dict[str, List[str]]:
+        """Swap changed and removed entries into the live registry."""
+        live = self._registry.agents if kind == "agents" else self._registry.tools
+        live_entries = live.get(kind, {})
+        old_ids = self._identities[kind]
+        new_ids = dict(old_ids)
+        for name in removed:
+            new_ids.pop(name, None)
+        new_ids.update(_identities(updated))
+
+        changes = {
+            "added": [name for name in updated if name not in old_ids],
+            "removed": [name for name in removed if name in old_ids],
+            "updated": [
+                name
+                for name in updated
+                if name in old_ids and old_ids[name] != new_ids[name]
+            ],
+        }
+
+        # Build the new section reusing unchanged entry objects, then swap it
+        # in with one assignment so concurrent readers never see a dict
+        # mutating under iteration
+        merged = {
+            name: entry for name, entry in live_entries.items() if name not in updated
+        }
+        for name in removed:
+            merged.pop(name, None)
+        merged.update(updated)
+        replaced = list(updated)
+        # Registrations staged by an open transaction aren't in storage yet
+        for name, entry in self._registry.pending_entries(kind).items():
+            if merged.get(name) is not entry:
+                merged[name] = entry
+                replaced.append(name)
+        live[kind] = merged
+        self._registry.reindex(kind, replaced + removed)
+
+        self._identities[kind] = new_ids
+        return changes
+
+    def _section(self, kind: str) -> Dict:
+        registry = self._registry
+        document = registry.agents if kind == "agents" else registry.tools
+        return document.get(kind, {})
+
+    def _published_section(self, kind: str) -> Dict:
+        """The live section without changes still staged by open transactions."""
+        section = self._section(kind)
+        staged = self._registry.staged_previous(kind)
+        if not staged:
+            return section
+        section = dict(section)
+        for name, previous in staged.items():
+            if previous is None:
+                section.pop(name, None)
+            else:
+                section[name] = previous
+        return section
+
+    def add_change_listener(self, callback: Callable[[Dict], None]):
+        """
+        Call `callback(changes)` after every reload with structural changes,
+        where changes = {"agents"|"tools": {"added", "removed", "updated"}}.
+        """
+        with self._lock:
+            if callback not in self._listeners:
+                self._listeners.append(callback)
+
+    def get_generation(self) -> int:
+        """Structural generation of the registry (bumped on add/remove/update)."""
+        with self._lock:
+            if self._should_reload():
+                self._reload_registry()
+            return self._generation
 
     def force_reload(self):
-        """Force reload the registry from disk."""
+        """Check storage for changes now, ignoring the reload interval."""
         with self._lock:
             self._reload_registry()
 
@@ -88,23 +382,78 @@ class RegistrySingleton:
         if filepath in self._file_locks:
             fcntl.flock(self._file_locks[filepath], fcntl.LOCK_UN)
 
-    def atomic_update(self, filepath: str, data: dict):
-        """Atomically update a JSON file."""
+    @contextmanager
+    def file_lock(self, filepath: str):
+        """
+        Hold the registry lock and the cross-process lock of a registry file.
+        Re-entrant, so a read -> merge -> atomic_update() can run as one
+        critical section against every other writer of the file.
+        """
         with self._lock:
-            self.acquire_file_lock(filepath)
+            depth = self._file_lock_depth.get(filepath, 0)
+            if depth == 0:
+                self.acquire_file_lock(filepath)
+            self._file_lock_depth[filepath] = depth + 1
             try:
-                # Write to temporary file first
-                temp_path = f"{filepath}.tmp"
-                with open(temp_path, "w") as f:
-                    json.dump(data, f, indent=2, default=str)
+                yield
+            finally:
+                self._file_lock_depth[filepath] = depth
+                if depth == 0:
+                    self.release_file_lock(filepath)
 
-                # Atomic rename
-                os.replace(temp_path, filepath)
+    def atomic_update(self, filepath: str, data: dict, durability: str = None):
+        """
+        Atomically update a JSON file.
 
-                # Force sync to disk
-                os.sync()
-            finally:
-                self.release_file_lock(filepath)
+        durability (default REGISTRY_DURABILITY):
+            "full" - fsync the temp file, rename, fsync the directory
+            "file" - fsync the temp file, rename (rename may be lost on crash)
+            "none" - rename only; the OS flushes whenever it likes
+        Only this file and its directory are synced, never the whole machine.
+        """
+        from config import REGISTRY_DURABILITY
+
+        durability = durability or REGISTRY_DURABILITY
+        payload = _dumps(data)
+
+        with self.file_lock(filepath):
+            # Write to temporary file first
+            temp_path = f"{filepath}.tmp"
+            with open(temp_path, "wb") as f:
+                f.write(payload)
+                if durability in ("file", "full"):
+                    f.flush()
+                    os.fsync(f.fileno())
+
+            # Atomic rename
+            os.replace(temp_path, filepath)
+
+            # Make the rename itself durable
+            if durability == "full":
+                _fsync_directory(os.path.dirname(os.path.abspath(filepath)))
+
+
+def _dumps(data: dict) -> bytes:
+    """Compact JSON bytes; orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(data, default=str, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, separators=(",", ":"), default=str).encode("utf-8")
+
+
+def _fsync_directory(directory: str):
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _identities(entries: Dict) -> Dict[str, tuple]:
+    """What makes an entry structurally different: its version, status, creation."""
+    return {
+        name: (entry.get("version"), entry.get("status"), entry.get("created_at"))
+        for name, entry in entries.items()
+    }
 
 
 # Global function to get shared registry
@@ -122,6 +471,40 @@ def get_shared_registry():
     return _singleton.get_registry()
 
 
+# Snapshot pinned by the running workflow (per asyncio task / thread context)
+_pinned_snapshot = ContextVar("registry_snapshot", default=None)
+
+
+def get_registry_snapshot() -> RegistrySnapshot:
+    """The pinned snapshot if a workflow pinned one, else the latest published."""
+    pinned = _pinned_snapshot.get()
+    if pinned is not None:
+        return pinned
+    if _singleton is None:
+        get_shared_registry()
+    return _singleton.get_snapshot()
+
+
+@contextmanager
+def pinned_registry_snapshot():
+    """
+    Pin the current snapshot for the duration of a workflow so every step
+    sees the same registry, even if it is reloaded meanwhile.
+    """
+    snapshot = get_registry_snapshot()
+    token = _pinned_snapshot.set(snapshot)
+    try:
+        yield snapshot
+    finally:
+        _pinned_snapshot.reset(token)
+
+
+def get_registry_generation() -> int:
+    """Current structural generation of the shared registry."""
+    get_shared_registry()
+    return _singleton.get_generation()
+
+
 def force_global_reload():
     """Force reload all registry instances."""
     global _singleton
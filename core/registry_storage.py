@@ -0,0 +1,729 @@
+"""
+Registry Storage - Pluggable persistence for RegistryManager
+Location: core/registry_storage.py
+
+RegistryManager keeps agents/tools in memory as {"agents": {...}} and
+{"tools": {...}} documents and persists them through a storage backend:
+
+- JSONRegistryStorage: the original agents.json / tools.json files
+- SQLiteRegistryStorage: one row per component in a WAL-mode database with
+  indexes on name, status, tags and created_at, and transactional
+  multi-row writes
+
+Run `python -m core.registry_storage migrate` for a one-shot JSON -> SQLite copy.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from config import (
+    AGENTS_REGISTRY_PATH,
+    TOOLS_REGISTRY_PATH,
+    REGISTRY_BACKEND,
+    REGISTRY_DB_PATH,
+    REGISTRY_DURABILITY,
+)
+from core.registry_latency import merge_latency
+
+KINDS = ("agents", "tools")
+
+# Written only by metrics flushes (apply_metrics); an in-memory entry's copies
+# of them can be older than storage's until the next reload
+METRIC_FIELDS = (
+    "execution_count",
+    "avg_execution_time",
+    "last_executed",
+    "latency",
+    "outcomes",
+    "error_count",
+    "timeout_count",
+)
+
+
+def empty_document(kind: str) -> Dict:
+    return {kind: {}}
+
+
+def _stat_key(path: str) -> Tuple[int, int]:
+    st = os.stat(path)
+    return (st.st_mtime_ns, st.st_size)
+
+
+def merge_metrics(entry: Dict, delta: Dict):
+    """Apply an accumulated execution delta to a registry entry in place."""
+    count = entry.get("execution_count", 0) or 0
+    avg_time = entry.get("avg_execution_time", 0) or 0
+    new_count = count + delta["count"]
+
+    entry["execution_count"] = new_count
+    entry["avg_execution_time"] = round(
+        ((avg_time * count) + delta["total_time"]) / new_count, 3
+    )
+    entry["last_executed"] = delta["last_executed"]
+    merge_latency(entry, delta)
+
+
+def preserve_metrics(entry: Dict, stored: Optional[Dict]) -> Dict:
+    """
+    The entry to write over `stored`: metric fields come from the stored copy
+    when both are the same version, so a save of an entry loaded before the
+    last metrics flush doesn't revert it. A new version starts from its own.
+    """
+    if not stored or stored.get("version") != entry.get("version"):
+        return entry
+    metrics = {field: stored[field] for field in METRIC_FIELDS if field in stored}
+    if all(entry.get(field) == value for field, value in metrics.items()):
+        return entry
+    return {**entry, **metrics}
+
+
+class RegistryStorage:
+    """Interface every backend implements."""
+
+    name = "base"
+
+    def load(self, kind: str) -> Dict:
+        """Full document for kind ("agents" or "tools")."""
+        raise NotImplementedError
+
+    def save(
+        self,
+        kind: str,
+        document: Dict,
+        changed: Optional[Iterable[str]] = None,
+        removed: Optional[Iterable[str]] = None,
+    ):
+        """
+        Persist a document. `changed`/`removed` name the entries touched
+        since the last save; backends that store per entry write only those,
+        and fall back to a full sync when both are None.
+        """
+        raise NotImplementedError
+
+    def save_many(self, batch: Dict[str, Tuple]):
+        """
+        Persist several registries together: batch = {kind: (document,
+        changed, removed)}. Backends that can commit them as one write do.
+        """
+        for kind, (document, changed, removed) in batch.items():
+            self.save(kind, document, changed=changed, removed=removed)
+
+    def query(
+        self, kind: str, status: Optional[str] = None, tags: List[str] = None
+    ) -> Optional[List[str]]:
+        """Names matching the filters, newest first; None if not indexed."""
+        return None
+
+    def statistics(self, kind: str) -> Optional[Dict]:
+        """Aggregate counts for get_statistics; None if not supported."""
+        return None
+
+    def apply_metrics(self, kind: str, deltas: Dict[str, Dict]):
+        """
+        Fold buffered execution deltas (see registry_metrics.new_delta) into
+        the persisted entries in one write, atomically with respect to save()
+        from this and other processes.
+        """
+        raise NotImplementedError
+
+    def poll(self, kind: str, token) -> Tuple[Any, Optional[Dict]]:
+        """
+        Cheap change check for incremental reloads.
+
+        Returns (new_token, document) where document is None when nothing
+        changed since `token` (as returned by a previous poll, or
+        load_tokens[kind] after load()).
+        """
+        raise NotImplementedError
+
+    def watch_paths(self) -> List[str]:
+        """Files whose modification means the registry changed."""
+        return []
+
+    def describe(self) -> Dict:
+        return {"backend": self.name}
+
+    def close(self):
+        pass
+
+
+class JSONRegistryStorage(RegistryStorage):
+    """Whole-document JSON files (the original registry format)."""
+
+    name = "json"
+
+    def __init__(self, agents_path: str = None, tools_path: str = None):
+        self.paths = {
+            "agents": agents_path or AGENTS_REGISTRY_PATH,
+            "tools": tools_path or TOOLS_REGISTRY_PATH,
+        }
+        # (stat key, content hash) of the bytes each load() parsed
+        self.load_tokens = {}
+        # (stat key, document) of each file as last read or written under the
+        # file lock, so a save doesn't re-parse a file nobody else changed
+        self._disk = {}
+
+    def load(self, kind: str) -> Dict:
+        path = self.paths[kind]
+        print(f"DEBUG: Loading registry from {path}")
+
+        try:
+            if not os.path.exists(path):
+                print(f"DEBUG: Registry file doesn't exist: {path}")
+                self.load_tokens[kind] = (None, None)
+                return empty_document(kind)
+
+            stat_key, content = self._read(path)
+            self.load_tokens[kind] = (stat_key, hashlib.sha1(content).hexdigest())
+            return self._parse(kind, path, content)
+
+        except (FileNotFoundError, json.JSONDecodeError) as e:
+            print(f"DEBUG: Error loading registry {path}: {e}")
+            return empty_document(kind)
+
+    def poll(self, kind, token):
+        # stat() first; the file is read and hashed only if its stat changed,
+        # and parsed only if its content did (touch/rewrite-same is a no-op)
+        path = self.paths[kind]
+        old_stat, old_hash = token or (None, None)
+        try:
+            if _stat_key(path) == old_stat:
+                return token, None
+            stat_key, content = self._read(path)
+        except FileNotFoundError:
+            if old_stat is None:
+                return (None, None), None
+            return (None, None), empty_document(kind)
+
+        content_hash = hashlib.sha1(content).hexdigest()
+        if content_hash == old_hash:
+            return (stat_key, content_hash), None
+        try:
+            document = self._parse(kind, path, content)
+        except json.JSONDecodeError as e:
+            # Mid-write or corrupt: keep the old token so the next poll retries
+            print(f"DEBUG: Error parsing registry {path}: {e}")
+            return token, None
+        return (stat_key, content_hash), document
+
+    def _read(self, path: str) -> Tuple[Tuple[int, int], bytes]:
+        stat_key = _stat_key(path)
+        with open(path, "rb") as f:
+            return stat_key, f.read()
+
+    def _parse(self, kind: str, path: str, content: bytes) -> Dict:
+        data = json.loads(content)
+        print(f"DEBUG: Loaded registry data keys: {list(data.keys())}")
+
+        # Ensure proper structure
+        if kind not in data:
+            print(f"DEBUG: Registry {path} missing '{kind}' key, creating empty")
+            return empty_document(kind)
+        return data
+
+    def save(self, kind, document, changed=None, removed=None):
+        # The file is re-read under its lock: a partial save writes only the
+        # named entries over what is on disk now, and no save reverts
+        # metrics flushed since `document` was loaded
+        from core.registry_singleton import RegistrySingleton
+
+        path = self.paths[kind]
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with RegistrySingleton().file_lock(path):
+            current = self._current(kind)
+            stored = current.get(kind, {}) if current is not None else {}
+            entries = document.get(kind, {})
+
+            if current is None or (changed is None and removed is None):
+                merged = {
+                    name: preserve_metrics(entry, stored.get(name))
+                    for name, entry in entries.items()
+                }
+            else:
+                merged = dict(stored)
+                for name in removed or []:
+                    merged.pop(name, None)
+                for name in changed or []:
+                    if name in entries:
+                        merged[name] = preserve_metrics(entries[name], stored.get(name))
+
+            output = {key: value for key, value in document.items() if key != kind}
+            output[kind] = merged
+            self._write(kind, output)
+
+    def apply_metrics(self, kind, deltas):
+        # One critical section from read to write, so a registration saved
+        # meanwhile by this or another process can't be overwritten
+        from core.registry_singleton import RegistrySingleton
+
+        path = self.paths[kind]
+        with RegistrySingleton().file_lock(path):
+            current = self._current(kind)
+            if current is None:
+                raise ValueError(f"Registry {path} could not be parsed")
+            entries = current.get(kind, {})
+            touched = [name for name in deltas if name in entries]
+            if not touched:
+                return
+
+            updated = dict(entries)
+            for name in touched:
+                # Copies: the cached document's entries are never modified
+                entry = updated[name] = dict(entries[name])
+                merge_metrics(entry, deltas[name])
+            self._write(kind, {**current, kind: updated})
+
+    def _current(self, kind: str) -> Optional[Dict]:
+        """
+        The file's document as it is now (call under the file lock); None if
+        it can't be parsed. Re-read only if its stat changed since this
+        storage last read or wrote it.
+        """
+        path = self.paths[kind]
+        try:
+            stat_key = _stat_key(path)
+        except FileNotFoundError:
+            return empty_document(kind)
+        cached = self._disk.get(kind)
+        if cached is not None and cached[0] == stat_key:
+            return cached[1]
+
+        stat_key, content = self._read(path)
+        try:
+            document = json.loads(content)
+        except json.JSONDecodeError as e:
+            print(f"DEBUG: Error parsing registry {path}: {e}")
+            return None
+        document.setdefault(kind, {})
+        self._disk[kind] = (stat_key, document)
+        return document
+
+    def _write(self, kind: str, document: Dict):
+        from core.registry_singleton import RegistrySingleton
+
+        path = self.paths[kind]
+        RegistrySingleton().atomic_update(path, document)
+        self._disk[kind] = (_stat_key(path), document)
+
+    def watch_paths(self) -> List[str]:
+        return list(self.paths.values())
+
+    def describe(self) -> Dict:
+        return {"backend": self.name, "paths": dict(self.paths)}
+
+
+class SQLiteRegistryStorage(RegistryStorage):
+    """One row per component, indexed for filtered listing and statistics."""
+
+    name = "sqlite"
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS components (
+        kind TEXT NOT NULL,
+        name TEXT NOT NULL,
+        status TEXT,
+        created_at TEXT,
+        version TEXT,
+        is_prebuilt INTEGER NOT NULL DEFAULT 0,
+        data TEXT NOT NULL,
+        PRIMARY KEY (kind, name)
+    );
+    CREATE INDEX IF NOT EXISTS idx_components_status
+        ON components (kind, status, created_at);
+    CREATE INDEX IF NOT EXISTS idx_components_created
+        ON components (kind, created_at);
+    CREATE TABLE IF NOT EXISTS component_tags (
+        kind TEXT NOT NULL,
+        name TEXT NOT NULL,
+        tag TEXT NOT NULL,
+        PRIMARY KEY (kind, name, tag)
+    );
+    CREATE INDEX IF NOT EXISTS idx_component_tags_tag
+        ON component_tags (kind, tag);
+    CREATE TABLE IF NOT EXISTS registry_meta (
+        kind TEXT PRIMARY KEY,
+        extra TEXT NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS registry_revision (
+        kind TEXT PRIMARY KEY,
+        revision INTEGER NOT NULL
+    );
+    """
+
+    def __init__(self, db_path: str = None):
+        self.db_path = db_path or REGISTRY_DB_PATH
+        os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(
+            self.db_path, check_same_thread=False, isolation_level=None
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # WAL + NORMAL fsyncs at checkpoints only; FULL fsyncs every commit
+        synchronous = {"full": "FULL", "file": "NORMAL", "none": "OFF"}
+        self._conn.execute(
+            f"PRAGMA synchronous={synchronous.get(REGISTRY_DURABILITY, 'NORMAL')}"
+        )
+        self._conn.executescript(self.SCHEMA)
+        # Serialized form of each row as last written, so a full save only
+        # rewrites entries that actually changed
+        self._persisted = {kind: {} for kind in KINDS}
+        # Revision of each kind as of the last load(); bumped by every write
+        self.load_tokens = {}
+
+    def load(self, kind: str) -> Dict:
+        with self._lock:
+            self.load_tokens[kind] = self._revision(kind)
+            rows = self._conn.execute(
+                "SELECT name, data FROM components WHERE kind = ?", (kind,)
+            ).fetchall()
+            meta = self._conn.execute(
+                "SELECT extra FROM registry_meta WHERE kind = ?", (kind,)
+            ).fetchone()
+
+        document = json.loads(meta[0]) if meta else {}
+        document[kind] = {name: json.loads(data) for name, data in rows}
+        self._persisted[kind] = dict(rows)
+        return document
+
+    def save(self, kind, document, changed=None, removed=None):
+        self.save_many({kind: (document, changed, removed)})
+
+    def save_many(self, batch):
+        # All kinds in one SQLite transaction
+        plans = {
+            kind: self._plan_save(kind, document, changed, removed)
+            for kind, (document, changed, removed) in batch.items()
+        }
+
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                for kind, (removed, upserts, extra) in plans.items():
+                    for name in removed:
+                        self._delete_row(kind, name)
+                    for name, entry, data in upserts:
+                        entry, data = self._keep_metrics(kind, name, entry, data)
+                        self._write_row(kind, name, entry, data)
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO registry_meta (kind, extra) VALUES (?, ?)",
+                        (kind, json.dumps(extra, default=str)),
+                    )
+                    self._bump_revision(kind)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+        for kind, (removed, upserts, _) in plans.items():
+            persisted = self._persisted[kind]
+            for name in removed:
+                persisted.pop(name, None)
+            for name, _, data in upserts:
+                persisted[name] = data
+
+    def _keep_metrics(self, kind: str, name: str, entry: Dict, data: str) -> Tuple:
+        """
+        (entry, serialized) to write over the row's current value: metrics
+        flushed since the entry was loaded are kept (call inside the write
+        transaction).
+        """
+        row = self._conn.execute(
+            "SELECT data FROM components WHERE kind = ? AND name = ?", (kind, name)
+        ).fetchone()
+        if row is None:
+            return entry, data
+        merged = preserve_metrics(entry, json.loads(row[0]))
+        if merged is entry:
+            return entry, data
+        return merged, json.dumps(merged, default=str)
+
+    def _plan_save(self, kind, document, changed, removed):
+        """(removed names, [(name, entry, serialized)] to upsert, extra keys)."""
+        entries = document.get(kind, {})
+        persisted = self._persisted[kind]
+
+        if changed is None and removed is None:
+            removed = [name for name in persisted if name not in entries]
+            changed = entries.keys()
+        changed = [name for name in (changed or []) if name in entries]
+        removed = list(removed or [])
+
+        upserts = []
+        for name in changed:
+            data = json.dumps(entries[name], default=str)
+            if persisted.get(name) != data:
+                upserts.append((name, entries[name], data))
+
+        extra = {k: v for k, v in document.items() if k != kind}
+        return removed, upserts, extra
+
+    def query(self, kind, status=None, tags=None):
+        sql = "SELECT c.name FROM components c WHERE c.kind = ?"
+        params = [kind]
+        if status is not None:
+            sql += " AND c.status = ?"
+            params.append(status)
+        if tags:
+            placeholders = ",".join("?" for _ in tags)
+            sql += (
+                " AND EXISTS (SELECT 1 FROM component_tags t WHERE t.kind = c.kind"
+                f" AND t.name = c.name AND t.tag IN ({placeholders}))"
+            )
+            params.extend(tags)
+        sql += " ORDER BY c.created_at DESC"
+
+        with self._lock:
+            return [row[0] for row in self._conn.execute(sql, params)]
+
+    def statistics(self, kind):
+        with self._lock:
+            row = self._conn.execute(
+                """
+                SELECT COUNT(*),
+                       COALESCE(SUM(is_prebuilt), 0),
+                       COALESCE(SUM(json_extract(data, '$.execution_count')), 0),
+                       COALESCE(SUM(json_extract(data, '$.line_count')), 0),
+                       COALESCE(SUM(json_array_length(data, '$.used_by_agents')), 0)
+                FROM components
+                WHERE kind = ? AND status = 'active'
+                """,
+                (kind,),
+            ).fetchone()
+            newest = self._conn.execute(
+                "SELECT name FROM components WHERE kind = ? AND status = 'active'"
+                " ORDER BY created_at DESC LIMIT 1",
+                (kind,),
+            ).fetchone()
+            most_used = self._conn.execute(
+                "SELECT name FROM components WHERE kind = ? AND status = 'active'"
+                " ORDER BY COALESCE(json_extract(data, '$.execution_count'), 0) DESC"
+                " LIMIT 1",
+                (kind,),
+            ).fetchone()
+
+        total, prebuilt, executions, lines, used_by = row
+        return {
+            "active": total,
+            "prebuilt": prebuilt,
+            "generated": total - prebuilt,
+            "total_executions": executions,
+            "total_lines": lines,
+            "total_used_by": used_by,
+            "newest": newest[0] if newest else None,
+            "most_used": most_used[0] if most_used else None,
+        }
+
+    def apply_metrics(self, kind, deltas):
+        # Counters are updated in place with json_set; the latency sketch and
+        # outcome window are merged in Python from the rows' current values,
+        # read inside the same write transaction. _persisted keeps the
+        # pre-update text: an in-memory copy that predates the flush still
+        # matches it, so a later save() skips the row, and one that changed
+        # otherwise is written with the row's metrics (_keep_metrics).
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                params = []
+                for name, delta in deltas.items():
+                    row = self._conn.execute(
+                        """
+                        SELECT json_extract(data, '$.latency'),
+                               json_extract(data, '$.outcomes'),
+                               json_extract(data, '$.error_count'),
+                               json_extract(data, '$.timeout_count')
+                        FROM components WHERE kind = ? AND name = ?
+                        """,
+                        (kind, name),
+                    ).fetchone()
+                    if row is None:
+                        continue
+                    current = {
+                        "latency": json.loads(row[0]) if row[0] else None,
+                        "outcomes": json.loads(row[1]) if row[1] else None,
+                        "error_count": row[2],
+                        "timeout_count": row[3],
+                    }
+                    merge_latency(current, delta)
+                    params.append(
+                        {
+                            "kind": kind,
+                            "name": name,
+                            "count": delta["count"],
+                            "total_time": delta["total_time"],
+                            "last_executed": delta["last_executed"],
+                            "latency": json.dumps(current["latency"]),
+                            "outcomes": json.dumps(current["outcomes"]),
+                            "error_count": current["error_count"],
+                            "timeout_count": current["timeout_count"],
+                        }
+                    )
+                self._conn.executemany(
+                    """
+                    UPDATE components SET data = json_set(
+                        data,
+                        '$.execution_count',
+                        COALESCE(json_extract(data, '$.execution_count'), 0) + :count,
+                        '$.avg_execution_time',
+                        ROUND(
+                            (COALESCE(json_extract(data, '$.avg_execution_time'), 0)
+                             * COALESCE(json_extract(data, '$.execution_count'), 0)
+                             + :total_time)
+                            / (COALESCE(json_extract(data, '$.execution_count'), 0)
+                               + :count),
+                            3
+                        ),
+                        '$.last_executed',
+                        :last_executed,
+                        '$.latency',
+                        json(:latency),
+                        '$.outcomes',
+                        json(:outcomes),
+                        '$.error_count',
+                        :error_count,
+                        '$.timeout_count',
+                        :timeout_count
+                    )
+                    WHERE kind = :kind AND name = :name
+                    """,
+                    params,
+                )
+                self._bump_revision(kind)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def poll(self, kind, token):
+        revision = self._revision(kind)
+        if revision == token:
+            return token, None
+        document = self.load(kind)
+        return self.load_tokens[kind], document
+
+    def watch_paths(self) -> List[str]:
+        return [self.db_path, f"{self.db_path}-wal"]
+
+    def describe(self) -> Dict:
+        return {"backend": self.name, "path": self.db_path}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _revision(self, kind: str) -> int:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT revision FROM registry_revision WHERE kind = ?", (kind,)
+            ).fetchone()
+        return row[0] if row else 0
+
+    def _bump_revision(self, kind: str):
+        self._conn.execute(
+            """
+            INSERT INTO registry_revision (kind, revision) VALUES (?, 1)
+            ON CONFLICT (kind) DO UPDATE SET revision = revision + 1
+            """,
+            (kind,),
+        )
+
+    def _write_row(self, kind: str, name: str, entry: Dict, data: str):
+        self._conn.execute(
+            """
+            INSERT OR REPLACE INTO components
+                (kind, name, status, created_at, version, is_prebuilt, data)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                kind,
+                name,
+                entry.get("status"),
+                str(entry.get("created_at") or ""),
+                entry.get("version"),
+                1 if entry.get("is_prebuilt") else 0,
+                data,
+            ),
+        )
+        self._conn.execute(
+            "DELETE FROM component_tags WHERE kind = ? AND name = ?", (kind, name)
+        )
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO component_tags (kind, name, tag) VALUES (?, ?, ?)",
+            [(kind, name, str(tag)) for tag in entry.get("tags", []) or []],
+        )
+
+    def _delete_row(self, kind: str, name: str):
+        self._conn.execute(
+            "DELETE FROM components WHERE kind = ? AND name = ?", (kind, name)
+        )
+        self._conn.execute(
+            "DELETE FROM component_tags WHERE kind = ? AND name = ?", (kind, name)
+        )
+
+
+# Storages are shared per backend and location, so registry reloads reuse one
+# SQLite connection and per-storage state (e.g. the metrics buffer) is
+# process-wide
+_storages = {}
+_storages_lock = threading.Lock()
+
+
+def build_registry_storage(
+    backend: str = None, agents_path: str = None, tools_path: str = None
+) -> RegistryStorage:
+    """Get the storage backend selected by REGISTRY_BACKEND."""
+    backend = backend or REGISTRY_BACKEND
+    if backend == "json":
+        key = (
+            "json",
+            agents_path or AGENTS_REGISTRY_PATH,
+            tools_path or TOOLS_REGISTRY_PATH,
+        )
+        factory = lambda: JSONRegistryStorage(agents_path, tools_path)
+    elif backend == "sqlite":
+        key = ("sqlite", REGISTRY_DB_PATH)
+        factory = lambda: SQLiteRegistryStorage(REGISTRY_DB_PATH)
+    else:
+        raise ValueError(f"Unknown registry backend '{backend}'")
+
+    with _storages_lock:
+        if key not in _storages:
+            _storages[key] = factory()
+        return _storages[key]
+
+
+def migrate_json_to_sqlite(
+    agents_path: str = None, tools_path: str = None, db_path: str = None
+) -> Dict[str, int]:
+    """Copy the JSON registries into SQLite. Safe to re-run (rows are replaced)."""
+    source = JSONRegistryStorage(agents_path, tools_path)
+    target = SQLiteRegistryStorage(db_path)
+    counts = {}
+    try:
+        for kind in KINDS:
+            document = source.load(kind)
+            target.save(kind, document)
+            counts[kind] = len(document.get(kind, {}))
+    finally:
+        target.close()
+    return counts
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Registry storage utilities")
+    parser.add_argument("command", choices=["migrate"])
+    parser.add_argument("--agents", default=AGENTS_REGISTRY_PATH)
+    parser.add_argument("--tools", default=TOOLS_REGISTRY_PATH)
+    parser.add_argument("--db", default=REGISTRY_DB_PATH)
+    args = parser.parse_args()
+
+    counts = migrate_json_to_sqlite(args.agents, args.tools, args.db)
+    print(
+        f"✅ Migrated {counts['agents']} agents and {counts['tools']} tools to {args.db}"
+    )
+    print("Set REGISTRY_BACKEND=sqlite to use it.")
@@ -0,0 +1,206 @@
+"""
+Registry Transaction - Batched agent/tool registration
+Location: core/registry_transaction.py
+
+Every register_agent/register_tool used to fsync its source file, rewrite
+one or both registries and force a global reload. Inside a transaction,
+registrations still write and validate their source immediately (so callers
+get the same success/error results and can register agents against tools
+staged a moment earlier), but the registry entries only live in memory until
+commit, which fsyncs the staged sources and persists both registries in one
+locked write followed by one reload notification:
+
+    with registry.transaction():
+        registry.register_tool("parse_dates", ...)
+        registry.register_agent("date_normalizer", ..., uses_tools=["parse_dates"])
+
+An exception inside the block rolls back: staged entries are dropped and
+source files restored. Nested transaction() blocks join the outermost one.
+Snapshots published before commit show staged entries as they were before
+the transaction.
+"""
+
+import os
+from typing import Dict, List, Optional
+
+from config import REGISTRY_DURABILITY
+
+
+class RegistryTransaction:
+    """Stages registrations on a RegistryManager until commit."""
+
+    def __init__(self, registry):
+        self.registry = registry
+        self._staged = {"agents": {}, "tools": {}}  # name -> previous entry or None
+        self._sources = {}  # path -> previous bytes or None (new file)
+        self._depth = 0
+        self._token = None
+        self.closed = False
+
+    def __enter__(self):
+        if self._depth == 0:
+            self._token = self.registry._transaction.set(self)
+            self.registry._open_transactions.add(self)
+        self._depth += 1
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._depth -= 1
+        if self._depth > 0:
+            return False
+        self.registry._transaction.reset(self._token)
+        try:
+            if exc_type is None:
+                self.commit()
+            else:
+                print(f"DEBUG: Registry transaction rolled back: {exc}")
+                self.rollback()
+        finally:
+            self.registry._open_transactions.discard(self)
+        return False
+
+    # ------------------------------------------------------------------
+    # Staging (called by RegistryManager)
+    # ------------------------------------------------------------------
+
+    def stage_source(self, path: str):
+        """Remember a source file's content before it is (over)written."""
+        if path in self._sources:
+            return
+        try:
+            with open(path, "rb") as f:
+                self._sources[path] = f.read()
+        except FileNotFoundError:
+            self._sources[path] = None
+
+    def stage_entry(self, kind: str, name: str, previous: Optional[Dict]):
+        """Record that an entry was changed in memory (previous value for rollback)."""
+        self._staged[kind].setdefault(name, previous)
+
+    def pending_entries(self, kind: str) -> Dict[str, Dict]:
+        """Staged entries as they are in memory now; reloads must keep them."""
+        entries = self.registry._entries(kind)
+        return {
+            name: entries[name] for name in self._staged[kind] if name in entries
+        }
+
+    def staged_previous(self, kind: str) -> Dict[str, Optional[Dict]]:
+        """Previous value of each staged entry; published snapshots show these."""
+        if self.closed:
+            return {}
+        return dict(self._staged[kind])
+
+    @property
+    def staged_names(self) -> Dict[str, List[str]]:
+        return {kind: list(names) for kind, names in self._staged.items()}
+
+    # ------------------------------------------------------------------
+    # Commit / rollback
+    # ------------------------------------------------------------------
+
+    def commit(self) -> Dict[str, List[str]]:
+        """
+        Fsync staged sources, persist both registries in one write, reload
+        once. If the write fails the transaction is rolled back and the
+        error re-raised.
+        """
+        if self.closed:
+            return self.staged_names
+        staged = self.staged_names
+        if not any(staged.values()):
+            self.closed = True
+            return staged
+
+        from core.registry_singleton import RegistrySingleton
+
+        singleton = RegistrySingleton()
+        try:
+            self._sync_sources()
+            with singleton._lock:
+                batch = {
+                    kind: (self.registry._document(kind), names, [])
+                    for kind, names in staged.items()
+                    if names
+                }
+                self.registry.storage.save_many(batch)
+                self.closed = True
+        except Exception as e:
+            # Nothing was persisted: undo the staged entries and sources
+            print(f"DEBUG: Registry transaction commit failed: {e}")
+            self.rollback()
+            raise
+
+        with singleton._lock:
+            snapshot = singleton._snapshot
+            singleton.force_reload()
+            if singleton._snapshot is snapshot:
+                # The reload found nothing new to publish; the entries it
+                # kept out of snapshots while staged are committed now
+                self._republish()
+
+        print(
+            f"DEBUG: Registry transaction committed "
+            f"{len(staged['agents'])} agents, {len(staged['tools'])} tools"
+        )
+        return staged
+
+    def rollback(self):
+        """Drop staged entries and restore the source files they wrote."""
+        if self.closed:
+            return
+        self.closed = True
+
+        for kind, names in self._staged.items():
+            entries = self.registry._entries(kind)
+            for name, previous in names.items():
+                if previous is None:
+                    entries.pop(name, None)
+                else:
+                    entries[name] = previous
+            self.registry.reindex(kind, list(names))
+
+        for path, content in self._sources.items():
+            try:
+                if content is None:
+                    if os.path.exists(path):
+                        os.remove(path)
+                else:
+                    with open(path, "wb") as f:
+                        f.write(content)
+            except OSError as e:
+                print(f"DEBUG: Could not restore {path} on rollback: {e}")
+
+        self._republish()
+
+    def _republish(self):
+        """Publish a snapshot of the registry as it is now that this is closed."""
+        from core.registry_singleton import RegistrySingleton
+
+        singleton = RegistrySingleton._instance
+        if singleton is not None and singleton._registry is self.registry:
+            with singleton._lock:
+                singleton._publish_snapshot()
+
+    def _sync_sources(self):
+        """One fsync per staged source file, one per directory for "full"."""
+        if REGISTRY_DURABILITY == "none":
+            return
+        directories = set()
+        for path in self._sources:
+            try:
+                fd = os.open(path, os.O_RDONLY)
+            except FileNotFoundError:
+                continue  # Removed again after failing validation
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+            directories.add(os.path.dirname(path))
+
+        if REGISTRY_DURABILITY == "full":
+            for directory in directories:
+                fd = os.open(directory, os.O_RDONLY)
+                try:
+                    os.fsync(fd)
+                finally:
+                    os.close(fd)
@@ -0,0 +1,368 @@
+"""
+Registry Watcher - Push notifications for registry and agent file changes
+Location: core/registry_watcher.py
+
+A background thread watches the registry storage files and the agent module
+directories and pushes batches of changed paths to subscribers:
+
+- RegistrySingleton reloads (incrementally) as soon as storage changes, so
+  cross-process updates arrive in milliseconds and the request path does no
+  stat() calls at all; the plan cache follows through the singleton's
+  change listeners
+- workflow engines drop cached agent modules whose file changed
+
+On Linux the watcher uses inotify through a small ctypes binding; elsewhere
+(or if inotify is unavailable) it falls back to stat() polling in the same
+background thread. Enabled with REGISTRY_WATCH_MODE. If the kernel drops
+events (a full inotify queue) every watched path counts as changed; if the
+watcher thread exits, its exit callbacks let the singleton resume polling.
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import threading
+import time
+import weakref
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+from config import (
+    REGISTRY_WATCH_MODE,
+    REGISTRY_WATCH_POLL_INTERVAL,
+    REGISTRY_WATCH_DEBOUNCE,
+)
+
+# inotify constants (linux/inotify.h)
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000  # Events were dropped (reported with wd == -1)
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+_WATCH_MASK = (
+    IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+)
+_EVENT_HEADER = struct.Struct("iIII")  # wd, mask, cookie, len
+
+
+class _Subscription:
+    """Callback plus the paths/directories it cares about."""
+
+    def __init__(self, callback: Callable[[Set[str]], None], paths: Iterable[str]):
+        # Bound methods are held weakly so subscribing doesn't keep e.g. a
+        # workflow engine alive
+        if hasattr(callback, "__self__"):
+            self._ref = weakref.WeakMethod(callback)
+        else:
+            self._ref = lambda: callback
+        self.paths = {os.path.abspath(p) for p in paths}
+
+    @property
+    def callback(self):
+        return self._ref()
+
+    def select(self, changed: Set[str]) -> Set[str]:
+        return {
+            path
+            for path in changed
+            if path in self.paths or os.path.dirname(path) in self.paths
+        }
+
+
+class RegistryWatcher:
+    """Watches files and directories and dispatches debounced change batches."""
+
+    mode = "base"
+
+    def __init__(self, debounce: float = REGISTRY_WATCH_DEBOUNCE):
+        self.debounce = debounce
+        self._subscriptions: List[_Subscription] = []
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stopped = threading.Event()
+        self._exit_callbacks: List[Callable[[], None]] = []
+        self._stats = {"events": 0, "batches": 0, "callback_errors": 0}
+
+    def subscribe(self, callback: Callable[[Set[str]], None], paths: Iterable[str]):
+        """
+        Call `callback(changed_paths)` when any of `paths` changes. A path may
+        be a file or a directory (any direct child counts).
+        """
+        subscription = _Subscription(callback, paths)
+        with self._lock:
+            self._subscriptions.append(subscription)
+        for path in subscription.paths:
+            self._watch(path)
+
+    def add_exit_callback(self, callback: Callable[[], None]):
+        """Call `callback()` when the watcher thread exits, for any reason."""
+        self._exit_callbacks.append(callback)
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._main, name=f"registry-watcher-{self.mode}", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def get_stats(self) -> Dict:
+        stats = dict(self._stats)
+        stats["mode"] = self.mode
+        stats["running"] = self.running
+        with self._lock:
+            stats["subscriptions"] = len(self._subscriptions)
+        return stats
+
+    def _dispatch(self, changed: Set[str]):
+        self._stats["batches"] += 1
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+
+        for subscription in subscriptions:
+            callback = subscription.callback
+            if callback is None:
+                with self._lock:
+                    self._subscriptions.remove(subscription)
+                continue
+            matched = subscription.select(changed)
+            if not matched:
+                continue
+            try:
+                callback(matched)
+            except Exception as e:
+                self._stats["callback_errors"] += 1
+                print(f"DEBUG: Registry watcher callback failed: {e}")
+
+    def _watched_paths(self) -> Set[str]:
+        """Every subscribed path plus the current files of subscribed directories."""
+        with self._lock:
+            paths = {path for s in self._subscriptions for path in s.paths}
+        for path in list(paths):
+            if os.path.isdir(path):
+                paths.update(
+                    entry.path for entry in os.scandir(path) if entry.is_file()
+                )
+        return paths
+
+    def _main(self):
+        try:
+            self._run()
+        except Exception as e:
+            print(f"DEBUG: Registry watcher failed: {e}")
+        finally:
+            for callback in list(self._exit_callbacks):
+                try:
+                    callback()
+                except Exception as e:
+                    print(f"DEBUG: Registry watcher exit callback failed: {e}")
+
+    def _watch(self, path: str):
+        raise NotImplementedError
+
+    def _run(self):
+        raise NotImplementedError
+
+
+class InotifyWatcher(RegistryWatcher):
+    """Linux inotify via ctypes; watches directories, filters by path."""
+
+    mode = "inotify"
+
+    def __init__(self, debounce: float = REGISTRY_WATCH_DEBOUNCE):
+        super().__init__(debounce)
+        libc_name = ctypes.util.find_library("c") or "libc.so.6"
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        self._fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._directories = {}  # wd -> directory
+
+    def _watch(self, path: str):
+        # Files are replaced by rename (atomic writes), so watch their directory
+        directory = path if os.path.isdir(path) else os.path.dirname(path)
+        if directory in self._directories.values() or not os.path.isdir(directory):
+            return
+        wd = self._libc.inotify_add_watch(
+            self._fd, os.fsencode(directory), _WATCH_MASK
+        )
+        if wd < 0:
+            print(f"DEBUG: inotify_add_watch failed for {directory}")
+            return
+        self._directories[wd] = directory
+
+    def _run(self):
+        try:
+            while not self._stopped.is_set():
+                ready, _, _ = select.select([self._fd], [], [], 0.5)
+                if not ready:
+                    continue
+                changed = self._read_events()
+                # Coalesce bursts (temp write + rename, WAL appends)
+                time.sleep(self.debounce)
+                changed |= self._read_events()
+                if changed:
+                    self._dispatch(changed)
+        finally:
+            os.close(self._fd)
+
+    def _read_events(self) -> Set[str]:
+        changed = set()
+        try:
+            buffer = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return changed
+
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(buffer):
+            wd, mask, _cookie, length = _EVENT_HEADER.unpack_from(buffer, offset)
+            offset += _EVENT_HEADER.size
+            name = buffer[offset : offset + length].rstrip(b"\0")
+            offset += length
+            if mask & IN_Q_OVERFLOW:
+                # Changes were lost; treat everything watched as changed
+                print("DEBUG: inotify queue overflowed, dispatching all watched paths")
+                changed |= self._watched_paths()
+                continue
+            directory = self._directories.get(wd)
+            if directory and name:
+                changed.add(os.path.join(directory, os.fsdecode(name)))
+        self._stats["events"] += len(changed)
+        return changed
+
+
+class PollingWatcher(RegistryWatcher):
+    """Portable fallback: stat() the watched paths from the background thread."""
+
+    mode = "polling"
+
+    def __init__(
+        self,
+        interval: float = REGISTRY_WATCH_POLL_INTERVAL,
+        debounce: float = REGISTRY_WATCH_DEBOUNCE,
+    ):
+        super().__init__(debounce)
+        self.interval = interval
+        self._states = {}  # path -> stat key (files) or {child: stat key} (dirs)
+
+    def _watch(self, path: str):
+        if path not in self._states:
+            self._states[path] = self._state(path)
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            changed = set()
+            for path, previous in list(self._states.items()):
+                current = self._state(path)
+                if current == previous:
+                    continue
+                self._states[path] = current
+                if isinstance(current, dict) or isinstance(previous, dict):
+                    before = previous if isinstance(previous, dict) else {}
+                    after = current if isinstance(current, dict) else {}
+                    changed |= {
+                        child
+                        for child in set(before) | set(after)
+                        if before.get(child) != after.get(child)
+                    }
+                else:
+                    changed.add(path)
+            if changed:
+                self._stats["events"] += len(changed)
+                self._dispatch(changed)
+
+    def _state(self, path: str):
+        try:
+            if os.path.isdir(path):
+                return {
+                    entry.path: (entry.stat().st_mtime_ns, entry.stat().st_size)
+                    for entry in os.scandir(path)
+                    if entry.is_file()
+                }
+            st = os.stat(path)
+            return (st.st_mtime_ns, st.st_size)
+        except FileNotFoundError:
+            return None
+
+
+def build_registry_watcher(mode: str = None) -> Optional[RegistryWatcher]:
+    """Watcher for REGISTRY_WATCH_MODE: "inotify", "polling", "auto" or "off"."""
+    mode = mode or REGISTRY_WATCH_MODE
+    if mode == "off":
+        return None
+    if mode in ("inotify", "auto"):
+        try:
+            return InotifyWatcher()
+        except (OSError, AttributeError) as e:
+            if mode == "inotify":
+                raise
+            print(f"DEBUG: inotify unavailable ({e}), using polling watcher")
+    return PollingWatcher()
+
+
+# Global function to get the shared watcher
+_watcher = None
+_watcher_lock = threading.Lock()
+_pending_subscriptions = []  # Subscribed before the watcher started
+
+
+def get_registry_watcher() -> Optional[RegistryWatcher]:
+    """The running watcher, or None when watching is off or not started."""
+    return _watcher
+
+
+def subscribe_file_changes(callback: Callable[[Set[str]], None], paths: Iterable[str]):
+    """
+    Subscribe to the shared watcher, whether or not it has started yet.
+    Never fires when watching is off.
+    """
+    with _watcher_lock:
+        if _watcher is not None:
+            _watcher.subscribe(callback, paths)
+        else:
+            _pending_subscriptions.append((callback, list(paths)))
+
+
+def start_registry_watcher(mode: str = None) -> Optional[RegistryWatcher]:
+    """
+    Start the shared watcher and subscribe the registry singleton to its
+    storage files. Safe to call more than once.
+    """
+    global _watcher
+    with _watcher_lock:
+        if _watcher is not None:
+            return _watcher
+        watcher = build_registry_watcher(mode)
+        if watcher is None:
+            return None
+
+        from core.registry_singleton import RegistrySingleton
+
+        singleton = RegistrySingleton()
+        watcher.subscribe(
+            singleton.on_storage_changed, singleton.get_registry().storage.watch_paths()
+        )
+        for callback, paths in _pending_subscriptions:
+            watcher.subscribe(callback, paths)
+        _pending_subscriptions.clear()
+        # If the thread ever dies, reads go back to polling storage
+        watcher.add_exit_callback(singleton.disable_push_updates)
+        singleton.enable_push_updates()
+        watcher.start()
+        _watcher = watcher
+        print(f"DEBUG: Registry watcher started ({watcher.mode})")
+        return watcher
@@ -0,0 +1,412 @@
+"""
+Sandbox Executor - Generated agents and tools in pre-forked worker processes
+Location: core/sandbox_executor.py
+
+Generated components are plain synchronous functions written by an LLM. Run
+inline, a CPU-heavy step or a runaway loop blocks the event loop and every
+concurrent workflow with it, and asyncio.wait_for cannot interrupt it. With
+AGENT_EXECUTION_BACKEND = "sandbox" they run in a pool of long-lived worker
+processes instead:
+
+- workers are started up front and reused; each is a fresh interpreter
+  (python -m core.sandbox_executor), so the app's __main__ and its threads
+  are never re-imported or forked, and each keeps its own ComponentLoader,
+  so a repeated component is not re-executed
+- every task runs under RLIMIT_CPU (SANDBOX_CPU_SECONDS of CPU time) and
+  RLIMIT_AS (SANDBOX_MEMORY_MB), lifted again between tasks
+- a task still running at its wall-clock timeout has its worker SIGKILLed
+  and replaced; so is a worker that hit a limit or died (one that died
+  while idle is replaced before its task is sent again)
+- arguments and results are pickled with protocol 5, large buffers (numpy
+  arrays, DataFrame blocks, bytearrays) travel out of band without copies
+
+A waiting caller holds a dispatch thread, never the event loop. Components
+must take and return picklable data; in-place changes to arguments are not
+seen by the caller, only the return value.
+"""
+
+import asyncio
+import atexit
+import os
+import pickle
+import queue
+import resource
+import signal
+import socket
+import struct
+import subprocess
+import sys
+import threading
+import traceback
+from multiprocessing.connection import Connection
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Tuple
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import (
+    PROJECT_ROOT,
+    AGENT_TIMEOUT_SECONDS,
+    SANDBOX_WORKERS,
+    SANDBOX_CPU_SECONDS,
+    SANDBOX_MEMORY_MB,
+    SANDBOX_MAX_TASKS_PER_WORKER,
+)
+
+_COUNT = struct.Struct("<I")
+
+
+class SandboxError(Exception):
+    """A component failed inside the sandbox; carries the worker's traceback."""
+
+    def __init__(self, message: str, remote_traceback: str = None):
+        super().__init__(message)
+        self.remote_traceback = remote_traceback
+
+
+class SandboxLimitError(SandboxError):
+    """A component exceeded its CPU or memory limit, or killed its worker."""
+
+
+class SandboxTimeoutError(TimeoutError):
+    """A component ran past its timeout and its worker was killed."""
+
+
+class _CPUTimeExceeded(BaseException):
+    """Raised in a worker by SIGXCPU; BaseException so agent code can't swallow it."""
+
+
+# =============================================================================
+# TRANSFER
+# =============================================================================
+
+
+def _encode(message) -> Tuple[bytes, List]:
+    """Pickle protocol 5, keeping large buffers out of band so they aren't copied."""
+    buffers = []
+    data = pickle.dumps(message, protocol=5, buffer_callback=buffers.append)
+    return _COUNT.pack(len(buffers)) + data, buffers
+
+
+def _write(conn, encoded: Tuple[bytes, List]):
+    data, buffers = encoded
+    conn.send_bytes(data)
+    for buffer in buffers:
+        conn.send_bytes(buffer.raw())
+
+
+def _send(conn, message):
+    _write(conn, _encode(message))
+
+
+def _receive(conn):
+    data = conn.recv_bytes()
+    (count,) = _COUNT.unpack_from(data)
+    buffers = [conn.recv_bytes() for _ in range(count)]
+    return pickle.loads(memoryview(data)[_COUNT.size :], buffers=buffers)
+
+
+# =============================================================================
+# WORKER PROCESS
+# =============================================================================
+
+
+def _on_cpu_limit(signum, frame):
+    raise _CPUTimeExceeded()
+
+
+def _set_limits(cpu_seconds: float, memory_mb: int):
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    _, cpu_hard = resource.getrlimit(resource.RLIMIT_CPU)
+    cpu_soft = int(usage.ru_utime + usage.ru_stime + cpu_seconds) + 1
+    if cpu_hard != resource.RLIM_INFINITY:
+        cpu_soft = min(cpu_soft, cpu_hard)
+    resource.setrlimit(resource.RLIMIT_CPU, (cpu_soft, cpu_hard))
+
+    _, memory_hard = resource.getrlimit(resource.RLIMIT_AS)
+    memory_soft = memory_mb * 1024 * 1024
+    if memory_hard != resource.RLIM_INFINITY:
+        memory_soft = min(memory_soft, memory_hard)
+    resource.setrlimit(resource.RLIMIT_AS, (memory_soft, memory_hard))
+
+
+def _clear_limits():
+    for limit in (resource.RLIMIT_AS, resource.RLIMIT_CPU):
+        _, hard = resource.getrlimit(limit)
+        resource.setrlimit(limit, (hard, hard))
+
+
+def _worker_main(conn):
+    """Worker loop: load, run and reply until told to stop or a limit is hit."""
+    from core.component_loader import ComponentLoader
+
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # The parent handles Ctrl-C
+    signal.signal(signal.SIGXCPU, _on_cpu_limit)
+    loader = ComponentLoader()
+
+    while True:
+        try:
+            task = _receive(conn)
+        except (EOFError, OSError):
+            return
+        if task is None:
+            return
+
+        path, names, version, args, kwargs, cpu_seconds, memory_mb = task
+        try:
+            _set_limits(cpu_seconds, memory_mb)
+            function = loader.load(path, names, version=version)
+            reply = ("ok", function(*args, **kwargs), None)
+        except _CPUTimeExceeded:
+            reply = ("limit", f"CPU time limit exceeded ({cpu_seconds}s)", None)
+        except MemoryError:
+            reply = ("limit", f"Memory limit exceeded ({memory_mb} MB)", None)
+        except Exception as e:
+            reply = ("error", f"{type(e).__name__}: {e}", traceback.format_exc())
+        finally:
+            _clear_limits()
+
+        try:
+            encoded = _encode(reply)
+        except Exception as e:
+            encoded = _encode(("error", f"Result could not be pickled: {e}", None))
+        _write(conn, encoded)
+        if reply[0] == "limit":
+            return  # State after a breach is suspect; the parent starts a new worker
+
+
+# =============================================================================
+# POOL
+# =============================================================================
+
+
+class _Worker:
+    def __init__(self):
+        parent_socket, child_socket = socket.socketpair()
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "core.sandbox_executor", str(child_socket.fileno())],
+            cwd=PROJECT_ROOT,
+            pass_fds=(child_socket.fileno(),),
+            stdin=subprocess.DEVNULL,
+        )
+        child_socket.close()
+        self.conn = Connection(parent_socket.detach())
+        self.tasks = 0
+
+    def stop(self, kill: bool = False):
+        if kill:
+            self.process.kill()
+        else:
+            try:
+                _send(self.conn, None)
+            except OSError:
+                pass
+        try:
+            self.process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+        self.conn.close()
+
+
+class SandboxExecutor:
+    """Pool of pre-forked worker processes running generated components."""
+
+    def __init__(
+        self,
+        workers: int = SANDBOX_WORKERS,
+        cpu_seconds: float = SANDBOX_CPU_SECONDS,
+        memory_mb: int = SANDBOX_MEMORY_MB,
+        max_tasks_per_worker: int = SANDBOX_MAX_TASKS_PER_WORKER,
+    ):
+        self.size = workers
+        self.cpu_seconds = cpu_seconds
+        self.memory_mb = memory_mb
+        self.max_tasks_per_worker = max_tasks_per_worker
+        self._idle = queue.Queue()
+        self._workers = set()
+        self._lock = threading.Lock()  # Guards _workers and _stats
+        self._dispatch = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="sandbox-dispatch"
+        )
+        self._closed = False
+        self._stats = {
+            "tasks": 0,
+            "errors": 0,
+            "timeouts": 0,
+            "limit_breaches": 0,
+            "workers_started": 0,
+        }
+
+    def start(self):
+        """Start the workers now rather than on first use."""
+        for _ in range(self.size):
+            self._idle.put(self._start_worker())
+
+    async def run(
+        self,
+        path: str,
+        names: List[str],
+        args: Tuple = (),
+        kwargs: Dict = None,
+        version: str = None,
+        timeout: float = None,
+    ) -> Any:
+        """
+        Run the first of `names` defined in the component at `path` in a
+        worker and return its result. Raises SandboxTimeoutError,
+        SandboxLimitError or SandboxError.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._dispatch,
+            lambda: self.run_sync(path, names, args, kwargs, version, timeout),
+        )
+
+    def run_sync(
+        self,
+        path: str,
+        names: List[str],
+        args: Tuple = (),
+        kwargs: Dict = None,
+        version: str = None,
+        timeout: float = None,
+    ) -> Any:
+        """Blocking run(), for callers outside an event loop."""
+        if self._closed:
+            raise SandboxError("Sandbox executor is shut down")
+        timeout = timeout or AGENT_TIMEOUT_SECONDS
+        try:
+            task = _encode(
+                (
+                    os.path.abspath(path),
+                    list(names),
+                    version,
+                    tuple(args),
+                    kwargs or {},
+                    self.cpu_seconds,
+                    self.memory_mb,
+                )
+            )
+        except Exception as e:
+            raise SandboxError(f"Arguments could not be pickled for the sandbox: {e}")
+
+        worker = self._idle.get()
+        healthy = False
+        try:
+            self._count("tasks")
+            try:
+                _write(worker.conn, task)
+            except OSError:
+                # It died while idle, so the task never started: one retry on
+                # a new worker
+                if self._closed:
+                    raise SandboxError("Sandbox executor is shut down")
+                self._retire(worker, kill=True)
+                worker = self._start_worker()
+                try:
+                    _write(worker.conn, task)
+                except OSError as e:
+                    raise SandboxError(f"Sandbox worker did not accept the task: {e}")
+            worker.tasks += 1
+
+            if not worker.conn.poll(timeout):
+                self._count("timeouts")
+                raise SandboxTimeoutError(
+                    f"{os.path.basename(path)} timed out after {timeout}s"
+                )
+            try:
+                status, value, remote_traceback = _receive(worker.conn)
+            except (EOFError, OSError):
+                try:
+                    exit_code = worker.process.wait(timeout=1)
+                except subprocess.TimeoutExpired:
+                    exit_code = None
+                self._count("limit_breaches")
+                raise SandboxLimitError(
+                    f"Sandbox worker died (exit code {exit_code}); "
+                    f"CPU or memory limit, or the component exited"
+                )
+            except Exception as e:
+                # The whole reply was read, only its contents can't be rebuilt here
+                healthy = True
+                self._count("errors")
+                raise SandboxError(f"Result could not be unpickled: {e}")
+
+            if status == "ok":
+                healthy = True
+                return value
+            if status == "limit":
+                self._count("limit_breaches")
+                raise SandboxLimitError(value)
+            self._count("errors")
+            healthy = True  # An ordinary exception leaves the worker usable
+            raise SandboxError(value, remote_traceback)
+        finally:
+            self._release(worker, healthy)
+
+    def _release(self, worker: _Worker, healthy: bool):
+        """Return a worker to the pool, or replace it if it can't be trusted."""
+        if healthy and worker.tasks < self.max_tasks_per_worker and not self._closed:
+            self._idle.put(worker)
+            return
+        self._retire(worker, kill=not healthy)
+        if not self._closed:
+            self._idle.put(self._start_worker())
+
+    def _retire(self, worker: _Worker, kill: bool):
+        with self._lock:
+            self._workers.discard(worker)
+        worker.stop(kill=kill)
+
+    def _start_worker(self) -> _Worker:
+        worker = _Worker()
+        with self._lock:
+            self._workers.add(worker)
+            self._stats["workers_started"] += 1
+        return worker
+
+    def _count(self, key: str):
+        with self._lock:
+            self._stats[key] += 1
+
+    def shutdown(self):
+        """Stop all workers; running tasks are killed."""
+        self._closed = True
+        self._dispatch.shutdown(wait=False, cancel_futures=True)
+        with self._lock:
+            workers, self._workers = list(self._workers), set()
+        for worker in workers:
+            worker.stop(kill=True)
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["workers"] = len(self._workers)
+        stats["idle"] = self._idle.qsize()
+        stats["cpu_seconds"] = self.cpu_seconds
+        stats["memory_mb"] = self.memory_mb
+        return stats
+
+
+# Global function to get the sandbox executor
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_sandbox_executor() -> SandboxExecutor:
+    """Get the shared sandbox executor, starting its workers - thread-safe."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                executor = SandboxExecutor()
+                executor.start()
+                atexit.register(executor.shutdown)
+                _executor = executor
+                print(f"DEBUG: Sandbox executor started {executor.size} workers")
+    return _executor
+
+
+if __name__ == "__main__":
+    _worker_main(Connection(int(sys.argv[1])))
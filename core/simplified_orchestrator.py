@@ -7,21 +7,26 @@ import os
 import json
 import asyncio
 import importlib
-from typing import Dict, List, Optional, Any
+from typing import Callable, Dict, List, Optional, Any
 from datetime import datetime
-import openai
-from anthropic import Anthropic
 
 from config import (
-    OPENAI_API_KEY,
     ANTHROPIC_API_KEY,
     ORCHESTRATOR_MODEL,
     CLAUDE_MODEL,
     ORCHESTRATOR_MAX_TOKENS,
     CLAUDE_MAX_TOKENS,
+    PLAN_CACHE_ENABLED,
 )
 from core.registry import RegistryManager
-from core.registry_singleton import get_shared_registry
+from core.registry_singleton import (
+    RegistrySingleton,
+    get_shared_registry,
+    get_registry_generation,
+)
+from core.llm_gateway import get_llm_gateway
+from core.prompt_budget import fit_section
+from core.plan_cache import get_plan_cache
 from core.file_content_reader import FileContentReader
 from core.agent_factory import AgentFactory
 from core.tool_factory import ToolFactory
@@ -56,14 +61,13 @@ class SimplifiedOrchestrator:
 
         self.capability_analyzer = CapabilityAnalyzer()
 
-        # Initialize OpenAI client
-        self.openai_client = openai.OpenAI(api_key=OPENAI_API_KEY)
-
-        # Initialize Claude client
-        self.claude_client = Anthropic(api_key=ANTHROPIC_API_KEY)
+        # Shared non-blocking LLM gateway (OpenAI planning, Claude execution)
+        self.llm = get_llm_gateway()
 
         # ADD this new AI planner:
         self.ai_workflow_planner = AIWorkflowPlanner()
+        self.plan_cache = get_plan_cache()
+        RegistrySingleton().add_change_listener(self.plan_cache.on_registry_change)
 
         print(f"DEBUG: ANTHROPIC_API_KEY present: {bool(ANTHROPIC_API_KEY)}")
         print(
@@ -106,11 +110,16 @@ class SimplifiedOrchestrator:
         user_request: str,
         files: Optional[List[Dict]] = None,
         auto_create: bool = True,
+        on_token: Optional[Callable[[str], None]] = None,
     ) -> Dict[str, Any]:
         """
         ENHANCED process_request with TRUE AI-driven orchestration.
 
         This method REPLACES the existing process_request in simplified_orchestrator.py
+
+        on_token, if given, receives the final response text as it streams so
+        the UI can show it before synthesis finishes. The returned dict is the
+        same either way.
         """
         workflow_id = f"ai_wf_{datetime.now().strftime('%Y%m%d%H%M%S')}"
         start_time = datetime.now()
@@ -207,7 +216,7 @@ class SimplifiedOrchestrator:
 
                 workflow_result = (
                     await self.workflow_engine.execute_ai_planned_workflow(
-                        ai_workflow_plan, user_request, enriched_files
+                        ai_workflow_plan, user_request, enriched_files, on_token
                     )
                 )
 
@@ -305,7 +314,7 @@ class SimplifiedOrchestrator:
 
                 workflow_result = (
                     await self.workflow_engine.execute_ai_planned_workflow(
-                        ai_workflow_plan, user_request, enriched_files
+                        ai_workflow_plan, user_request, enriched_files, on_token
                     )
                 )
 
@@ -331,16 +340,22 @@ class SimplifiedOrchestrator:
                 }
 
             else:
-                # Continue with existing generic AI workflow planning
-                print("🧠 Running generic AI workflow analysis...")
-                ai_workflow_plan = (
-                    await self.ai_workflow_planner.plan_intelligent_workflow(
-                        request=user_request,
-                        files=enriched_files,
-                        available_agents=available_agents,
-                        available_tools=available_tools,
+                # Same request against same-shaped files and registry: reuse the plan
+                ai_workflow_plan = self._get_cached_plan(user_request, enriched_files)
+
+                if ai_workflow_plan is not None:
+                    print("♻️  Plan cache hit - skipping planning")
+                else:
+                    # Continue with existing generic AI workflow planning
+                    print("🧠 Running generic AI workflow analysis...")
+                    ai_workflow_plan = (
+                        await self.ai_workflow_planner.plan_intelligent_workflow(
+                            request=user_request,
+                            files=enriched_files,
+                            available_agents=available_agents,
+                            available_tools=available_tools,
+                        )
                     )
-                )
 
             # Log AI planning results
             planned_agents = ai_workflow_plan.get("agents", [])
@@ -408,6 +423,9 @@ class SimplifiedOrchestrator:
 
                         print(f"🆕 Updated plan: {ai_workflow_plan.get('agents', [])}")
 
+            if not ai_workflow_plan.get("plan_cache_hit"):
+                self._store_plan(user_request, enriched_files, ai_workflow_plan)
+
             # Step 5: Execute AI-planned workflow
             planned_agents = ai_workflow_plan.get("agents", [])
 
@@ -415,7 +433,7 @@ class SimplifiedOrchestrator:
                 # Fallback to simple processing
                 print("⚠️  No agents planned, falling back to simple processing")
                 return await self._process_simple_request(
-                    user_request, enriched_files, workflow_id, start_time
+                    user_request, enriched_files, workflow_id, start_time, on_token
                 )
 
             elif len(planned_agents) == 1:
@@ -425,6 +443,8 @@ class SimplifiedOrchestrator:
                 result = await self._execute_ai_guided_single_agent(
                     planned_agents[0], user_request, enriched_files, ai_workflow_plan
                 )
+                if on_token and result.get("response"):
+                    on_token(result["response"])
 
                 return {
                     "status": "success",
@@ -447,14 +467,18 @@ class SimplifiedOrchestrator:
 
                 workflow_result = (
                     await self.workflow_engine.execute_ai_planned_workflow(
-                        ai_workflow_plan, user_request, enriched_files
+                        ai_workflow_plan, user_request, enriched_files, on_token
                     )
                 )
 
-                # AI-driven response synthesis
-                response = await self._synthesize_ai_workflow_response(
-                    user_request, workflow_result, ai_workflow_plan
-                )
+                # AI-driven response synthesis. A streaming caller has already
+                # seen the synthesizer's text, so that becomes the response.
+                if on_token and workflow_result.get("ai_response"):
+                    response = workflow_result["ai_response"]
+                else:
+                    response = await self._synthesize_ai_workflow_response(
+                        user_request, workflow_result, ai_workflow_plan
+                    )
 
                 return {
                     "status": "success",
@@ -493,6 +517,34 @@ class SimplifiedOrchestrator:
                 "metadata": {"error_type": "ai_workflow_failure"},
             }
 
+    def _plan_cache_key(self, user_request: str, enriched_files: List[Dict]) -> str:
+        """Normalized request + file schema fingerprint + registry generation."""
+        return self.plan_cache.make_key(
+            user_request,
+            self.file_reader.schema_fingerprint(enriched_files),
+            get_registry_generation(),
+        )
+
+    def _get_cached_plan(
+        self, user_request: str, enriched_files: List[Dict]
+    ) -> Optional[Dict]:
+        """Cached plan for this request, or None (also when caching is disabled)."""
+        if not PLAN_CACHE_ENABLED:
+            return None
+        key = self._plan_cache_key(user_request, enriched_files)
+        plan = self.plan_cache.get(key, get_shared_registry())
+        if plan is not None:
+            plan["plan_cache_hit"] = True
+        return plan
+
+    def _store_plan(self, user_request: str, enriched_files: List[Dict], plan: Dict):
+        """Cache a finished plan. Plans still missing capabilities are not reused."""
+        if not PLAN_CACHE_ENABLED or plan.get("missing_capabilities"):
+            return
+        # Key is taken after planning: agent creation above bumps the generation
+        key = self._plan_cache_key(user_request, enriched_files)
+        self.plan_cache.set(key, plan, get_shared_registry())
+
     async def _execute_ai_guided_single_agent(
         self, agent_name: str, request: str, files: List[Dict], ai_plan: Dict
     ) -> Dict:
@@ -614,32 +666,34 @@ class SimplifiedOrchestrator:
                 **creation_results,
             }
 
-        for agent_requirement in suggested_agents:
-            try:
-                print(f"🎯 Creating agent: {agent_requirement['agent_name']}")
-
-                # Use the enhanced agent factory method
-                result = await self.agent_factory.create_agent_from_requirement(
-                    agent_requirement
-                )
+        # One registry write and reload for all new agents and their tools
+        with get_shared_registry().transaction():
+            for agent_requirement in suggested_agents:
+                try:
+                    print(f"🎯 Creating agent: {agent_requirement['agent_name']}")
 
-                if result["status"] == "success":
-                    creation_results["agents_created"].append(result["agent_name"])
-                    print(f"✅ Created agent: {result['agent_name']}")
-                else:
-                    creation_results["errors"].append(
-                        result.get("error", "Unknown error")
-                    )
-                    print(
-                        f"❌ Failed to create agent: {agent_requirement['agent_name']}"
+                    # Use the enhanced agent factory method
+                    result = await self.agent_factory.create_agent_from_requirement(
+                        agent_requirement
                     )
 
-            except Exception as e:
-                error_msg = (
-                    f"Failed to create {agent_requirement['agent_name']}: {str(e)}"
-                )
-                creation_results["errors"].append(error_msg)
-                print(f"❌ Exception creating agent: {str(e)}")
+                    if result["status"] == "success":
+                        creation_results["agents_created"].append(result["agent_name"])
+                        print(f"✅ Created agent: {result['agent_name']}")
+                    else:
+                        creation_results["errors"].append(
+                            result.get("error", "Unknown error")
+                        )
+                        print(
+                            f"❌ Failed to create agent: {agent_requirement['agent_name']}"
+                        )
+
+                except Exception as e:
+                    error_msg = (
+                        f"Failed to create {agent_requirement['agent_name']}: {str(e)}"
+                    )
+                    creation_results["errors"].append(error_msg)
+                    print(f"❌ Exception creating agent: {str(e)}")
 
         return {
             "status": "success" if creation_results["agents_created"] else "error",
@@ -691,13 +745,13 @@ class SimplifiedOrchestrator:
                     elif file["structure"] == "json":
                         # JSON - show structure and data
                         context_parts.append(
-                            f"JSON data: {json.dumps(content.get('data', {}), indent=2)[:1000]}"
+                            f"JSON data: {fit_section(content.get('data', {}), 'file_context', 300)}"
                         )
 
                     elif file["structure"] == "yaml":
                         # YAML - show parsed data
                         context_parts.append(
-                            f"YAML data: {json.dumps(content.get('data', {}), indent=2)[:1000]}"
+                            f"YAML data: {fit_section(content.get('data', {}), 'file_context', 300)}"
                         )
 
                     else:
@@ -725,13 +779,13 @@ class SimplifiedOrchestrator:
         Return JSON with your analysis and plan.
         """
 
-        response = self.openai_client.chat.completions.create(
+        response = await self.llm.openai_chat(
             model=ORCHESTRATOR_MODEL,
             messages=[{"role": "user", "content": prompt}],
             response_format={"type": "json_object"},
         )
 
-        return json.loads(response.choices[0].message.content)
+        return json.loads(response)
 
     async def _ai_plan_workflow(
         self, request: str, files: List[Dict], analysis: Dict
@@ -747,7 +801,7 @@ class SimplifiedOrchestrator:
         
         REQUEST: {request}
         
-        ANALYSIS: {json.dumps(analysis, indent=2)}
+        ANALYSIS: {fit_section(analysis, "context")}
         
         AVAILABLE AGENTS: {[a['name'] for a in available_agents]}
         AVAILABLE TOOLS: {[t['name'] for t in available_tools]}
@@ -764,14 +818,14 @@ class SimplifiedOrchestrator:
         IMPORTANT: You can see the actual data columns and structure. Plan based on what's really there.
         """
 
-        response = self.openai_client.chat.completions.create(
+        response = await self.llm.openai_chat(
             model=ORCHESTRATOR_MODEL,
             messages=[{"role": "user", "content": prompt}],
             max_completion_tokens=ORCHESTRATOR_MAX_TOKENS,
             response_format={"type": "json_object"},
         )
 
-        plan = json.loads(response.choices[0].message.content)
+        plan = json.loads(response)
         plan["ai_calls"] = 2  # Track AI usage
         return plan
 
@@ -835,13 +889,13 @@ class SimplifiedOrchestrator:
             - If asked to summarize, provide the actual summary
             """
 
-            response = self.claude_client.messages.create(
+            response = await self.llm.claude_message(
                 model=CLAUDE_MODEL,
                 max_tokens=CLAUDE_MAX_TOKENS,
                 messages=[{"role": "user", "content": agent_prompt}],
             )
 
-            results[agent_name] = response.content[0].text
+            results[agent_name] = response
 
         return results
 
@@ -854,39 +908,39 @@ class SimplifiedOrchestrator:
                 if isinstance(data, dict):
                     output = f"Columns: {data.get('columns', [])}\n"
                     output += f"Total rows: {data.get('total_rows', 0)}\n"
-                    output += (
-                        f"Data:\n{json.dumps(data.get('first_10_rows', []), indent=2)}"
-                    )
-                    return output[:2000]
+                    output += f"Data:\n{fit_section(data.get('first_10_rows', []), 'data')}"
+                    return output
                 else:
-                    return f"Tabular data (non-dict): {str(data)[:2000]}"
+                    return f"Tabular data (non-dict): {fit_section(str(data), 'data')}"
 
             elif data_type == "text":
                 # Text content - handle both dict and string
                 if isinstance(data, dict):
-                    return str(data.get("text", data))[:2000]
+                    return fit_section(str(data.get("text", data)), "data")
                 else:
                     # If it's already a string, use it directly
-                    return str(data)[:2000]
+                    return fit_section(str(data), "data")
 
             elif data_type in ["json", "yaml"]:
-                # Structured data
+                # Structured data - sampled to the budget so it stays valid JSON
                 if isinstance(data, dict):
-                    return json.dumps(data.get("data", data), indent=2)[:2000]
+                    return fit_section(data.get("data", data), "data")
                 else:
-                    return (
-                        json.dumps(data, indent=2)[:2000] if data else str(data)[:2000]
-                    )
+                    return fit_section(data, "data") if data else str(data)
 
             # Default - safely convert to string
-            return str(data)[:2000]
+            return fit_section(str(data), "data")
 
         except Exception as e:
             print(f"DEBUG: Error formatting data: {e}")
             return f"Data formatting error: {str(data)[:500]}"
 
     async def _ai_synthesize_response(
-        self, request: str, plan: Dict, results: Dict
+        self,
+        request: str,
+        plan: Dict,
+        results: Dict,
+        on_token: Optional[Callable[[str], None]] = None,
     ) -> str:
         """
         GPT-4 creates final user-friendly response.
@@ -898,13 +952,13 @@ class SimplifiedOrchestrator:
         for k, v in results.items():
             if isinstance(v, dict):
                 # If result is a dict, try to get 'output' or use the whole dict
-                formatted_results[k] = str(v.get("output", v))[:500]
+                formatted_results[k] = v.get("output", v)
             elif isinstance(v, str):
                 # If result is a string (which it is from Claude), use it directly
-                formatted_results[k] = v[:500]
+                formatted_results[k] = v
             else:
                 # For any other type, convert to string
-                formatted_results[k] = str(v)[:500]
+                formatted_results[k] = str(v)
 
         prompt = f"""
         Create a natural response for the user:
@@ -913,20 +967,31 @@ class SimplifiedOrchestrator:
         
         WORKFLOW EXECUTED: {plan.get('agents', [])}
         
-        RESULTS: {json.dumps(formatted_results, indent=2)}
+        RESULTS: {fit_section(formatted_results, "results")}
         
         Synthesize a clear, helpful response that directly answers the user's request.
         Include specific details from the results.
         Be conversational and helpful.
         """
 
-        response = self.openai_client.chat.completions.create(
+        if on_token is None:
+            return await self.llm.openai_chat(
+                model=ORCHESTRATOR_MODEL,
+                messages=[{"role": "user", "content": prompt}],
+                max_completion_tokens=ORCHESTRATOR_MAX_TOKENS,
+                use_cache=False,  # Conversational reply should stay fresh
+            )
+
+        chunks = []
+        async for chunk in self.llm.openai_chat_stream(
             model=ORCHESTRATOR_MODEL,
             messages=[{"role": "user", "content": prompt}],
             max_completion_tokens=ORCHESTRATOR_MAX_TOKENS,
-        )
-
-        return response.choices[0].message.content
+            use_cache=False,
+        ):
+            chunks.append(chunk)
+            on_token(chunk)
+        return "".join(chunks)
 
     async def _execute_specialized_agent(
         self, agent_name: str, request: str, files: List[Dict], context: Dict = None
@@ -1014,6 +1079,7 @@ class SimplifiedOrchestrator:
         enriched_files: List[Dict],
         workflow_id: str,
         start_time,
+        on_token: Optional[Callable[[str], None]] = None,
     ) -> Dict:
         """Process simple requests using the original logic."""
 
@@ -1021,7 +1087,9 @@ class SimplifiedOrchestrator:
         analysis = await self._analyze_with_ai(user_request, enriched_files)
         plan = await self._ai_plan_workflow(user_request, enriched_files, analysis)
         results = await self._execute_ai_workflow(plan, user_request, enriched_files)
-        response = await self._ai_synthesize_response(user_request, plan, results)
+        response = await self._ai_synthesize_response(
+            user_request, plan, results, on_token
+        )
 
         return {
             "status": "success",
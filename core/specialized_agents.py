@@ -8,8 +8,9 @@ import json
 import PyPDF2
 import pdfplumber
 from typing import Dict, Any, List
-from anthropic import Anthropic
-from config import CLAUDE_MODEL, CLAUDE_MAX_TOKENS, ANTHROPIC_API_KEY
+from config import CLAUDE_MODEL, CLAUDE_MAX_TOKENS
+from core.llm_gateway import get_llm_gateway
+from core.prompt_budget import fit_section
 
 
 class PDFAnalyzerAgent:
@@ -20,7 +21,7 @@ class PDFAnalyzerAgent:
         self.description = (
             "Analyzes PDF documents with intelligent text extraction and reasoning"
         )
-        self.claude = Anthropic(api_key=ANTHROPIC_API_KEY)
+        self.llm = get_llm_gateway()
 
     async def execute(
         self, request: str, file_data: Dict = None, context: Dict = None
@@ -96,7 +97,7 @@ class PDFAnalyzerAgent:
         PDF Content (first {len(pdf_text)} characters):
         {pdf_text[:4000]}
         
-        Context: {json.dumps(context, indent=2) if context else "None"}
+        Context: {fit_section(context, "context") if context else "None"}
         
         Based on the PDF content above, provide a comprehensive analysis that addresses the user's request:
         
@@ -124,20 +125,20 @@ class PDFAnalyzerAgent:
         }}
         """
 
-        response = self.claude.messages.create(
+        response = await self.llm.claude_message(
             model=CLAUDE_MODEL,
             max_tokens=CLAUDE_MAX_TOKENS,
             messages=[{"role": "user", "content": prompt}],
         )
 
         try:
-            return json.loads(response.content[0].text)
+            return json.loads(response)
         except json.JSONDecodeError:
             return {
-                "summary": response.content[0].text,
+                "summary": response,
                 "key_points": [],
                 "insights": [],
-                "specific_answer": response.content[0].text,
+                "specific_answer": response,
             }
 
 
@@ -149,7 +150,7 @@ class ChartGeneratorAgent:
         self.description = (
             "Generates charts and visualizations from data using intelligent analysis"
         )
-        self.claude = Anthropic(api_key=ANTHROPIC_API_KEY)
+        self.llm = get_llm_gateway()
 
     async def execute(
         self, request: str, file_data: Dict = None, context: Dict = None
@@ -229,14 +230,14 @@ class ChartGeneratorAgent:
         }}
         """
 
-        response = self.claude.messages.create(
+        response = await self.llm.claude_message(
             model=CLAUDE_MODEL,
             max_tokens=1000,
             messages=[{"role": "user", "content": prompt}],
         )
 
         try:
-            return json.loads(response.content[0].text)
+            return json.loads(response)
         except:
             return {"recommended_chart_type": "bar", "title": "Data Visualization"}
 
@@ -247,7 +248,7 @@ class ChartGeneratorAgent:
         Generate Python code to create a chart based on this analysis:
         
         Request: {request}
-        Analysis: {json.dumps(analysis, indent=2)}
+        Analysis: {fit_section(analysis, "context")}
         
         Generate complete Python code using matplotlib/seaborn that:
         1. Creates the recommended chart type
@@ -273,13 +274,13 @@ class ChartGeneratorAgent:
         Respond with ONLY the Python code, no explanations.
         """
 
-        response = self.claude.messages.create(
+        response = await self.llm.claude_message(
             model=CLAUDE_MODEL,
             max_tokens=1500,
             messages=[{"role": "user", "content": prompt}],
         )
 
-        return response.content[0].text
+        return response
 
     async def _execute_chart_generation(self, chart_code: str, file_data: Dict) -> Dict:
         """Execute the generated chart code."""
@@ -310,7 +311,7 @@ class TextProcessorAgent:
     def __init__(self):
         self.name = "text_processor"
         self.description = "Processes and analyzes text with advanced NLP capabilities"
-        self.claude = Anthropic(api_key=ANTHROPIC_API_KEY)
+        self.llm = get_llm_gateway()
 
     async def execute(
         self, request: str, file_data: Dict = None, context: Dict = None
@@ -370,7 +371,7 @@ class TextProcessorAgent:
         Text to process:
         {text_content[:3000]}
         
-        Context: {json.dumps(context, indent=2) if context else "None"}
+        Context: {fit_section(context, "context") if context else "None"}
         
         Based on the request, perform the appropriate text processing:
         
@@ -404,17 +405,17 @@ class TextProcessorAgent:
         }}
         """
 
-        response = self.claude.messages.create(
+        response = await self.llm.claude_message(
             model=CLAUDE_MODEL,
             max_tokens=CLAUDE_MAX_TOKENS,
             messages=[{"role": "user", "content": prompt}],
         )
 
         try:
-            return json.loads(response.content[0].text)
+            return json.loads(response)
         except json.JSONDecodeError:
             return {
-                "processed_result": response.content[0].text,
+                "processed_result": response,
                 "analysis": {},
                 "entities": [],
                 "sentiment": "neutral",
@@ -9,7 +9,6 @@ import ast
 import json
 import traceback
 from typing import Dict, List, Optional, Any
-from anthropic import Anthropic
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
@@ -28,6 +27,8 @@ from config import (
 )
 from core.registry import RegistryManager
 from core.registry_singleton import get_shared_registry
+from core.component_loader import get_component_loader
+from core.llm_gateway import get_llm_gateway
 
 
 class ToolFactory:
@@ -38,7 +39,7 @@ class ToolFactory:
 
     def __init__(self):
         """Initialize the tool factory."""
-        self.client = Anthropic(api_key=ANTHROPIC_API_KEY)
+        self.llm = get_llm_gateway()
         self.registry = get_shared_registry()
         self.generation_history = []
 
@@ -227,14 +228,15 @@ class ToolFactory:
 
         try:
             # Call Claude API
-            response = self.client.messages.create(
+            response = self.llm.claude_message_sync(
                 model=CLAUDE_MODEL,
                 max_tokens=CLAUDE_MAX_TOKENS,
                 messages=[{"role": "user", "content": prompt}],
+                priority="background",  # Tool generation yields to chat
             )
 
             # Extract code from response
-            code = self._extract_code_from_response(response.content[0].text)
+            code = self._extract_code_from_response(response)
 
             if not code:
                 return {
@@ -611,16 +613,14 @@ class ToolFactory:
         if not tool_info:
             return [{"status": "error", "message": "Tool not found in registry"}]
 
-        # Import the tool dynamically
+        # Load the tool through the shared loader
         try:
-            import importlib.util
-
-            spec = importlib.util.spec_from_file_location(
-                tool_name, tool_info["location"]
+            tool_func = get_component_loader().load(
+                tool_info["location"],
+                [tool_name],
+                version=tool_info.get("version"),
+                module_name=tool_name,
             )
-            module = importlib.util.module_from_spec(spec)
-            spec.loader.exec_module(module)
-            tool_func = getattr(module, tool_name)
         except Exception as e:
             return [{"status": "error", "message": f"Failed to import tool: {str(e)}"}]
 
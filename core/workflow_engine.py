@@ -8,13 +8,27 @@ context-aware agent execution with intelligent data flow.
 
 import asyncio
 import os
-from typing import Dict, List, Any, Optional
+import time
+from typing import AsyncIterator, Callable, Dict, List, Any, Optional
 from datetime import datetime
-import importlib.util
 import json
 
-from anthropic import Anthropic
-from config import ANTHROPIC_API_KEY, CLAUDE_MODEL
+from config import (
+    AGENT_EXECUTION_BACKEND,
+    CLAUDE_MODEL,
+    GENERATED_AGENTS_DIR,
+    PREBUILT_AGENTS_DIR,
+)
+from core.component_loader import get_component_loader
+from core.llm_gateway import get_llm_gateway
+from core.prompt_budget import fit_section
+from core.registry_singleton import (
+    get_registry_snapshot,
+    get_shared_registry,
+    pinned_registry_snapshot,
+)
+from core.registry_watcher import subscribe_file_changes
+from core.sandbox_executor import SandboxTimeoutError, get_sandbox_executor
 from core.specialized_agents import (
     PDFAnalyzerAgent,
     ChartGeneratorAgent,
@@ -38,22 +52,57 @@ class EnhancedMultiAgentWorkflowEngine:
         }
         self.workflow_state = {}
         self.dynamic_agents = {}
+        self.dynamic_agent_paths = {}  # agent name -> module file it was loaded from
+
+        # Drop cached agent modules when their file changes on disk
+        subscribe_file_changes(
+            self._on_agent_files_changed, [GENERATED_AGENTS_DIR, PREBUILT_AGENTS_DIR]
+        )
+
+    def _on_agent_files_changed(self, paths):
+        """File watcher callback: forget agents whose module file changed."""
+        for name, location in list(self.dynamic_agent_paths.items()):
+            if os.path.abspath(location) in paths:
+                print(f"DEBUG: Agent module changed, unloading '{name}'")
+                self.dynamic_agents.pop(name, None)
+                self.dynamic_agent_paths.pop(name, None)
 
     async def execute_ai_planned_workflow(
-        self, ai_workflow_plan: Dict, request: str, files: List[Dict] = None
+        self,
+        ai_workflow_plan: Dict,
+        request: str,
+        files: List[Dict] = None,
+        on_token: Optional[Callable[[str], None]] = None,
     ) -> Dict:
         """
         Execute AI-planned workflow with context-aware agent coordination.
 
+        Every step resolves agents against the registry snapshot pinned here,
+        so a reload mid-run cannot change what the workflow sees.
+
         Args:
             ai_workflow_plan: Plan from AIWorkflowPlanner
             request: Original user request
             files: Uploaded files with content
+            on_token: Optional callback receiving the synthesized response
+                as it streams; the full text is still returned in ai_response
 
         Returns:
             Dict with comprehensive workflow results
         """
+        with pinned_registry_snapshot() as snapshot:
+            print(f"DEBUG: Workflow pinned registry generation {snapshot.generation}")
+            return await self._execute_ai_planned_workflow(
+                ai_workflow_plan, request, files, on_token
+            )
 
+    async def _execute_ai_planned_workflow(
+        self,
+        ai_workflow_plan: Dict,
+        request: str,
+        files: List[Dict] = None,
+        on_token: Optional[Callable[[str], None]] = None,
+    ) -> Dict:
         workflow_id = f"ai_wf_{datetime.now().strftime('%Y%m%d%H%M%S')}"
         start_time = datetime.now()
 
@@ -118,6 +167,7 @@ class EnhancedMultiAgentWorkflowEngine:
                 workflow_results=results,
                 scenario_key=ai_workflow_plan.get("scenario"),
                 execution_metadata=execution_metadata,
+                on_token=on_token,
             )
 
             return {
@@ -364,6 +414,28 @@ class EnhancedMultiAgentWorkflowEngine:
         request: str,
         file_data: Dict,
         step_context: Dict,
+    ) -> Dict:
+        """Execute an agent and record its latency and outcome in the registry."""
+        started = time.perf_counter()
+        result = await self._run_context_aware_agent(
+            agent, agent_name, request, file_data, step_context
+        )
+        outcome = "success"
+        if isinstance(result, dict) and result.get("status") == "error":
+            # A timeout is counted as such, and kept out of the latency sketch
+            outcome = "timeout" if result.get("timed_out") else "error"
+        get_shared_registry().update_agent_metrics(
+            agent_name, time.perf_counter() - started, outcome
+        )
+        return result
+
+    async def _run_context_aware_agent(
+        self,
+        agent: Any,
+        agent_name: str,
+        request: str,
+        file_data: Dict,
+        step_context: Dict,
     ) -> Dict:
         """FIXED: Execute agent with full context awareness."""
 
@@ -537,17 +609,9 @@ class EnhancedMultiAgentWorkflowEngine:
         """
         print(f"DEBUG: Loading agent '{agent_name}'")
 
-        from core.registry_singleton import get_shared_registry
-
-        registry = get_shared_registry()
-
-        # Force reload to get latest agents
-        from core.registry_singleton import force_global_reload
-
-        force_global_reload()
-
-        available_agents = registry.agents.get("agents", {})
-        print(f"DEBUG: Available agent keys: {list(available_agents.keys())}")
+        # The workflow's pinned snapshot (or the latest one outside a workflow)
+        available_agents = get_registry_snapshot().agents
+        print(f"DEBUG: {len(available_agents)} agents in registry snapshot")
 
         if agent_name not in available_agents:
             # Try to find the agent with a similar name
@@ -577,73 +641,76 @@ class EnhancedMultiAgentWorkflowEngine:
             print(f"DEBUG: Using built-in agent '{agent_name}'")
             return self.agents[agent_name]
 
-        # Check dynamic agents cache
-        if agent_name in self.dynamic_agents:
-            print(f"DEBUG: Using cached dynamic agent '{agent_name}'")
-            return self.dynamic_agents[agent_name]
-
         # Try dynamic loading for generated agents
         try:
             agent_location = agent_info.get("location")
-            if not agent_location or not os.path.exists(agent_location):
-                print(f"DEBUG: Agent file not found: {agent_location}")
-                return None
-
-            print(f"DEBUG: Loading agent from: {agent_location}")
-
-            # Dynamic import of the agent
-            spec = importlib.util.spec_from_file_location(
-                f"{agent_name}_module", agent_location
-            )
-            if spec is None or spec.loader is None:
-                print(f"DEBUG: Could not create spec for {agent_name}")
+            if not agent_location:
+                print(f"DEBUG: Agent '{agent_name}' has no location")
                 return None
 
-            module = importlib.util.module_from_spec(spec)
-            spec.loader.exec_module(module)
-
-            # FIXED: Look for the exact function name
+            function_names = [
+                agent_name,
+                f"{agent_name}_agent",
+                agent_name.replace("_", ""),
+                f"{agent_name}Agent",
+            ]
+            version = agent_info.get("version")
+            sandbox = None
             agent_function = None
-
-            # Try exact agent name first
-            if hasattr(module, agent_name):
-                agent_function = getattr(module, agent_name)
-                print(f"DEBUG: Found function with exact name: {agent_name}")
+            if AGENT_EXECUTION_BACKEND == "sandbox":
+                # Loaded and run in a sandbox worker, never in this process
+                if not os.path.exists(agent_location):
+                    print(f"DEBUG: Agent file not found: {agent_location}")
+                    return None
+                sandbox = (agent_location, function_names, version)
             else:
-                # Try variations
-                possible_names = [
-                    f"{agent_name}_agent",
-                    agent_name.replace("_", ""),
-                    f"{agent_name}Agent",
-                ]
-
-                for name in possible_names:
-                    if hasattr(module, name):
-                        agent_function = getattr(module, name)
-                        print(f"DEBUG: Found function with name: {name}")
-                        break
-
-            if agent_function is None:
-                # List all available functions for debugging
-                functions = [
-                    name
-                    for name in dir(module)
-                    if callable(getattr(module, name)) and not name.startswith("_")
-                ]
-                print(f"DEBUG: Available functions in module: {functions}")
-                return None
+                # Shared loader: a dict lookup unless the agent's source changed
+                try:
+                    agent_function = get_component_loader().load(
+                        agent_location,
+                        function_names,
+                        version=version,
+                        module_name=f"{agent_name}_module",
+                    )
+                except FileNotFoundError:
+                    print(f"DEBUG: Agent file not found: {agent_location}")
+                    return None
+                except AttributeError as e:
+                    print(f"DEBUG: {e}")
+                    return None
+
+            # Reuse the wrapper while it wraps the current function
+            cached = self.dynamic_agents.get(agent_name)
+            if cached is not None and (
+                getattr(cached, "sandbox", None) == sandbox
+                if sandbox
+                else getattr(cached, "func", None) is agent_function
+            ):
+                print(f"DEBUG: Using cached dynamic agent '{agent_name}'")
+                return cached
 
             # Create wrapper for the function
             class FunctionAgentWrapper:
-                def __init__(self, func, name):
+                def __init__(self, func, name, sandbox=None):
                     self.func = func
                     self.name = name
+                    self.sandbox = sandbox  # (location, function names, version)
 
                 async def execute(self, state):
                     """Execute the agent function with state"""
                     print(f"DEBUG: Executing agent function: {self.name}")
                     try:
-                        result = self.func(state)
+                        if self.sandbox:
+                            location, names, version = self.sandbox
+                            result = await get_sandbox_executor().run(
+                                location,
+                                names,
+                                (state,),
+                                version=version,
+                                timeout=get_shared_registry().agent_timeout(self.name),
+                            )
+                        else:
+                            result = self.func(state)
                         print(f"DEBUG: Agent execution result type: {type(result)}")
 
                         # Ensure result is in correct format
@@ -658,13 +725,21 @@ class EnhancedMultiAgentWorkflowEngine:
                         else:
                             return {"status": "error", "error": "Invalid result format"}
 
+                    except SandboxTimeoutError as e:
+                        print(f"DEBUG: Agent execution timed out: {str(e)}")
+                        return {
+                            "status": "error",
+                            "error": f"Agent timed out: {e}",
+                            "timed_out": True,
+                        }
                     except Exception as e:
                         print(f"DEBUG: Agent execution failed: {str(e)}")
                         return {"status": "error", "error": str(e)}
 
             # Cache the wrapped agent
-            wrapped_agent = FunctionAgentWrapper(agent_function, agent_name)
+            wrapped_agent = FunctionAgentWrapper(agent_function, agent_name, sandbox)
             self.dynamic_agents[agent_name] = wrapped_agent
+            self.dynamic_agent_paths[agent_name] = agent_location
 
             print(f"DEBUG: Successfully loaded and wrapped agent '{agent_name}'")
             return wrapped_agent
@@ -779,21 +854,27 @@ class EnhancedMultiAgentWorkflowEngine:
                     "error": f"Agent file not found: {agent_file}",
                 }
 
-            # Load agent module dynamically
-            spec = importlib.util.spec_from_file_location(
-                f"{agent_name}_module", agent_file
-            )
-            agent_module = importlib.util.module_from_spec(spec)
-            spec.loader.exec_module(agent_module)
-
-            # Find agent function
-            agent_function = getattr(agent_module, agent_name)
+            version = agent_info.get("version")
+            sandbox = None
+            agent_function = None
+            if AGENT_EXECUTION_BACKEND == "sandbox":
+                # Loaded and run in a sandbox worker, never in this process
+                sandbox = (agent_file, [agent_name], version)
+            else:
+                # Load agent function through the shared loader
+                agent_function = get_component_loader().load(
+                    agent_file,
+                    [agent_name],
+                    version=version,
+                    module_name=f"{agent_name}_module",
+                )
 
             # Create wrapper that matches existing agent interface
             class DynamicAgentWrapper:
-                def __init__(self, func):
+                def __init__(self, func, sandbox=None):
                     self.func = func
                     self.name = agent_name
+                    self.sandbox = sandbox  # (location, function names, version)
 
                 async def execute(
                     self, request: str, file_data: Dict = None, context: Dict = None
@@ -804,10 +885,22 @@ class EnhancedMultiAgentWorkflowEngine:
                         "file_data": file_data,
                         "context": context,
                     }
+                    if self.sandbox:
+                        location, names, version = self.sandbox
+                        return await get_sandbox_executor().run(
+                            location,
+                            names,
+                            (input_data,),
+                            version=version,
+                            timeout=get_shared_registry().agent_timeout(self.name),
+                        )
                     return self.func(input_data)
 
             # Cache the wrapped agent
-            self.dynamic_agents[agent_name] = DynamicAgentWrapper(agent_function)
+            self.dynamic_agents[agent_name] = DynamicAgentWrapper(
+                agent_function, sandbox
+            )
+            self.dynamic_agent_paths[agent_name] = agent_file
 
             return {"status": "success", "agent_loaded": agent_name}
 
@@ -829,7 +922,7 @@ class AIResponseSynthesizer:
     """
 
     def __init__(self):
-        self.claude = Anthropic(api_key=ANTHROPIC_API_KEY)
+        self.llm = get_llm_gateway()
 
     async def synthesize_final_response(
         self,
@@ -837,27 +930,64 @@ class AIResponseSynthesizer:
         workflow_results: dict,
         scenario_key: str = None,
         execution_metadata: dict = None,
+        on_token: Optional[Callable[[str], None]] = None,
     ) -> str:
         """
-        Create a natural language response based on workflow results
+        Create a natural language response based on workflow results.
+
+        When on_token is given the response is streamed and each chunk is
+        passed to it as it arrives; the complete text is returned either way.
         """
 
         # Build context for AI synthesis
         synthesis_prompt = self._build_synthesis_prompt(
             original_request, workflow_results, scenario_key, execution_metadata
         )
+        fallback = f"Analysis completed successfully. {len(workflow_results)} agents processed your request with detailed results available."
 
-        try:
-            response = self.claude.messages.create(
-                model=CLAUDE_MODEL,
-                max_tokens=1500,
-                messages=[{"role": "user", "content": synthesis_prompt}],
-            )
-
-            return response.content[0].text
+        if on_token is None:
+            try:
+                return await self.llm.claude_message(
+                    model=CLAUDE_MODEL,
+                    max_tokens=1500,
+                    messages=[{"role": "user", "content": synthesis_prompt}],
+                )
+            except Exception as e:
+                return fallback
 
+        chunks = []
+        try:
+            async for chunk in self._stream_prompt(synthesis_prompt):
+                chunks.append(chunk)
+                on_token(chunk)
         except Exception as e:
-            return f"Analysis completed successfully. {len(workflow_results)} agents processed your request with detailed results available."
+            print(f"DEBUG: Streaming synthesis failed after {len(chunks)} chunks: {e}")
+            if not chunks:
+                on_token(fallback)
+                return fallback
+        return "".join(chunks)
+
+    async def stream_final_response(
+        self,
+        original_request: str,
+        workflow_results: dict,
+        scenario_key: str = None,
+        execution_metadata: dict = None,
+    ) -> AsyncIterator[str]:
+        """Async generator yielding the synthesized response as it streams."""
+        synthesis_prompt = self._build_synthesis_prompt(
+            original_request, workflow_results, scenario_key, execution_metadata
+        )
+        async for chunk in self._stream_prompt(synthesis_prompt):
+            yield chunk
+
+    async def _stream_prompt(self, synthesis_prompt: str) -> AsyncIterator[str]:
+        async for chunk in self.llm.claude_message_stream(
+            model=CLAUDE_MODEL,
+            max_tokens=1500,
+            messages=[{"role": "user", "content": synthesis_prompt}],
+        ):
+            yield chunk
 
     def _build_synthesis_prompt(
         self,
@@ -903,7 +1033,7 @@ You are synthesizing results from a sales analysis workflow into a natural, exec
 ORIGINAL USER REQUEST: "{original_request}"
 
 WORKFLOW RESULTS:
-{json.dumps(agent_outputs, indent=2)}
+{fit_section(agent_outputs, "results")}
 
 EXECUTION CONTEXT:
 - Agents executed: {list(agent_outputs.keys())}
@@ -944,7 +1074,7 @@ You are synthesizing results from a compliance monitoring workflow into a profes
 ORIGINAL USER REQUEST: "{original_request}"
 
 WORKFLOW RESULTS:
-{json.dumps(agent_outputs, indent=2)}
+{fit_section(agent_outputs, "results")}
 
 EXECUTION CONTEXT:
 - Agents executed: {list(agent_outputs.keys())}
@@ -985,7 +1115,7 @@ You are synthesizing results from an AI workflow into a helpful user response.
 ORIGINAL USER REQUEST: "{original_request}"
 
 WORKFLOW RESULTS:
-{json.dumps(agent_outputs, indent=2)}
+{fit_section(agent_outputs, "results")}
 
 EXECUTION CONTEXT:
 - Agents executed: {list(agent_outputs.keys())}
@@ -85,6 +85,24 @@ def initialize_services():
         else:
             print("WARNING: Orchestrator service not available")
 
+        # Open provider connections in the background so the first chat
+        # request doesn't pay for TCP/TLS setup
+        from config import LLM_PREWARM_CONNECTIONS
+
+        if LLM_PREWARM_CONNECTIONS:
+            import threading
+            from core.llm_clients import get_llm_clients
+
+            threading.Thread(
+                target=get_llm_clients().prewarm, name="llm-prewarm", daemon=True
+            ).start()
+
+        # Push registry changes from a file watcher instead of polling on
+        # every request (no-op when REGISTRY_WATCH_MODE is "off")
+        from core.registry_watcher import start_registry_watcher
+
+        start_registry_watcher()
+
         print("DEBUG: Services initialization completed")
 
     except Exception as e:
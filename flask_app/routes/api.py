@@ -6,11 +6,15 @@ Handles AJAX requests, file uploads, and data endpoints
 
 import os
 import json
+import queue
+import asyncio
+import threading
 from typing import Any, Dict, List
 import uuid
 from datetime import datetime
 from flask import (
     Blueprint,
+    Response,
     request,
     jsonify,
     current_app,
@@ -18,6 +22,7 @@ from flask import (
     make_response,
     send_file,
 )
+from itsdangerous import BadSignature, URLSafeSerializer
 from werkzeug.utils import secure_filename
 from flask_app.services.orchestrator_service import orchestrator_service
 from flask_app.services.registry_service import registry_service
@@ -282,21 +287,7 @@ def send_chat_message():
 
         try:
             # Simple complexity detection
-            request_lower = message.lower()
-            pipeline_keywords = [
-                "then",
-                "after",
-                "and",
-                "extract and",
-                "analyze and",
-                "step",
-                "first",
-                "next",
-            ]
-            is_complex = (
-                any(keyword in request_lower for keyword in pipeline_keywords)
-                or len(files) > 1
-            )
+            is_complex = is_pipeline_request(message, files)
 
             if is_complex:
                 # Use pipeline processing (if you implement process_pipeline_request)
@@ -330,42 +321,7 @@ def send_chat_message():
         response_text = create_natural_response(result, message)
 
         # Add system response to session with pipeline info
-        system_response = {
-            "id": f"sys_{uuid.uuid4().hex[:8]}",
-            "message": response_text,
-            "timestamp": datetime.now().isoformat(),
-            "type": "system",
-            "workflow_id": result.get("workflow_id"),
-            "status": result.get("status"),
-            "metadata": {
-                "agents_used": result.get("workflow", {}).get("steps", []),
-                "execution_time": result.get("execution_time", 0),
-                "components_created": result.get("metadata", {}).get(
-                    "components_created", 0
-                ),
-                "workflow_type": workflow_type,
-                # NEW: Add pipeline info
-                "pipeline_info": {
-                    "type": (
-                        "pipeline"
-                        if len(result.get("workflow", {}).get("steps", [])) > 1
-                        else "simple"
-                    ),
-                    "steps": result.get("workflow", {}).get("steps", []),
-                    "steps_completed": len(result.get("workflow", {}).get("steps", [])),
-                    "total_steps": len(result.get("workflow", {}).get("steps", [])),
-                    "execution_time": result.get("execution_time", 0),
-                    "performance_grade": (
-                        "excellent"
-                        if result.get("status") == "success"
-                        else "acceptable"
-                    ),
-                    "components_created": result.get("metadata", {}).get(
-                        "components_created", 0
-                    ),
-                },
-            },
-        }
+        system_response = build_system_message(response_text, result, workflow_type)
 
         session["chat_history"].append(system_response)
         session.modified = True
@@ -399,6 +355,216 @@ def send_chat_message():
         )
 
 
+@api_bp.route("/chat/stream", methods=["POST"])
+def stream_chat_message():
+    """
+    Process a chat message and stream the response as server-sent events.
+
+    Events:
+        token - {"text": chunk} as the final response is synthesized
+        done  - {"response", "message_id", "workflow_id", "status",
+                 "execution_time", "metadata", "pipeline_info", "record"}
+
+    The workflow runs on a background thread with its own event loop; tokens
+    cross to this response generator through a queue. The session cookie is
+    sent with the headers, before the reply exists, so the done event carries
+    the reply as a signed record the client posts to /chat/stream/save.
+    """
+    data = request.get_json()
+    if not data or not (data.get("message") or "").strip():
+        return jsonify({"error": "No message provided"}), 400
+
+    message = data["message"].strip()
+    files = data.get("files", [])
+    settings = data.get("settings", {})
+    auto_create = settings.get("auto_create", session.get("auto_create", True))
+    workflow_type = settings.get(
+        "workflow_type", session.get("workflow_type", "sequential")
+    )
+    heartbeat = current_app.config.get("SSE_HEARTBEAT_INTERVAL", 30)
+    serializer = _reply_serializer()
+
+    if "chat_history" not in session:
+        session["chat_history"] = []
+    session["chat_history"].append(
+        {
+            "id": f"msg_{uuid.uuid4().hex[:8]}",
+            "message": message,
+            "timestamp": datetime.now().isoformat(),
+            "type": "user",
+            "files": files,
+        }
+    )
+    reply_id = f"sys_{uuid.uuid4().hex[:8]}"
+    # Only replies issued to this session can be saved into it
+    session["pending_replies"] = session.get("pending_replies", [])[-9:] + [reply_id]
+    session.modified = True
+
+    events = queue.Queue()
+
+    def run_workflow():
+        streamed = []
+
+        def on_token(chunk):
+            streamed.append(chunk)
+            events.put(("token", {"text": chunk}))
+
+        try:
+            result = asyncio.run(
+                orchestrator_service.process_user_request(
+                    request_text=message,
+                    files=files,
+                    auto_create=auto_create,
+                    on_token=on_token,
+                )
+            )
+            if is_pipeline_request(message, files):
+                result.setdefault("metadata", {})["is_pipeline"] = True
+        except Exception as e:
+            result = {
+                "status": "error",
+                "error": str(e),
+                "response": f"I encountered an error processing your request: {str(e)}",
+            }
+
+        # Keep the text the user watched stream in; only format its attribution
+        if streamed:
+            response_text = format_attribution("".join(streamed))
+        else:
+            response_text = create_natural_response(result, message)
+        system_response = build_system_message(
+            response_text, result, workflow_type, message_id=reply_id
+        )
+
+        events.put(
+            (
+                "done",
+                {
+                    "response": response_text,
+                    "message_id": reply_id,
+                    "workflow_id": result.get("workflow_id"),
+                    "status": result.get("status"),
+                    "error": result.get("error"),
+                    "execution_time": result.get("execution_time", 0),
+                    "metadata": system_response["metadata"],
+                    "pipeline_info": system_response["metadata"]["pipeline_info"],
+                    "record": serializer.dumps(system_response),
+                },
+            )
+        )
+
+    threading.Thread(target=run_workflow, daemon=True).start()
+
+    def generate():
+        while True:
+            try:
+                event, payload = events.get(timeout=heartbeat)
+            except queue.Empty:
+                yield ": keep-alive\n\n"
+                continue
+            yield f"event: {event}\ndata: {json.dumps(payload, default=str)}\n\n"
+            if event == "done":
+                break
+
+    return Response(
+        generate(),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@api_bp.route("/chat/stream/save", methods=["POST"])
+def save_streamed_reply():
+    """Append a streamed reply (the signed record from its done event) to the chat history."""
+    data = request.get_json() or {}
+    try:
+        system_response = _reply_serializer().loads(data.get("record", ""))
+    except BadSignature:
+        return jsonify({"error": "Invalid reply record"}), 400
+
+    pending = session.get("pending_replies", [])
+    if system_response.get("id") not in pending:
+        return jsonify({"error": "Reply was not issued to this session"}), 400
+
+    session["pending_replies"] = [r for r in pending if r != system_response["id"]]
+    session.setdefault("chat_history", []).append(system_response)
+    session.modified = True
+    return jsonify({"status": "success", "message_id": system_response["id"]})
+
+
+def _reply_serializer() -> URLSafeSerializer:
+    return URLSafeSerializer(current_app.secret_key, salt="chat-stream-reply")
+
+
+def is_pipeline_request(message: str, files: List) -> bool:
+    """Whether a request looks multi-step (recorded as is_pipeline metadata)."""
+    request_lower = message.lower()
+    pipeline_keywords = [
+        "then",
+        "after",
+        "and",
+        "extract and",
+        "analyze and",
+        "step",
+        "first",
+        "next",
+    ]
+    return any(keyword in request_lower for keyword in pipeline_keywords) or len(files) > 1
+
+
+def build_system_message(
+    response_text: str, result: Dict, workflow_type: str, message_id: str = None
+) -> Dict[str, Any]:
+    """Chat history entry for a system reply, with its pipeline info."""
+    steps = result.get("workflow", {}).get("steps", [])
+    return {
+        "id": message_id or f"sys_{uuid.uuid4().hex[:8]}",
+        "message": response_text,
+        "timestamp": datetime.now().isoformat(),
+        "type": "system",
+        "workflow_id": result.get("workflow_id"),
+        "status": result.get("status"),
+        "metadata": {
+            "agents_used": steps,
+            "execution_time": result.get("execution_time", 0),
+            "components_created": result.get("metadata", {}).get(
+                "components_created", 0
+            ),
+            "workflow_type": workflow_type,
+            "is_pipeline": result.get("metadata", {}).get("is_pipeline", False),
+            # NEW: Add pipeline info
+            "pipeline_info": {
+                "type": "pipeline" if len(steps) > 1 else "simple",
+                "steps": steps,
+                "steps_completed": len(steps),
+                "total_steps": len(steps),
+                "execution_time": result.get("execution_time", 0),
+                "performance_grade": (
+                    "excellent" if result.get("status") == "success" else "acceptable"
+                ),
+                "components_created": result.get("metadata", {}).get(
+                    "components_created", 0
+                ),
+            },
+        },
+    }
+
+
+def format_attribution(response: str) -> str:
+    """Render a trailing "*Processed using ...*" attribution as a muted line."""
+    if "*Processed using" not in response:
+        return response
+
+    # Split main response from attribution
+    parts = response.split("*Processed using", 1)
+    main_text = parts[0].strip()
+
+    # Clean and format attribution
+    attribution = "Processed using" + parts[1].replace("*", "").strip()
+    # Add subtle styling with HTML
+    return f"{main_text}\n\n<small class='text-muted'><i class='fas fa-cogs'></i> {attribution}</small>"
+
+
 def create_natural_response(result, original_request):
     """Create response using orchestrator output or intelligent fallbacks."""
 
@@ -408,19 +574,7 @@ def create_natural_response(result, original_request):
         print(f"DEBUG: Using orchestrator response: {response[:100]}...")
 
         # Enhanced: Format attribution nicely if present
-        if "*Processed using" in response:
-            # Split main response from attribution
-            parts = response.split("*Processed using", 1)
-            main_text = parts[0].strip()
-
-            if len(parts) > 1:
-                # Clean and format attribution
-                attribution = "Processed using" + parts[1].replace("*", "").strip()
-                # Add subtle styling with HTML
-                formatted_response = f"{main_text}\n\n<small class='text-muted'><i class='fas fa-cogs'></i> {attribution}</small>"
-                return formatted_response
-
-        return response
+        return format_attribution(response)
 
     # IMPROVED: Use original_request for context-aware fallbacks
     if result.get("status") == "error":
@@ -590,6 +744,18 @@ def registry_stats():
         return jsonify({"error": str(e)}), 500
 
 
+@api_bp.route("/metrics")
+def registry_metrics():
+    """Get per-agent/tool latency percentiles and error/timeout counts."""
+    try:
+        kind = request.args.get("kind")
+        if kind not in (None, "agents", "tools"):
+            return jsonify({"error": "kind must be 'agents' or 'tools'"}), 400
+        return jsonify(registry_service.get_metrics(kind))
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
 @api_bp.route("/chat/history")
 def get_chat_history():
     """Get current chat history."""
@@ -933,3 +1099,17 @@ def list_pipeline_workflows():
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
+
+
+@api_bp.route("/llm/stats")
+def get_llm_stats():
+    """Get LLM gateway statistics (cache hit/miss, governor queue/wait metrics, plan cache)."""
+    try:
+        from core.llm_gateway import get_llm_gateway
+        from core.plan_cache import get_plan_cache
+
+        stats = get_llm_gateway().get_stats()
+        stats["plan_cache"] = get_plan_cache().get_stats()
+        return jsonify(stats)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
@@ -10,7 +10,7 @@ import asyncio
 import json
 import uuid
 from datetime import datetime, timedelta
-from typing import Dict, Any, List, Optional
+from typing import Callable, Dict, Any, List, Optional
 
 from core.pipeline_orchestrator import PipelineOrchestrator
 from core.workflow_intelligence import WorkflowIntelligence
@@ -83,6 +83,7 @@ class OrchestratorService:
         files: List[Dict] = None,
         auto_create: bool = True,
         workflow_type: str = "sequential",
+        on_token: Optional[Callable[[str], None]] = None,
     ) -> Dict[str, Any]:
         """
         Process user request through orchestrator.
@@ -92,6 +93,7 @@ class OrchestratorService:
             files: List of uploaded files with metadata
             auto_create: Whether to auto-create missing agents
             workflow_type: Type of workflow execution
+            on_token: Optional callback receiving response text as it streams
 
         Returns:
             Processed result with workflow information
@@ -158,6 +160,7 @@ class OrchestratorService:
                 user_request=request_text,
                 files=files,
                 auto_create=auto_create,
+                on_token=on_token,
             )
             execution_time = (datetime.now() - start_time).total_seconds()
 
@@ -49,6 +49,7 @@ class RegistryService:
                     agent.get("created_at")
                 )
                 agent["capabilities_summary"] = self._summarize_capabilities(agent)
+                agent["latency_summary"] = self._latency_summary(agent)
                 agent["performance_indicator"] = self._get_performance_indicator(agent)
 
             return agents
@@ -87,8 +88,10 @@ class RegistryService:
         try:
             agent = self.registry.get_agent(agent_name)
             if agent:
-                # Add dependency information
+                agent = dict(agent)  # Don't decorate the live registry entry
+                # Add dependency and latency information
                 agent["dependencies"] = self.registry.get_agent_dependencies(agent_name)
+                agent["metrics"] = self.registry.get_latency(agent_name)
                 agent["formatted_created_at"] = self._format_timestamp(
                     agent.get("created_at")
                 )
@@ -106,8 +109,10 @@ class RegistryService:
         try:
             tool = self.registry.get_tool(tool_name)
             if tool:
-                # Add usage information
+                tool = dict(tool)  # Don't decorate the live registry entry
+                # Add usage and latency information
                 tool["used_by"] = self.registry.get_tool_usage(tool_name)
+                tool["metrics"] = self.registry.get_latency(tool_name, kind="tools")
                 tool["formatted_created_at"] = self._format_timestamp(
                     tool.get("created_at")
                 )
@@ -193,6 +198,7 @@ class RegistryService:
                     "avg_execution_time": self._calculate_avg_execution_time(
                         active_agents
                     ),
+                    "latency": registry.get_statistics().get("latency", {}),
                 },
             }
         except Exception as e:
@@ -222,6 +228,24 @@ class RegistryService:
 
         return total_time / count if count > 0 else 0.0
 
+    def get_metrics(self, kind: str = None) -> Dict[str, Any]:
+        """Latency percentiles and error/timeout counts per agent and tool."""
+        if not self.is_available():
+            return {"available": False, "agents": [], "tools": []}
+
+        try:
+            kinds = [kind] if kind else ["agents", "tools"]
+            metrics = {
+                "available": True,
+                "summary": self.registry.get_statistics().get("latency", {}),
+            }
+            for name in kinds:
+                metrics[name] = self.registry.get_latency_statistics(name)
+            return metrics
+        except Exception as e:
+            print(f"ERROR: Failed to get registry metrics: {e}")
+            return {"available": True, "agents": [], "tools": [], "error": str(e)}
+
     def get_dependency_graph(self) -> Dict[str, Any]:
         """Get dependency graph for visualization."""
         if not self.is_available():
@@ -352,16 +376,22 @@ class RegistryService:
         else:
             return "General purpose agent"
 
+    def _latency_summary(self, agent: Dict) -> Dict:
+        """p50/p95/p99 of an agent, empty before its first recorded execution."""
+        metrics = self.registry.get_latency(agent.get("name", "")) or {}
+        return metrics.get("latency", {})
+
     def _get_performance_indicator(self, agent: Dict) -> str:
-        """Get performance indicator for agent."""
+        """Get performance indicator for agent (p95 latency when recorded)."""
         exec_count = agent.get("execution_count", 0)
-        avg_time = agent.get("avg_execution_time", 0)
+        p95 = agent.get("latency_summary", {}).get("p95")
+        typical_time = p95 if p95 is not None else agent.get("avg_execution_time", 0)
 
         if exec_count == 0:
             return "New"
-        elif avg_time < 2:
+        elif typical_time < 2:
             return "Fast"
-        elif avg_time < 10:
+        elif typical_time < 10:
             return "Normal"
         else:
             return "Slow"
@@ -0,0 +1,93 @@
+"""
+Shared fixtures: a RegistryManager over a temp JSON registry, installed as
+the registry singleton, with generated sources written to the temp directory.
+"""
+
+import json
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import core.registry as registry_module
+from core.registry import RegistryManager
+from core.registry_singleton import RegistrySingleton, _identities
+from core.registry_storage import JSONRegistryStorage
+
+TOOL_CODE = '''def {name}(input_data=None):
+    """Test tool: returns its input."""
+    if input_data is None:
+        return {{"status": "success", "data": None}}
+    result = input_data
+    # Padding so the tool meets MIN_TOOL_LINES
+    a = 1
+    b = 2
+    c = 3
+    d = 4
+    e = 5
+    f = 6
+    g = 7
+    h = 8
+    i = 9
+    j = 10
+    k = 11
+    l = 12
+    m = 13
+    return {{"status": "success", "data": result}}
+'''
+
+AGENT_CODE = '''def {name}_agent(state):
+    """Test agent: echoes its state."""
+    return state
+'''
+
+
+def tool_spec(name: str) -> dict:
+    return {"name": name, "description": f"Test tool {name}", "code": TOOL_CODE.format(name=name)}
+
+
+def agent_spec(name: str, uses_tools=None) -> dict:
+    return {
+        "name": name,
+        "description": f"Test agent {name}",
+        "code": AGENT_CODE.format(name=name),
+        "uses_tools": uses_tools or [],
+    }
+
+
+def read_registry(path: str, kind: str) -> dict:
+    with open(path) as f:
+        return json.load(f)[kind]
+
+
+@pytest.fixture
+def registry(tmp_path, monkeypatch):
+    """RegistryManager over empty temp agents.json/tools.json, as the singleton."""
+    agents_path = str(tmp_path / "agents.json")
+    tools_path = str(tmp_path / "tools.json")
+    for path, kind in ((agents_path, "agents"), (tools_path, "tools")):
+        with open(path, "w") as f:
+            json.dump({kind: {}}, f)
+    monkeypatch.setattr(registry_module, "GENERATED_AGENTS_DIR", str(tmp_path / "agents"))
+    monkeypatch.setattr(registry_module, "GENERATED_TOOLS_DIR", str(tmp_path / "tools"))
+    monkeypatch.setattr(RegistrySingleton, "_instance", None)
+
+    storage = JSONRegistryStorage(agents_path, tools_path)
+    manager = RegistryManager(agents_path, tools_path, storage=storage)
+
+    singleton = object.__new__(RegistrySingleton)
+    singleton._registry = manager
+    singleton._last_reload = time.time()
+    singleton._tokens = dict(storage.load_tokens)
+    singleton._identities = {
+        kind: _identities(singleton._section(kind)) for kind in ("agents", "tools")
+    }
+    singleton._listeners = []
+    singleton._publish_snapshot()
+    RegistrySingleton._instance = singleton
+
+    yield manager
+    RegistrySingleton._instance = None
@@ -0,0 +1,35 @@
+"""Restoring registry backups (core/registry_backup.py)."""
+
+import os
+
+import core.registry as registry_module
+from core.registry_backup import get_backup_store
+from core.registry_singleton import RegistrySingleton
+from tests.conftest import agent_spec, read_registry, tool_spec
+
+
+def test_restore_swaps_registries_sources_and_snapshot(registry, tmp_path):
+    registry.backup_dir = str(tmp_path / "backups")
+    store = get_backup_store(registry.backup_dir)
+    store.source_dirs = [registry_module.GENERATED_AGENTS_DIR, registry_module.GENERATED_TOOLS_DIR]
+
+    assert registry.register_tool(**tool_spec("shared"))["status"] == "success"
+    assert registry.register_agent(**agent_spec("kept", ["shared"]))["status"] == "success"
+    backup_name = os.path.basename(registry.backup_registries("before")).rsplit(".", 1)[0]
+
+    assert registry.register_agent(**agent_spec("later", ["shared"]))["status"] == "success"
+    later_path = registry.get_agent("later")["location"]
+    kept_path = registry.get_agent("kept")["location"]
+
+    assert registry.restore_registries(backup_name)
+
+    assert registry.get_agent("later") is None
+    assert registry.get_tool("shared")["used_by_agents"] == ["kept"]
+    assert set(read_registry(registry.agents_path, "agents")) == {"kept"}
+    assert read_registry(registry.tools_path, "tools")["shared"]["used_by_agents"] == ["kept"]
+    assert not os.path.exists(later_path)
+    assert os.path.exists(kept_path)
+
+    snapshot = RegistrySingleton().get_snapshot()
+    assert snapshot.get_agent("later") is None
+    assert snapshot.agent_exists("kept")
@@ -0,0 +1,91 @@
+"""Write-behind metrics flushes against concurrent registrations (core/registry_metrics.py)."""
+
+import threading
+
+from core.registry_metrics import MetricsBuffer
+from tests.conftest import agent_spec, read_registry
+
+
+def test_flush_does_not_lose_a_concurrent_registration(registry):
+    storage = registry.storage
+    assert registry.register_agent(**agent_spec("existing"))["status"] == "success"
+
+    buffer = MetricsBuffer(storage, flush_interval=3600)
+    buffer.record("existing", 0.25)
+
+    # Pause the flush after it has read the file, as a slow flush would
+    read_done = threading.Event()
+    resume = threading.Event()
+    original_current = storage._current
+
+    def paused_current(kind):
+        document = original_current(kind)
+        if threading.current_thread().name == "flusher":
+            read_done.set()
+            resume.wait(5)
+        return document
+
+    storage._current = paused_current
+    flusher = threading.Thread(target=buffer.flush, name="flusher")
+    flusher.start()
+    assert read_done.wait(5)
+
+    results = {}
+    registrar = threading.Thread(
+        target=lambda: results.update(registry.register_agent(**agent_spec("bench_0")))
+    )
+    registrar.start()
+    registrar.join(0.5)
+    assert registrar.is_alive()  # The registration waits for the flush's write
+
+    resume.set()
+    flusher.join(5)
+    registrar.join(5)
+    storage._current = original_current
+
+    assert results["status"] == "success"
+    agents = read_registry(storage.paths["agents"], "agents")
+    assert "bench_0" in agents
+    assert agents["existing"]["execution_count"] == 1
+    assert "bench_0" in registry.agents["agents"]
+
+
+def test_registration_save_keeps_flushed_metrics(registry):
+    storage = registry.storage
+    assert registry.register_agent(**agent_spec("counted"))["status"] == "success"
+
+    buffer = MetricsBuffer(storage, flush_interval=3600)
+    for _ in range(3):
+        buffer.record("counted", 0.1)
+    assert buffer.flush() == 3
+
+    # The in-memory entry still predates the flush; saving it with another
+    # agent's registration must not reset the flushed count
+    stale = dict(registry.agents["agents"]["counted"], execution_count=0)
+    registry.agents["agents"]["counted"] = stale
+    registry.storage.save("agents", registry.agents)
+    assert registry.register_agent(**agent_spec("other"))["status"] == "success"
+
+    agents = read_registry(storage.paths["agents"], "agents")
+    assert agents["counted"]["execution_count"] == 3
+    assert agents["counted"]["latency"]["count"] == 3
+    assert "other" in agents
+
+
+def test_failed_flush_keeps_pending_executions(registry):
+    buffer = MetricsBuffer(registry.storage, flush_interval=3600)
+    assert registry.register_agent(**agent_spec("flaky"))["status"] == "success"
+    buffer.record("flaky", 0.5)
+
+    def failing(kind, deltas):
+        raise OSError("disk full")
+
+    original = registry.storage.apply_metrics
+    registry.storage.apply_metrics = failing
+    assert buffer.flush() == 0
+    assert buffer.pending_count() == 1
+
+    registry.storage.apply_metrics = original
+    assert buffer.flush() == 1
+    agents = read_registry(registry.storage.paths["agents"], "agents")
+    assert agents["flaky"]["execution_count"] == 1
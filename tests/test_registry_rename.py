@@ -0,0 +1,28 @@
+"""Renaming agents (RegistryManager.rename_agent)."""
+
+from core.registry_singleton import RegistrySingleton
+from tests.conftest import agent_spec, read_registry, tool_spec
+
+
+def test_rename_keeps_search_graph_and_tool_references(registry):
+    assert registry.register_tool(**tool_spec("parser"))["status"] == "success"
+    spec = agent_spec("invoice_reader_v2", ["parser"])
+    spec["description"] = "Reads invoice totals"
+    assert registry.register_agent(**spec)["status"] == "success"
+    registry.search_agents("invoice")  # Build the index before the rename
+    registry.get_dependency_graph()
+
+    assert registry.rename_agent("invoice_reader_v2", "invoice_reader")
+
+    assert registry.get_agent("invoice_reader_v2") is None
+    assert registry.get_agent("invoice_reader")["name"] == "invoice_reader"
+    assert [a["name"] for a in registry.search_agents("invoice")] == ["invoice_reader"]
+    assert registry.get_tool("parser")["used_by_agents"] == ["invoice_reader"]
+    graph = registry.get_dependency_graph()
+    assert graph["agents_to_tools"]["invoice_reader"] == ["parser"]
+    assert graph["tools_to_agents"]["parser"] == ["invoice_reader"]
+    assert "invoice_reader_v2" not in graph["agents_to_tools"]
+
+    assert set(read_registry(registry.agents_path, "agents")) == {"invoice_reader"}
+    assert RegistrySingleton().get_snapshot().agent_exists("invoice_reader")
+    assert not registry.rename_agent("missing", "other")
@@ -0,0 +1,58 @@
+"""Shared snapshot readers following the publisher (core/registry_shared.py)."""
+
+import pytest
+
+from core.registry_shared import SharedSection, SharedSnapshotReader, acquire_publisher
+from core.registry_singleton import RegistrySingleton
+
+
+def _entry(name: str, version: str = "v1", **extra) -> dict:
+    return {"name": name, "version": version, "status": "active", **extra}
+
+
+@pytest.fixture
+def reader(registry, tmp_path, monkeypatch):
+    """The registry singleton attached as a reader of a temp shared snapshot."""
+    path = str(tmp_path / "snapshot")
+    publisher = acquire_publisher(path)
+    singleton = RegistrySingleton()
+    singleton._shared = SharedSnapshotReader(path)
+
+    def storage_poll(kind, token):
+        raise AssertionError("a reader must not re-read storage")
+
+    monkeypatch.setattr(registry.storage, "poll", storage_poll)
+    return singleton, publisher
+
+
+def test_reader_applies_only_changed_entries(reader, monkeypatch):
+    singleton, publisher = reader
+    registry = singleton._registry
+
+    publisher.publish(1, {"a": _entry("a"), "b": _entry("b")}, {"t": _entry("t")})
+    singleton.force_reload()
+    assert set(registry.agents["agents"]) == {"a", "b"}
+    assert registry.get_tool("t")["version"] == "v1"
+    untouched = registry.get_agent("a")
+
+    decoded = []
+    load_entry = SharedSection.load_entry
+
+    def counting_load_entry(section, name):
+        decoded.append(name)
+        return load_entry(section, name)
+
+    monkeypatch.setattr(SharedSection, "load_entry", counting_load_entry)
+    publisher.publish(
+        2,
+        {"a": _entry("a"), "c": _entry("c"), "d": _entry("d", latency={"count": 1})},
+        {"t": _entry("t", "v2")},
+    )
+    assert singleton._should_reload()
+    singleton.force_reload()
+
+    assert sorted(decoded) == ["c", "d", "t"]
+    assert set(registry.agents["agents"]) == {"a", "c", "d"}
+    assert registry.get_agent("a") is untouched
+    assert registry.get_tool("t")["version"] == "v2"
+    assert not singleton._should_reload()
@@ -0,0 +1,62 @@
+"""Storage backends keep flushed metrics when stale entries are saved (core/registry_storage.py)."""
+
+from core.registry_metrics import new_delta
+from core.registry_storage import SQLiteRegistryStorage
+
+
+def entry(name: str, version: str = "1.0.a", **fields) -> dict:
+    return {
+        "name": name,
+        "version": version,
+        "status": "active",
+        "description": f"Agent {name}",
+        "execution_count": 0,
+        "avg_execution_time": 0.0,
+        **fields,
+    }
+
+
+def delta(count: int, seconds: float = 0.2) -> dict:
+    result = new_delta()
+    for _ in range(count):
+        result["count"] += 1
+        result["total_time"] += seconds
+        result["latency"].add(seconds)
+        result["outcomes"].add("success")
+    result["last_executed"] = "2026-01-01T00:00:00"
+    return result
+
+
+def test_sqlite_full_row_write_keeps_flushed_metrics(tmp_path):
+    storage = SQLiteRegistryStorage(str(tmp_path / "registry.db"))
+    try:
+        document = {"agents": {"a": entry("a"), "b": entry("b")}}
+        storage.save("agents", document)
+
+        storage.apply_metrics("agents", {"a": delta(4)})
+
+        # The in-memory copy predates the flush and changed another field
+        document["agents"]["a"] = entry("a", description="Edited")
+        storage.save("agents", document, changed=["a"])
+
+        stored = storage.load("agents")["agents"]["a"]
+        assert stored["description"] == "Edited"
+        assert stored["execution_count"] == 4
+        assert stored["latency"]["count"] == 4
+    finally:
+        storage.close()
+
+
+def test_sqlite_new_version_starts_its_own_metrics(tmp_path):
+    storage = SQLiteRegistryStorage(str(tmp_path / "registry.db"))
+    try:
+        storage.save("agents", {"agents": {"a": entry("a")}})
+        storage.apply_metrics("agents", {"a": delta(2)})
+
+        storage.save("agents", {"agents": {"a": entry("a", version="1.0.b")}})
+
+        stored = storage.load("agents")["agents"]["a"]
+        assert stored["version"] == "1.0.b"
+        assert stored["execution_count"] == 0
+    finally:
+        storage.close()
@@ -0,0 +1,108 @@
+"""Transaction commit and rollback against published snapshots (core/registry_transaction.py)."""
+
+import os
+
+import pytest
+
+from core.registry_singleton import RegistrySingleton
+from tests.conftest import agent_spec, read_registry, tool_spec
+
+
+@pytest.fixture
+def shared_tool(registry):
+    """A tool already used by one agent, registered outside any transaction."""
+    assert registry.register_tool(**tool_spec("shared"))["status"] == "success"
+    assert registry.register_agent(**agent_spec("first", ["shared"]))["status"] == "success"
+    return registry
+
+
+def test_commit_publishes_staged_entries_only_at_commit(shared_tool):
+    registry = shared_tool
+    singleton = RegistrySingleton()
+    pinned = singleton.get_snapshot()
+
+    with registry.transaction():
+        result = registry.register_agent(**agent_spec("second", ["shared"]))
+        assert result["status"] == "success"
+        singleton._publish_snapshot()  # As any reload during the transaction would
+
+        snapshot = singleton.get_snapshot()
+        assert snapshot.get_agent("second") is None
+        assert snapshot.get_tool("shared")["used_by_agents"] == ["first"]
+
+    assert read_registry(registry.tools_path, "tools")["shared"]["used_by_agents"] == [
+        "first",
+        "second",
+    ]
+    snapshot = singleton.get_snapshot()
+    assert snapshot.agent_exists("second")
+    assert snapshot.get_tool("shared")["used_by_agents"] == ["first", "second"]
+    assert pinned.get_agent("second") is None
+    assert pinned.get_tool("shared")["used_by_agents"] == ["first"]
+
+
+def test_rollback_restores_tools_shared_between_agents(shared_tool):
+    registry = shared_tool
+    singleton = RegistrySingleton()
+    pinned = singleton.get_snapshot()
+
+    with pytest.raises(RuntimeError):
+        with registry.transaction():
+            registry.register_agent(**agent_spec("second", ["shared"]))
+            registry.register_agent(**agent_spec("third", ["shared"]))
+            raise RuntimeError("abort")
+
+    assert registry.get_tool("shared")["used_by_agents"] == ["first"]
+    assert registry.get_agent("second") is None
+    assert not os.path.exists(
+        os.path.join(os.path.dirname(registry.get_agent("first")["location"]), "second_agent.py")
+    )
+    assert read_registry(registry.tools_path, "tools")["shared"]["used_by_agents"] == ["first"]
+    assert "second" not in read_registry(registry.agents_path, "agents")
+
+    snapshot = singleton.get_snapshot()
+    assert snapshot.get_agent("second") is None
+    assert snapshot.get_tool("shared")["used_by_agents"] == ["first"]
+    assert pinned.get_tool("shared")["used_by_agents"] == ["first"]
+
+
+def test_atomic_register_many_rolls_back_every_item(shared_tool):
+    registry = shared_tool
+
+    result = registry.register_many(
+        tools=[tool_spec("extra")],
+        agents=[agent_spec("second", ["shared", "extra"]), agent_spec("broken", ["missing"])],
+        atomic=True,
+    )
+
+    assert result["status"] == "error"
+    assert result["registered"] == []
+    assert registry.get_tool("extra") is None
+    assert registry.get_agent("second") is None
+    assert registry.get_tool("shared")["used_by_agents"] == ["first"]
+    assert RegistrySingleton().get_snapshot().get_tool("extra") is None
+    assert set(read_registry(registry.tools_path, "tools")) == {"shared"}
+
+
+def test_failed_commit_rolls_back(shared_tool, monkeypatch):
+    registry = shared_tool
+    singleton = RegistrySingleton()
+
+    def failing_save_many(batch):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(registry.storage, "save_many", failing_save_many)
+    with pytest.raises(OSError):
+        with registry.transaction():
+            registry.register_agent(**agent_spec("second", ["shared"]))
+            second_path = registry.get_agent("second")["location"]
+
+    assert registry.get_agent("second") is None
+    assert registry.get_tool("shared")["used_by_agents"] == ["first"]
+    assert not os.path.exists(second_path)
+    assert registry.staged_previous("agents") == {}
+    assert singleton.get_snapshot().get_agent("second") is None
+
+    monkeypatch.delattr(registry.storage, "save_many")  # The storage class's again
+    assert registry.register_agent(**agent_spec("second", ["shared"]))["status"] == "success"
+    assert singleton.get_snapshot().agent_exists("second")
@@ -0,0 +1,54 @@
+"""Dropped events and watcher failures (core/registry_watcher.py)."""
+
+import os
+
+import pytest
+
+from core.registry_singleton import RegistrySingleton
+from core.registry_watcher import (
+    _EVENT_HEADER,
+    IN_Q_OVERFLOW,
+    InotifyWatcher,
+    PollingWatcher,
+)
+
+
+def test_queue_overflow_reports_every_watched_path(tmp_path, monkeypatch):
+    try:
+        watcher = InotifyWatcher()
+    except (OSError, AttributeError):
+        pytest.skip("inotify unavailable")
+    (tmp_path / "agents.json").write_text("{}")
+    (tmp_path / "tools.json").write_text("{}")
+    watcher.subscribe(lambda paths: None, [str(tmp_path)])
+
+    overflow = _EVENT_HEADER.pack(-1, IN_Q_OVERFLOW, 0, 0)
+    monkeypatch.setattr(os, "read", lambda fd, size: overflow)
+    changed = watcher._read_events()
+    monkeypatch.undo()
+    os.close(watcher._fd)
+
+    assert changed == {
+        str(tmp_path),
+        str(tmp_path / "agents.json"),
+        str(tmp_path / "tools.json"),
+    }
+
+
+def test_singleton_polls_again_when_the_watcher_thread_dies(registry):
+    singleton = RegistrySingleton()
+    watcher = PollingWatcher(interval=0.01)
+
+    def failing_run():
+        raise OSError("watch descriptor gone")
+
+    watcher._run = failing_run
+    watcher.add_exit_callback(singleton.disable_push_updates)
+    singleton.enable_push_updates()
+    assert not singleton._should_reload()
+
+    watcher.start()
+    watcher._thread.join(2)
+
+    assert not watcher.running
+    assert singleton._should_reload()
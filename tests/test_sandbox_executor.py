@@ -0,0 +1,114 @@
+"""Worker replacement and limits of the sandbox pool (core/sandbox_executor.py),
+and registration of agents that only run in it."""
+
+import pytest
+
+import core.registry as registry_module
+from core.sandbox_executor import (
+    SandboxExecutor,
+    SandboxLimitError,
+    SandboxTimeoutError,
+)
+
+ECHO_AGENT = '''def echo_agent(state):
+    return {"echo": state}
+'''
+
+SLOW_AGENT = '''import time
+
+
+def slow_agent(state):
+    time.sleep(30)
+    return state
+'''
+
+SPIN_AGENT = '''def spin_agent(state):
+    while True:
+        pass
+'''
+
+
+@pytest.fixture
+def agents(tmp_path):
+    """Paths of the test agents, by name."""
+    paths = {}
+    for name, code in (("echo", ECHO_AGENT), ("slow", SLOW_AGENT), ("spin", SPIN_AGENT)):
+        path = tmp_path / f"{name}_agent.py"
+        path.write_text(code)
+        paths[name] = str(path)
+    return paths
+
+
+@pytest.fixture
+def executor():
+    executor = SandboxExecutor(workers=1, cpu_seconds=1)
+    executor.start()
+    yield executor
+    executor.shutdown()
+
+
+def _only_worker(executor):
+    (worker,) = executor._workers
+    return worker
+
+
+def test_timeout_kills_the_worker_and_a_replacement_takes_over(executor, agents):
+    worker = _only_worker(executor)
+
+    with pytest.raises(SandboxTimeoutError):
+        executor.run_sync(agents["slow"], ["slow_agent"], args=({},), timeout=0.5)
+
+    assert worker.process.poll() is not None
+    assert _only_worker(executor) is not worker
+    stats = executor.get_stats()
+    assert stats["timeouts"] == 1
+    assert stats["workers_started"] == 2
+
+    result = executor.run_sync(agents["echo"], ["echo_agent"], args=({"a": 1},), timeout=10)
+    assert result == {"echo": {"a": 1}}
+
+
+def test_cpu_limit_raises_and_replaces_the_worker(executor, agents):
+    with pytest.raises(SandboxLimitError):
+        executor.run_sync(agents["spin"], ["spin_agent"], args=({},), timeout=30)
+
+    stats = executor.get_stats()
+    assert stats["limit_breaches"] == 1
+    assert stats["workers_started"] == 2
+    assert executor.run_sync(agents["echo"], ["echo_agent"], args=(1,), timeout=10) == {
+        "echo": 1
+    }
+
+
+def test_worker_that_died_idle_is_replaced_before_the_task(executor, agents):
+    worker = _only_worker(executor)
+    worker.process.kill()
+    worker.process.wait()
+
+    result = executor.run_sync(agents["echo"], ["echo_agent"], args=("x",), timeout=10)
+
+    assert result == {"echo": "x"}
+    assert executor.get_stats()["workers_started"] == 2
+    assert _only_worker(executor) is not worker
+
+
+def test_sandbox_registration_parses_the_agent_without_running_it(
+    registry, tmp_path, monkeypatch
+):
+    monkeypatch.setattr(registry_module, "AGENT_EXECUTION_BACKEND", "sandbox")
+    marker = tmp_path / "executed"
+    code = (
+        f"open({str(marker)!r}, 'w').close()\n\n\n"
+        "def marked_agent(state):\n"
+        "    return state\n"
+    )
+
+    result = registry.register_agent(name="marked", description="Marks", code=code)
+    assert result["status"] == "success"
+    assert not marker.exists()
+
+    result = registry.register_agent(
+        name="nameless", description="Wrong name", code=code.replace("marked_agent", "other")
+    )
+    assert result["status"] == "error"
+    assert not marker.exists()
@@ -0,0 +1,36 @@
+"""Execution metrics recorded by the workflow engine (core/workflow_engine.py)."""
+
+import asyncio
+from types import SimpleNamespace
+
+from core.workflow_engine import EnhancedMultiAgentWorkflowEngine
+from tests.conftest import agent_spec, read_registry
+
+
+def _execute(registry, result):
+    async def run_agent(agent, agent_name, request, file_data, step_context):
+        return result
+
+    engine = SimpleNamespace(_run_context_aware_agent=run_agent)
+    asyncio.run(
+        EnhancedMultiAgentWorkflowEngine._execute_context_aware_agent(
+            engine, None, "timed", "request", None, {}
+        )
+    )
+    registry.flush_metrics()
+    return read_registry(registry.agents_path, "agents")["timed"]
+
+
+def test_sandbox_timeout_is_recorded_as_a_timeout(registry):
+    assert registry.register_agent(**agent_spec("timed"))["status"] == "success"
+
+    entry = _execute(
+        registry, {"status": "error", "error": "Agent timed out", "timed_out": True}
+    )
+    assert entry["timeout_count"] == 1
+    assert entry.get("error_count", 0) == 0
+    assert (entry.get("latency") or {}).get("count", 0) == 0
+
+    entry = _execute(registry, {"status": "error", "error": "boom"})
+    assert entry["error_count"] == 1
+    assert entry["timeout_count"] == 1